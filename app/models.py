@@ -1,17 +1,128 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 import configparser
 
 config = configparser.ConfigParser()
 config.read('config.ini')
 
+
+def get_list(section: str, option: str, fallback: Tuple[str, ...] = ()) -> Tuple[str, ...]:
+    """Read a comma-separated option as a tuple of stripped, non-empty values."""
+    raw = config.get(section, option, fallback=None)
+    if raw is None:
+        return fallback
+    return tuple(v.strip() for v in raw.split(',') if v.strip())
+
+
+
+def get_pairs(section: str, option: str, fallback: Tuple[Tuple[str, str], ...] = ()) -> Tuple[Tuple[str, str], ...]:
+    """Read a semicolon-separated list of 'key: value' pairs."""
+    raw = config.get(section, option, fallback=None)
+    if raw is None:
+        return fallback
+    pairs = (item.split(':', 1) for item in raw.split(';') if ':' in item)
+    return tuple((k.strip(), v.strip()) for k, v in pairs if k.strip() and v.strip())
+
 @dataclass
 class AppConfig:
     qdrant_host: str = config.get('QDRANT', 'host', fallback='localhost')
     qdrant_port: int = config.getint('QDRANT', 'port', fallback=6333)
     qdrant_api_key: Optional[str] = config.get('QDRANT', 'api_key', fallback=None)
+    qdrant_upsert_batch_size: int = config.getint('QDRANT', 'upsert_batch_size', fallback=128)
+    qdrant_upsert_min_batch_size: int = config.getint('QDRANT', 'upsert_min_batch_size', fallback=16)
+    qdrant_upsert_max_batch_size: int = config.getint('QDRANT', 'upsert_max_batch_size', fallback=1024)
+    qdrant_upsert_max_batch_bytes: int = config.getint('QDRANT', 'upsert_max_batch_bytes', fallback=8 * 1024 * 1024)
+    qdrant_upsert_target_latency: float = config.getfloat('QDRANT', 'upsert_target_latency', fallback=1.0)
+    qdrant_upsert_workers: int = config.getint('QDRANT', 'upsert_workers', fallback=4)
+    qdrant_upsert_max_in_flight: int = config.getint('QDRANT', 'upsert_max_in_flight', fallback=8)
+    qdrant_upsert_wait: bool = config.getboolean('QDRANT', 'upsert_wait', fallback=True)
+    qdrant_upsert_retries: int = config.getint('QDRANT', 'upsert_retries', fallback=3)
+    qdrant_upsert_backoff: float = config.getfloat('QDRANT', 'upsert_backoff', fallback=0.5)
+    qdrant_hnsw_m: Optional[int] = config.getint('QDRANT', 'hnsw_m', fallback=None)
+    qdrant_hnsw_ef_construct: Optional[int] = config.getint('QDRANT', 'hnsw_ef_construct', fallback=None)
+    qdrant_search_hnsw_ef: Optional[int] = config.getint('QDRANT', 'search_hnsw_ef', fallback=None)
+    qdrant_on_disk_vectors: bool = config.getboolean('QDRANT', 'on_disk_vectors', fallback=False)
+    qdrant_vector_datatype: str = config.get('QDRANT', 'vector_datatype', fallback='float32')
+    qdrant_quantization: str = config.get('QDRANT', 'quantization', fallback='none')
+    qdrant_quantization_always_ram: bool = config.getboolean('QDRANT', 'quantization_always_ram', fallback=True)
+    qdrant_search_rescore: bool = config.getboolean('QDRANT', 'search_rescore', fallback=True)
+    qdrant_search_oversampling: float = config.getfloat('QDRANT', 'search_oversampling', fallback=2.0)
     embed_model: str = config.get('EMBEDDING', 'model_name', fallback='all-MiniLM-L6-v2')
+    embed_backend: str = config.get('EMBEDDING', 'backend', fallback='torch')
+    embed_onnx_quantization: str = config.get('EMBEDDING', 'onnx_quantization', fallback='avx2')
+    embedding_cache_enabled: bool = config.getboolean('EMBEDDING', 'cache_enabled', fallback=True)
+    embedding_cache_dir: str = config.get('EMBEDDING', 'cache_dir', fallback='./embedding_cache')
+    embedding_cache_memory_items: int = config.getint('EMBEDDING', 'cache_memory_items', fallback=10000)
+    embedding_cache_disk_items: int = config.getint('EMBEDDING', 'cache_disk_items', fallback=1000000)
+    embedding_batching_enabled: bool = config.getboolean('EMBEDDING', 'batching_enabled', fallback=True)
+    embedding_batch_max_size: int = config.getint('EMBEDDING', 'batch_max_size', fallback=32)
+    embedding_batch_max_wait_ms: float = config.getfloat('EMBEDDING', 'batch_max_wait_ms', fallback=5.0)
+    embedding_batch_timeout: float = config.getfloat('EMBEDDING', 'batch_timeout', fallback=30.0)
     default_collection: str = config.get('EMBEDDING', 'default_collection', fallback='papers_poc')
+    vector_index_backend: str = config.get('VECTOR_INDEX', 'backend', fallback='qdrant')
+    vector_index_dir: str = config.get('VECTOR_INDEX', 'numpy_dir', fallback='./vector_index')
+    vector_index_versions_dir: str = config.get('VECTOR_INDEX', 'versions_dir', fallback='./collection_versions')
+    incremental_ingest: bool = config.getboolean('INGESTION', 'incremental', fallback=True)
+    ingest_chunk_size: int = config.getint('INGESTION', 'chunk_size', fallback=1000)
+    ingest_queue_size: int = config.getint('INGESTION', 'queue_size', fallback=2)
+    ingest_max_concurrent_jobs: int = config.getint('INGESTION', 'max_concurrent_jobs', fallback=1)
+    ingest_max_queued_jobs: int = config.getint('INGESTION', 'max_queued_jobs', fallback=8)
+    ingest_job_history: int = config.getint('INGESTION', 'job_history', fallback=100)
+    ingest_jobs_dir: str = config.get('INGESTION', 'jobs_dir', fallback='./ingestion_jobs')
+    search_cache_enabled: bool = config.getboolean('SEARCH', 'cache_enabled', fallback=True)
+    search_cache_max_items: int = config.getint('SEARCH', 'cache_max_items', fallback=1024)
+    search_cache_ttl_seconds: float = config.getfloat('SEARCH', 'cache_ttl_seconds', fallback=300.0)
+    search_api_max_queries: int = config.getint('SEARCH', 'api_max_queries', fallback=256)
+    search_api_max_top_k: int = config.getint('SEARCH', 'api_max_top_k', fallback=100)
+    keyword_enabled: bool = config.getboolean('KEYWORD', 'enabled', fallback=True)
+    keyword_dir: str = config.get('KEYWORD', 'dir', fallback='./keyword_index')
+    keyword_k1: float = config.getfloat('KEYWORD', 'k1', fallback=1.2)
+    keyword_b: float = config.getfloat('KEYWORD', 'b', fallback=0.75)
+    keyword_hybrid_candidates: int = config.getint('KEYWORD', 'hybrid_candidates', fallback=50)
+    keyword_rrf_k: int = config.getint('KEYWORD', 'rrf_k', fallback=60)
+    facets_enabled: bool = config.getboolean('FACETS', 'enabled', fallback=True)
+    facets_dir: str = config.get('FACETS', 'dir', fallback='./facet_index')
+    facet_fields: Tuple[str, ...] = get_list('FACETS', 'fields', fallback=(
+        'TYPE OF INDOOR ENVIRONMENT', 'NOMINATE ACCORDING TO THE PAPER', 'YOUR COMPLETE NAME'
+    ))
+    facet_value_separator: Optional[str] = config.get('FACETS', 'value_separator', fallback=None) or None
+    facet_aliases: Tuple[Tuple[str, str], ...] = get_pairs('FACETS', 'aliases', fallback=(
+        ('indoor environment', 'TYPE OF INDOOR ENVIRONMENT'),
+        ('cleaning method', 'NOMINATE ACCORDING TO THE PAPER'),
+        ('cleaning material', 'NOMINATE ACCORDING TO THE PAPER'),
+        ('reviewer', 'YOUR COMPLETE NAME'),
+    ))
+    chat_cache_enabled: bool = config.getboolean('CHAT', 'cache_enabled', fallback=True)
+    chat_cache_similarity_threshold: float = config.getfloat('CHAT', 'cache_similarity_threshold', fallback=0.95)
+    chat_cache_max_items: int = config.getint('CHAT', 'cache_max_items', fallback=256)
+    chat_cache_ttl_seconds: float = config.getfloat('CHAT', 'cache_ttl_seconds', fallback=3600.0)
+    chat_context_max_tokens: int = config.getint('CHAT', 'context_max_tokens', fallback=1500)
+    chat_context_max_passage_tokens: int = config.getint('CHAT', 'context_max_passage_tokens', fallback=400)
+    chat_context_duplicate_threshold: float = config.getfloat('CHAT', 'context_duplicate_threshold', fallback=0.8)
+    search_payload_fields: Tuple[str, ...] = get_list('PAYLOAD', 'search_fields', fallback=('TITLE OF THE PAPER',))
+    chat_payload_fields: Tuple[str, ...] = get_list('PAYLOAD', 'chat_fields', fallback=(
+        'TITLE OF THE PAPER', 'AIM OF THE PAPER', 'MAIN FINDINGS OF THE PAPER'
+    ))
+    openai_timeout: float = config.getfloat('OPENAI', 'timeout', fallback=30.0)
+    openai_connect_timeout: float = config.getfloat('OPENAI', 'connect_timeout', fallback=5.0)
+    openai_max_retries: int = config.getint('OPENAI', 'max_retries', fallback=3)
+    openai_backoff_base: float = config.getfloat('OPENAI', 'backoff_base', fallback=0.5)
+    openai_backoff_max: float = config.getfloat('OPENAI', 'backoff_max', fallback=8.0)
+    openai_max_in_flight: int = config.getint('OPENAI', 'max_in_flight', fallback=8)
+    openai_queue_timeout: float = config.getfloat('OPENAI', 'queue_timeout', fallback=10.0)
+    openai_breaker_failure_threshold: int = config.getint('OPENAI', 'breaker_failure_threshold', fallback=5)
+    openai_breaker_reset_seconds: float = config.getfloat('OPENAI', 'breaker_reset_seconds', fallback=30.0)
+    payload_filter_fields: Tuple[str, ...] = get_list('PAYLOAD', 'filter_fields', fallback=(
+        'TYPE OF INDOOR ENVIRONMENT', 'NOMINATE ACCORDING TO THE PAPER', 'YOUR COMPLETE NAME'
+    ))
+    payload_numeric_filter_fields: Tuple[str, ...] = get_list('PAYLOAD', 'numeric_filter_fields', fallback=())
+    server_bind: str = config.get('SERVER', 'bind', fallback='0.0.0.0:5001')
+    server_workers: int = config.getint('SERVER', 'workers', fallback=0)
+    server_threads: int = config.getint('SERVER', 'threads', fallback=4)
+    server_timeout: int = config.getint('SERVER', 'timeout', fallback=120)
+    server_torch_threads: int = config.getint('SERVER', 'torch_threads', fallback=0)
+    server_metrics_dir: str = config.get('SERVER', 'metrics_dir', fallback='./prometheus_multiproc')
+    preload_model: bool = config.getboolean('FLASK', 'preload_model', fallback=True)
     flask_secret_key: str = config.get('FLASK', 'flask_secret_key', fallback='test')
     grafana_url: str = config.get('FLASK', 'grafana_url', fallback='http://localhost:3000/dashboards')
 
@@ -1,14 +1,32 @@
-from flask import Blueprint, render_template, request, redirect, flash, Response
+from flask import Blueprint, render_template, request, redirect, url_for, flash, Response, jsonify, stream_with_context
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
+import csv
+import json
 import os
-from typing import List, Dict, Any
+import threading
+import time
+import uuid
+from typing import List, Dict, Any, Iterator, Optional, Union
 
+from app.services.answer_cache import SemanticAnswerCache
 from app.services.chat import ChatService
+from app.services.context_builder import ContextBuilder
 from app.services.csv_loader import CSVLoader
 from app.services.embedder import Embedder
-from app.services.qdrant_wrapper import QdrantWrapper
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import EmbeddingCache
+from app.services.facet_index import FacetIndex
+from app.services.indexer import Indexer
+from app.services.ingestion_jobs import IngestionJob, IngestionJobManager, JobQueueFull
+from app.services.keyword_index import KeywordIndex, reciprocal_rank_fusion
+from app.services.numpy_index import NumpyVectorIndex
+from app.services.openai_client import CircuitBreaker, OpenAIChatClient
+from app.services.payload_filter import parse_filter
+from app.services.qdrant_wrapper import QdrantWrapper, bump_collection_version
+from app.services.prometheus import metrics, exposition_registry
+from app.services.query_cache import QueryResultCache
 from app.models import AppConfig
 from app.logger import logger  
 
@@ -18,16 +36,343 @@ UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 config = AppConfig()
-embedder = Embedder(model_name=config.embed_model)
-qwrap: QdrantWrapper = None
+embedding_cache = EmbeddingCache(
+    cache_dir=config.embedding_cache_dir or None,
+    max_memory_items=config.embedding_cache_memory_items,
+    max_disk_items=config.embedding_cache_disk_items
+) if config.embedding_cache_enabled else None
+embedder = Embedder(
+    model_name=config.embed_model,
+    cache=embedding_cache,
+    backend=config.embed_backend,
+    onnx_quantization=config.embed_onnx_quantization
+)
+query_embedder = EmbeddingBatcher(
+    embedder,
+    max_batch_size=config.embedding_batch_max_size,
+    max_wait_ms=config.embedding_batch_max_wait_ms,
+    timeout=config.embedding_batch_timeout
+) if config.embedding_batching_enabled else embedder
+search_cache = QueryResultCache(
+    max_items=config.search_cache_max_items,
+    ttl_seconds=config.search_cache_ttl_seconds
+) if config.search_cache_enabled else None
+answer_cache = SemanticAnswerCache(
+    threshold=config.chat_cache_similarity_threshold,
+    max_items=config.chat_cache_max_items,
+    ttl_seconds=config.chat_cache_ttl_seconds
+) if config.chat_cache_enabled else None
+context_builder = ContextBuilder(
+    max_tokens=config.chat_context_max_tokens,
+    max_passage_tokens=config.chat_context_max_passage_tokens,
+    duplicate_threshold=config.chat_context_duplicate_threshold
+) if config.chat_context_max_tokens > 0 else None
+openai_client = OpenAIChatClient(
+    timeout=config.openai_timeout,
+    connect_timeout=config.openai_connect_timeout,
+    max_retries=config.openai_max_retries,
+    backoff_base=config.openai_backoff_base,
+    backoff_max=config.openai_backoff_max,
+    max_in_flight=config.openai_max_in_flight,
+    queue_timeout=config.openai_queue_timeout,
+    breaker=CircuitBreaker(
+        failure_threshold=config.openai_breaker_failure_threshold,
+        reset_seconds=config.openai_breaker_reset_seconds,
+        export_state=True
+    )
+)
+_chat: Optional[ChatService] = None
+ingestion_jobs = IngestionJobManager(
+    max_concurrent=config.ingest_max_concurrent_jobs,
+    max_queued=config.ingest_max_queued_jobs,
+    max_history=config.ingest_job_history,
+    jobs_dir=config.ingest_jobs_dir
+)
+qwrap: Union[QdrantWrapper, NumpyVectorIndex] = None
+_probe_qwrap: Union[QdrantWrapper, NumpyVectorIndex] = None
+keyword_index: Optional[KeywordIndex] = None
+facet_index: Optional[FacetIndex] = None
+collections: Dict[str, Dict[str, Any]] = {}
+# Set in forked server workers, which must pick up indexes written by their siblings.
+_follow_other_workers = False
+_sync_stamps: Dict[str, Optional[str]] = {}
+_refresh_lock = threading.Lock()
+# Requests retry collection discovery while detached, at most this often (doubling up to the max).
+DISCOVERY_RETRY_SECONDS = 1.0
+DISCOVERY_RETRY_MAX_SECONDS = 60.0
+_discovery_retry_at = 0.0
+_discovery_retry_delay = DISCOVERY_RETRY_SECONDS
+
+SEARCH_MODES = ('dense', 'keyword', 'hybrid')
+
+
+def _open_index(collection_name: str) -> Union[QdrantWrapper, NumpyVectorIndex]:
+    """Open a collection on the vector index backend selected in the config."""
+    if config.vector_index_backend == 'numpy':
+        return NumpyVectorIndex(
+            index_dir=config.vector_index_dir, collection_name=collection_name,
+            versions_dir=config.vector_index_versions_dir
+        )
+    return QdrantWrapper(collection_name=collection_name)
+
+
+def _keyword_index_path(collection_name: str) -> str:
+    return os.path.join(config.keyword_dir, f"{secure_filename(collection_name)}.json")
+
+
+def _facet_index_path(collection_name: str) -> str:
+    return os.path.join(config.facets_dir, f"{secure_filename(collection_name)}.json")
+
+
+def _load_keyword_index(collection_name: str) -> Optional[KeywordIndex]:
+    """Load the keyword index of a collection from disk, or None if keyword search is disabled."""
+    if not config.keyword_enabled:
+        return None
+    return KeywordIndex.load(
+        _keyword_index_path(collection_name),
+        payload_fields=config.search_payload_fields,
+        k1=config.keyword_k1,
+        b=config.keyword_b,
+        filter_fields=config.payload_filter_fields + config.payload_numeric_filter_fields
+    )
+
+
+def _load_facet_index(collection_name: str) -> Optional[FacetIndex]:
+    """Load the facet index of a collection from disk, or None if facets are disabled."""
+    if not config.facets_enabled:
+        return None
+    return FacetIndex.load(
+        _facet_index_path(collection_name), fields=config.facet_fields, separator=config.facet_value_separator
+    )
+
+
+def _sync_stamp_path(collection_name: str) -> Optional[str]:
+    if not config.ingest_jobs_dir:
+        return None
+    return os.path.join(config.ingest_jobs_dir, f"synced-{secure_filename(collection_name)}.stamp")
+
+
+def _read_sync_stamp(collection_name: str) -> Optional[str]:
+    """Stamp written by the last sync of a collection in any server process, None if there was none."""
+    path = _sync_stamp_path(collection_name)
+    if path is None:
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_sync_stamp(collection_name: str) -> None:
+    """Tell the other server workers that the collection was re-indexed, and remember the stamp this process holds."""
+    path = _sync_stamp_path(collection_name)
+    if path is None:
+        return
+    stamp = f"{os.getpid()}-{time.time_ns()}"
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(stamp)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write sync stamp of collection '{collection_name}': {e}")
+        return
+    _sync_stamps[collection_name] = stamp
+
+
+def _save_side_indexes(collection_name: str) -> None:
+    """Write the keyword and facet indexes."""
+    if keyword_index is not None:
+        keyword_index.save(_keyword_index_path(collection_name))
+    if facet_index is not None:
+        facet_index.save(_facet_index_path(collection_name))
+
+
+def reset_after_fork() -> None:
+    """Prepare module state in a freshly forked server worker.
+
+    The model and the loaded indexes are inherited from the master, but
+    network clients must not be shared across processes, so the vector index
+    is reopened. From now on the worker also reloads indexes that another
+    worker rewrites (see `refresh_from_other_workers`).
+    """
+    global qwrap, _probe_qwrap, _follow_other_workers
+    if qwrap is not None:
+        qwrap = _open_index(qwrap.collection_name)
+    _probe_qwrap = None
+    _follow_other_workers = True
+
+
+@routes.before_request
+def refresh_from_other_workers() -> None:
+    """Reload the collection if another worker process re-indexed it.
+
+    An upload is handled by a single worker, which writes a sync stamp to
+    `jobs_dir` when it is done. The other workers notice the new stamp, reopen
+    the collection, reload the keyword and facet indexes and drop cached search
+    results and answers. Does nothing in a single-process server.
+    """
+    global qwrap, keyword_index, facet_index
+    if not _follow_other_workers:
+        return
+    name = config.default_collection
+    stamp = _read_sync_stamp(name)
+    if stamp == _sync_stamps.get(name):
+        return
+    with _refresh_lock:
+        if stamp == _sync_stamps.get(name):
+            return
+        logger.info(f"Collection '{name}' was re-indexed by another worker, reloading")
+        qwrap = _open_index(name)
+        _register_collection(qwrap)
+        keyword_index = _load_keyword_index(name)
+        facet_index = _load_facet_index(name)
+        if not config.vector_index_versions_dir:
+            # the writing worker bumped a shared version otherwise
+            bump_collection_version(name)
+        if search_cache is not None:
+            search_cache.clear()
+        if answer_cache is not None:
+            answer_cache.clear()
+        _sync_stamps[name] = stamp
+
+
+def _register_collection(index: Union[QdrantWrapper, NumpyVectorIndex]) -> Optional[Dict[str, Any]]:
+    """Record a collection's vector size and point count in the registry and metrics."""
+    try:
+        info = index.collection_info()
+    except Exception as e:
+        logger.exception(f"Failed to describe collection '{index.collection_name}': {e}")
+        return None
+    if info is None:
+        collections.pop(index.collection_name, None)
+        return None
+    collections[index.collection_name] = info
+    metrics.QDRANT_COLLECTION_SIZE.labels(collection=index.collection_name).set(info['points_count'])
+    return info
+
+
+def discover_collections() -> Dict[str, Dict[str, Any]]:
+    """Register existing collections and attach to the configured one.
+
+    Every collection on the vector index backend is registered with its point
+    count and vector size, so search and chat work after a restart without
+    re-uploading the CSV. If the embedding model is loaded, only a collection
+    whose vector size matches it is attached; otherwise the model is not loaded
+    just for this check and 'compatible' is None until an upload.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Registry of collection name to vector size, point count and compatibility.
+    """
+    global qwrap, keyword_index, facet_index
+    try:
+        names = _open_index(config.default_collection).list_collections()
+    except Exception as e:
+        logger.exception(f"Collection discovery failed: {e}")
+        return collections
+
+    dimension = embedder.dimension if embedder.is_loaded else None
+    for name in names:
+        index = _open_index(name)
+        info = _register_collection(index)
+        if info is None:
+            continue
+        info['compatible'] = info['vector_size'] == dimension if dimension is not None else None
+        if info['compatible'] is False:
+            logger.warning(
+                f"Collection '{name}' stores vectors of size {info['vector_size']}, "
+                f"embedder '{embedder.model_name}' produces {dimension}; not attaching"
+            )
+        elif name == config.default_collection and qwrap is None:
+            qwrap = index
+            keyword_index = _load_keyword_index(name)
+            facet_index = _load_facet_index(name)
+            _sync_stamps[name] = _read_sync_stamp(name)
+            logger.info(f"Attached to existing collection '{name}' with {info['points_count']} points")
+    return collections
+
+
+def _attach_if_detached() -> None:
+    """Retry collection discovery when no collection is attached yet.
+
+    Startup discovery gives up if the vector index backend is not reachable
+    yet, so search and chat requests try again, backing off exponentially
+    between attempts while discovery finds nothing to attach.
+    """
+    global _discovery_retry_at, _discovery_retry_delay
+    if qwrap is not None or time.monotonic() < _discovery_retry_at:
+        return
+    with _refresh_lock:
+        if qwrap is not None or time.monotonic() < _discovery_retry_at:
+            return
+        discover_collections()
+        if qwrap is None:
+            _discovery_retry_at = time.monotonic() + _discovery_retry_delay
+            _discovery_retry_delay = min(_discovery_retry_delay * 2, DISCOVERY_RETRY_MAX_SECONDS)
+        else:
+            _discovery_retry_delay = DISCOVERY_RETRY_SECONDS
+
+
+def _ingest(job: IngestionJob, filepath: str) -> Dict[str, int]:
+    """Index an uploaded CSV into the job's collection; runs in a background job thread.
+
+    Args:
+        job (IngestionJob): The job, whose progress is updated as chunks are embedded and upserted.
+        filepath (str): Path of the saved upload.
+
+    Returns:
+        Dict[str, int]: Counts of added, updated, deleted and unchanged rows.
+    """
+    global qwrap, keyword_index, facet_index
+
+    def progress(phase: str, rows_read: int, rows_written: int) -> None:
+        ingestion_jobs.update(job.id, phase=phase, rows_read=rows_read, rows_written=rows_written)
+
+    # Jobs for the same collection run one after another, also across server workers;
+    # concurrent syncs would delete each other's rows.
+    collection_lock = ingestion_jobs.collection_lock(job.collection)
+    if not collection_lock.acquire(blocking=False):
+        progress('waiting', 0, 0)
+        collection_lock.acquire()
+    try:
+        chunks = CSVLoader(filepath).iter_chunks(chunksize=config.ingest_chunk_size)
+        # Requests keep using the published indexes until the sync has succeeded.
+        index = _open_index(job.collection)
+        synced_keyword_index = keyword_index if keyword_index is not None else _load_keyword_index(job.collection)
+        synced_facet_index = facet_index if facet_index is not None else _load_facet_index(job.collection)
+        summary = Indexer(index, embedder, keyword_index=synced_keyword_index, facet_index=synced_facet_index).sync_stream(
+            chunks,
+            incremental=config.incremental_ingest,
+            queue_size=config.ingest_queue_size,
+            progress=progress
+        )
+        qwrap, keyword_index, facet_index = index, synced_keyword_index, synced_facet_index
+        ingestion_jobs.update(job.id, phase='saving')
+        _register_collection(qwrap)
+        _save_side_indexes(job.collection)
+        _write_sync_stamp(job.collection)
+        logger.info(f"Successfully indexed {job.filename} into '{job.collection}': {summary.as_dict()}")
+        return summary.as_dict()
+    finally:
+        collection_lock.release()
+
+
+def _wants_json() -> bool:
+    return request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
 
 
 @routes.route('/', methods=['GET', 'POST'])
-def index() -> str:
-    """Render the home page and handle CSV file upload for indexing.
+def index() -> Union[str, Response]:
+    """Render the home page and queue uploaded CSV files for indexing.
+
+    The upload is saved and indexed by a background job; the page then polls
+    /jobs/<id> for its progress. Clients that accept JSON get the queued job
+    with status 202 instead of a redirect.
 
     Returns:
-        str: Rendered HTML page.
+        Union[str, Response]: Rendered HTML page, a redirect, or the queued job as JSON.
     """
     if request.method == 'POST':
         logger.info("Received file upload request")
@@ -50,27 +395,135 @@ def index() -> str:
             logger.info(f"File saved to {filepath}")
 
             try:
-                with open(filepath, 'rb') as f:
-                    loader = CSVLoader(f.read())
-                    df = loader.load()
-                logger.info(f"Loaded CSV with {len(df)} rows")
+                job = ingestion_jobs.submit(lambda job: _ingest(job, filepath), filename, config.default_collection)
+            except JobQueueFull as e:
+                logger.warning(f"Rejected upload of {filename}: {e}")
+                if _wants_json():
+                    return jsonify({'error': str(e)}), 429
+                flash(str(e), 'danger')
+                return redirect(request.url)
 
-                embs: Any = embedder.embed(df['document'].tolist())
-                logger.debug(f"Generated embeddings shape: {embs.shape}")
+            status_url = url_for('routes.job_status', job_id=job.id)
+            if _wants_json():
+                return jsonify(job.as_dict()), 202, {'Location': status_url}
+            flash(f'Indexing {filename} in the background', 'info')
+            return redirect(url_for('routes.index', job=job.id))
 
-                global qwrap
-                qwrap = QdrantWrapper(collection_name=config.default_collection)
-                qwrap.ensure_collection(vector_size=embs.shape[1])
-                qwrap.upsert_dataframe(df, embs)
+    return render_template('index.html', job_id=request.args.get('job'))
 
-                flash(f'Successfully indexed {len(df)} rows', 'success')
-                logger.info(f"Successfully indexed {len(df)} rows into Qdrant")
 
-            except Exception as e:
-                logger.exception(f"Error processing uploaded file {filename}: {e}")
-                flash(f'Error processing file: {e}', 'danger')
+@routes.route('/jobs/<job_id>')
+def job_status(job_id: str) -> Response:
+    """Report the state and progress of an ingestion job.
+
+    Returns:
+        Response: JSON with 'state', 'phase', 'rows_read', 'rows_written', 'rows_per_second',
+        'elapsed_seconds', the 'summary' once it succeeded and the 'error' if it failed.
+    """
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify(job)
+
+
+def _dense_search(query_text: str, top_k: int, query_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Embed and search a query, serving repeated queries from the result cache."""
+    key = None
+    if search_cache is not None:
+        key = QueryResultCache.make_key(
+            query_text, top_k, qwrap.collection_name, qwrap.collection_version, config.search_payload_fields, query_filter
+        )
+        cached = search_cache.get(key)
+        if cached is not None:
+            logger.info(f"Search cache hit for query='{query_text}', top_k={top_k}")
+            return cached
+
+    start = time.perf_counter()
+    q_emb: Any = query_embedder.embed([query_text], persist=False)[0]
+    results = qwrap.search(q_emb, top_k=top_k, payload_include=config.search_payload_fields, query_filter=query_filter)
+    if key is not None:
+        search_cache.put(key, results, cost_seconds=time.perf_counter() - start)
+    return results
+
+
+def _run_search(
+    query_text: str,
+    top_k: int,
+    mode: str = 'dense',
+    query_filter: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Search a query with the dense, keyword or hybrid ranking.
+
+    Keyword search ranks with the BM25 index only, without embedding the query.
+    Hybrid search fuses the keyword ranking with the top dense candidates using
+    reciprocal rank fusion; its scores are fused ranks, not similarities.
+
+    Args:
+        query_text (str): Query entered by the user.
+        top_k (int): Number of results.
+        mode (str): One of SEARCH_MODES. Falls back to dense when no keyword index is loaded
+            or the keyword index cannot apply the filter yet.
+        query_filter (Optional[Dict[str, Any]]): Payload filter from `parse_filter`.
+
+    Returns:
+        List[Dict[str, Any]]: Search results with 'id', 'score' and 'payload'.
+    """
+    if keyword_index is None:
+        mode = 'dense'
+    elif mode != 'dense' and not keyword_index.can_filter(query_filter):
+        logger.warning("Keyword index predates the filter fields, running a dense search until the next upload")
+        mode = 'dense'
+    start = time.perf_counter()
+    if mode == 'keyword':
+        results = keyword_index.search(query_text, top_k=top_k, query_filter=query_filter)
+    elif mode == 'hybrid':
+        n_candidates = max(top_k, config.keyword_hybrid_candidates)
+        results = reciprocal_rank_fusion(
+            [
+                _dense_search(query_text, n_candidates, query_filter),
+                keyword_index.search(query_text, top_k=n_candidates, query_filter=query_filter)
+            ],
+            top_k=top_k,
+            k=config.keyword_rrf_k
+        )
+    else:
+        results = _dense_search(query_text, top_k, query_filter)
+    metrics.SEARCH_MODE_LATENCY.labels(mode=mode).observe(time.perf_counter() - start)
+    return results
 
-    return render_template('index.html')
+
+def _parse_filter(spec: Any) -> Optional[Dict[str, Any]]:
+    return parse_filter(spec, config.payload_filter_fields, config.payload_numeric_filter_fields)
+
+
+def _form_filter(form: Any) -> Optional[Dict[str, Any]]:
+    """Build a payload filter from the search form.
+
+    Keyword fields are read from 'filter:<field>' as comma-separated values,
+    where a value containing a comma is written in double quotes; numeric
+    fields are read from 'filter_min:<field>' and 'filter_max:<field>'.
+
+    Raises:
+        ValueError: If a numeric bound is not a number.
+    """
+    spec: Dict[str, Any] = {}
+    for field in config.payload_filter_fields:
+        raw = form.get(f'filter:{field}', '')
+        values = [v.strip() for v in next(csv.reader([raw], skipinitialspace=True), []) if v.strip()]
+        if values:
+            spec[field] = values[0] if len(values) == 1 else values
+    for field in config.payload_numeric_filter_fields:
+        bounds = {}
+        for op, name in (('gte', 'filter_min'), ('lte', 'filter_max')):
+            raw = form.get(f'{name}:{field}', '').strip()
+            if raw:
+                try:
+                    bounds[op] = float(raw)
+                except ValueError:
+                    raise ValueError(f"Bound on '{field}' must be a number, got '{raw}'")
+        if bounds:
+            spec[field] = bounds
+    return _parse_filter(spec)
 
 
 @routes.route('/search', methods=['GET', 'POST'])
@@ -82,10 +535,16 @@ def search() -> str:
     """
     results: List[Dict[str, Any]] = []
     top_k: int = 5
+    mode: str = 'dense'
+    query_filter: Optional[Dict[str, Any]] = None
 
     if request.method == 'POST':
         query_text: str = request.form.get('query', '')
         top_k_str: str = request.form.get('top_k', '5')
+        mode = request.form.get('mode', 'dense')
+        if mode not in SEARCH_MODES:
+            logger.warning(f"Invalid search mode received: {mode}. Falling back to dense.")
+            mode = 'dense'
 
         try:
             top_k = max(1, int(top_k_str))
@@ -93,24 +552,221 @@ def search() -> str:
             logger.warning(f"Invalid top_k value received: {top_k_str}. Falling back to 5.")
             top_k = 5
 
+        try:
+            query_filter = _form_filter(request.form)
+            filter_error = None
+        except ValueError as e:
+            query_filter, filter_error = None, str(e)
+
+        _attach_if_detached()
         if not query_text:
             logger.warning("Empty query submitted")
             flash('Please enter a query', 'warning')
+        elif filter_error:
+            logger.warning(f"Invalid search filter: {filter_error}")
+            flash(filter_error, 'warning')
         elif qwrap is None:
             logger.warning("Search attempted before collection was indexed")
             flash('No collection indexed yet', 'danger')
         else:
-            logger.info(f"Search initiated: query='{query_text}', top_k={top_k}")
+            logger.info(f"Search initiated: query='{query_text}', top_k={top_k}, mode={mode}, filter={query_filter}")
             try:
-                q_emb: Any = embedder.embed([query_text])[0]
-                results = qwrap.search(q_emb, top_k=top_k)
+                results = _run_search(query_text, top_k, mode, query_filter)
                 logger.info(f"Search returned {len(results)} results")
                 logger.debug(f"Search results: {results}")
             except Exception as e:
                 logger.exception(f"Search error for query '{query_text}': {e}")
                 flash(f'Error during search: {e}', 'danger')
 
-    return render_template('search.html', results=results, top_k=top_k)
+    return render_template(
+        'search.html',
+        results=results,
+        top_k=top_k,
+        mode=mode,
+        keyword_enabled=keyword_index is not None,
+        query_filter=query_filter,
+        filter_fields=config.payload_filter_fields,
+        numeric_filter_fields=config.payload_numeric_filter_fields
+    )
+
+def _parse_api_queries(body: Any) -> List[Dict[str, Any]]:
+    """Validate an /api/search body into a list of {'query', 'top_k', 'filter'} dicts.
+
+    Raises:
+        ValueError: If the body is malformed or exceeds the configured limits.
+    """
+    if not isinstance(body, dict) or not isinstance(body.get('queries'), list) or not body['queries']:
+        raise ValueError("Body must be a JSON object with a non-empty 'queries' list")
+    if len(body['queries']) > config.search_api_max_queries:
+        raise ValueError(f"At most {config.search_api_max_queries} queries per request")
+
+    default_top_k = body.get('top_k', 5)
+    default_filter = body.get('filter')
+    parsed = []
+    for i, item in enumerate(body['queries']):
+        if isinstance(item, str):
+            item = {'query': item}
+        if not isinstance(item, dict) or not isinstance(item.get('query'), str) or not item['query'].strip():
+            raise ValueError(f"Query {i} must be a non-empty string or an object with a 'query' string")
+        top_k = item.get('top_k', default_top_k)
+        if not isinstance(top_k, int) or isinstance(top_k, bool) or not 1 <= top_k <= config.search_api_max_top_k:
+            raise ValueError(f"Query {i}: top_k must be an integer between 1 and {config.search_api_max_top_k}")
+        try:
+            query_filter = _parse_filter(item.get('filter', default_filter))
+        except ValueError as e:
+            raise ValueError(f"Query {i}: {e}")
+        parsed.append({'query': item['query'], 'top_k': top_k, 'filter': query_filter})
+    return parsed
+
+
+def _run_search_batch(queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Search many queries with one embedding call and one batch search.
+
+    Queries found in the result cache are answered from it; the rest are
+    embedded together and sent to the vector index as a single batch.
+
+    Args:
+        queries (List[Dict[str, Any]]): Items with 'query', 'top_k' and an optional 'filter'.
+
+    Returns:
+        List[List[Dict[str, Any]]]: Results per query, in input order.
+    """
+    results: List[Any] = [None] * len(queries)
+    keys: List[Any] = [None] * len(queries)
+    if search_cache is not None:
+        for i, q in enumerate(queries):
+            keys[i] = QueryResultCache.make_key(
+                q['query'], q['top_k'], qwrap.collection_name, qwrap.collection_version,
+                config.search_payload_fields, q.get('filter')
+            )
+            results[i] = search_cache.get(keys[i])
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        start = time.perf_counter()
+        embeddings = embedder.embed([queries[i]['query'] for i in missing], persist=False)
+        found = qwrap.search_batch(
+            embeddings,
+            [queries[i]['top_k'] for i in missing],
+            payload_include=config.search_payload_fields,
+            query_filters=[queries[i].get('filter') for i in missing]
+        )
+        cost = (time.perf_counter() - start) / len(missing)
+        for i, hits in zip(missing, found):
+            results[i] = hits
+            if keys[i] is not None:
+                search_cache.put(keys[i], hits, cost_seconds=cost)
+    logger.info(f"Batch search: {len(queries)} queries, {len(queries) - len(missing)} served from cache")
+    return results
+
+
+@routes.route('/api/search', methods=['POST'])
+def api_search() -> Response:
+    """Search many queries in one request.
+
+    Body:
+        {"queries": ["text", {"query": "text", "top_k": 10, "filter": {...}}, ...], "top_k": 5, "filter": {...}}
+
+        A filter maps filterable payload fields to a value, a list of values
+        (match any) or, for numeric fields, a {"gte", "lte", "gt", "lt"} range.
+        The top-level filter applies to queries without their own.
+
+    Returns:
+        Response: JSON with one {'query', 'top_k', 'filter', 'results'} entry per query, in order, and 'took_ms'.
+    """
+    start = time.perf_counter()
+    try:
+        queries = _parse_api_queries(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    _attach_if_detached()
+    if qwrap is None:
+        return jsonify({'error': 'No collection indexed yet'}), 503
+
+    try:
+        found = _run_search_batch(queries)
+    except Exception as e:
+        logger.exception(f"Batch search of {len(queries)} queries failed: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    duration = time.perf_counter() - start
+    metrics.SEARCH_API_REQUEST_LATENCY.observe(duration)
+    metrics.SEARCH_API_BATCH_SIZE.observe(len(queries))
+    return jsonify({
+        'results': [
+            {'query': q['query'], 'top_k': q['top_k'], 'filter': q['filter'], 'results': hits}
+            for q, hits in zip(queries, found)
+        ],
+        'took_ms': round(duration * 1000, 3),
+    })
+
+
+def _chat_service() -> ChatService:
+    """The shared ChatService, rebuilt only when the collection or facet index is replaced."""
+    global _chat
+    if _chat is None or _chat.qdrant is not qwrap or _chat.facet_index is not facet_index:
+        _chat = ChatService(
+            qwrap,
+            query_embedder,
+            payload_fields=config.chat_payload_fields,
+            answer_cache=answer_cache,
+            facet_index=facet_index,
+            facet_aliases=config.facet_aliases,
+            context_builder=context_builder,
+            client=openai_client
+        )
+    return _chat
+
+
+@routes.route('/api/facets')
+def api_facets() -> Response:
+    """Exact counts over the categorical columns of the indexed collection.
+
+    Query args:
+        field: Facet field; all fields are returned when omitted.
+        by: Second facet field; returns the co-occurrence table of field x by.
+        value: With field, restrict to one value and return its point IDs.
+        top: Maximum number of values per field.
+
+    Returns:
+        Response: JSON with 'total' and per-field value counts, a co-occurrence 'table', or 'ids'.
+    """
+    if facet_index is None:
+        return jsonify({'error': 'No facet index available'}), 503
+
+    field = request.args.get('field')
+    by = request.args.get('by')
+    value = request.args.get('value')
+    try:
+        top = int(request.args['top']) if 'top' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'top must be an integer'}), 400
+    for name in (field, by):
+        if name is not None and name not in facet_index.fields:
+            return jsonify({'error': f"Unknown facet field '{name}'", 'fields': list(facet_index.fields)}), 400
+    if (by or value is not None) and field is None:
+        return jsonify({'error': "'by' and 'value' require 'field'"}), 400
+    if by is not None and by == field:
+        return jsonify({'error': "'by' must be a different field than 'field'"}), 400
+
+    start = time.perf_counter()
+    if by is not None:
+        body: Dict[str, Any] = {'field': field, 'by': by, 'table': facet_index.cooccurrence(field, by)}
+    elif value is not None:
+        ids = sorted(facet_index.ids(field, value), key=str)
+        body = {'field': field, 'value': value, 'count': len(ids), 'ids': ids}
+    else:
+        fields = [field] if field else facet_index.fields
+        body = {'fields': {f: facet_index.counts(f, top=top) for f in fields}}
+    body['total'] = len(facet_index)
+    body['took_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return jsonify(body)
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    """Format an event as a server-sent event frame."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
 
 @routes.route('/chat', methods=['GET', 'POST'])
 def chat() -> str:
@@ -127,27 +783,121 @@ def chat() -> str:
         question = request.form.get('question', '')
         top_k = int(request.form.get('top_k', top_k))
 
+        _attach_if_detached()
         if not question:
             flash("Please enter a question.", "warning")
         elif qwrap is None:
             flash("No collection indexed yet.", "danger")
         else:
-            chat_service = ChatService(qwrap, embedder)
+            chat_service = _chat_service()
             result = chat_service.answer_question(question, top_k=top_k)
             answer = result["answer"]
             context_docs = result["context_docs"]
 
     return render_template("chat.html", answer=answer, context_docs=context_docs, top_k=top_k)
 
+@routes.route('/chat/stream')
+def chat_stream() -> Response:
+    """Stream a chat answer to the browser as server-sent events.
+
+    Query args:
+        question: The user's question.
+        top_k: Number of papers used as context.
+
+    Returns:
+        Response: 'text/event-stream' with context, token, error and done events.
+    """
+    question = request.args.get('question', '')
+    try:
+        top_k = max(1, int(request.args.get('top_k', 5)))
+    except ValueError:
+        top_k = 5
+
+    if not question:
+        return jsonify({'error': 'Please enter a question.'}), 400
+    _attach_if_detached()
+    if qwrap is None:
+        return jsonify({'error': 'No collection indexed yet.'}), 503
+
+    chat_service = _chat_service()
+
+    def events() -> Iterator[str]:
+        try:
+            for event in chat_service.stream_answer(question, top_k=top_k):
+                yield _sse(event)
+        except Exception as e:
+            logger.exception(f"Streaming chat failed for question '{question}': {e}")
+            yield _sse({'type': 'error', 'message': str(e)})
+            yield _sse({'type': 'done'})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@routes.route('/papers/<point_id>')
+def paper(point_id: str) -> Response:
+    """Return the full payload of a single indexed paper.
+
+    Used by the search and chat pages to load details only when a result is expanded.
+
+    Args:
+        point_id (str): Qdrant point ID (integer or UUID).
+
+    Returns:
+        Response: JSON with 'id' and 'payload'; 404 for unknown or malformed IDs.
+    """
+    _attach_if_detached()
+    if qwrap is None:
+        return jsonify({'error': 'No collection indexed yet'}), 503
+
+    try:
+        pid: Any = int(point_id) if point_id.isdigit() else str(uuid.UUID(point_id))
+    except ValueError:
+        return jsonify({'error': f'Paper {point_id} not found'}), 404
+    try:
+        records = qwrap.retrieve([pid])
+    except Exception as e:
+        logger.exception(f"Failed to fetch paper {point_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    if not records:
+        return jsonify({'error': f'Paper {point_id} not found'}), 404
+    return jsonify(records[0])
+
+@routes.route('/healthz')
+def healthz() -> Response:
+    """Liveness probe: the process is up and serving requests."""
+    return jsonify({'status': 'ok'})
+
+@routes.route('/readyz')
+def readyz() -> Response:
+    """Readiness probe: the embedding model is warm and the vector index is reachable.
+
+    Returns:
+        Response: JSON with per-check results; 503 until every check passes.
+    """
+    global _probe_qwrap
+    if qwrap is None and _probe_qwrap is None:
+        _probe_qwrap = _open_index(config.default_collection)
+    checks = {
+        'model': embedder.is_loaded,
+        'qdrant': (qwrap or _probe_qwrap).ping(),
+    }
+    ready = all(checks.values())
+    return jsonify({'status': 'ready' if ready else 'not ready', 'checks': checks}), 200 if ready else 503
+
 @routes.route('/metrics')
 def custom_metrics() -> Response:
     """
     Serve all Prometheus metrics, including metrics from QdrantWrapper.
+    Aggregated over all worker processes under the multi-process server.
 
     Returns:
         Response: Flask Response object.
     """
-    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(exposition_registry()), mimetype=CONTENT_TYPE_LATEST)
 
 @routes.route("/metrics_dashboard", methods=['GET', 'POST'])
 def metrics_dashboard():
@@ -0,0 +1,126 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import itertools
+import threading
+import time
+import numpy as np
+from app.logger import logger
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    model: str
+    collection: str
+    version: Any
+    vector: np.ndarray
+    context_ids: Tuple[Any, ...]
+    answer: str
+    context_docs: List[Dict[str, Any]]
+
+
+class SemanticAnswerCache:
+    """Cache of chat answers looked up by question-embedding similarity.
+
+    An entry is reused when a new question is at least `threshold` cosine-similar
+    to a cached one, was asked against the same model and collection version,
+    and retrieval returned the same context IDs.
+
+    Attributes:
+        threshold: Minimum cosine similarity for a hit.
+        max_items: Maximum number of cached answers (oldest evicted first).
+        ttl_seconds: Lifetime of an entry in seconds.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_items: int = 256, ttl_seconds: float = 3600.0) -> None:
+        self.threshold = threshold
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(vector: Any) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def _purge(self, collection: str, version: Any, now: float) -> None:
+        """Drop expired entries and entries made against another version of the collection."""
+        stale = [
+            key for key, e in self._entries.items()
+            if e.expires_at < now or (e.collection == collection and e.version != version)
+        ]
+        for key in stale:
+            del self._entries[key]
+
+    def lookup(
+        self,
+        question_emb: Any,
+        model: str,
+        collection: str,
+        version: Any,
+        context_ids: Sequence[Any]
+    ) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Find a cached answer for a similar question with identical retrieved context.
+
+        Args:
+            question_emb: Embedding of the new question.
+            model: Chat model that would generate the answer.
+            collection: Collection the context was retrieved from.
+            version: Current version of that collection.
+            context_ids: IDs of the documents retrieved for the new question.
+
+        Returns:
+            Optional[Tuple[str, List[Dict[str, Any]]]]: Cached answer and context docs, or None.
+        """
+        query = self._unit(question_emb)
+        ids = tuple(context_ids)
+        with self._lock:
+            self._purge(collection, version, time.monotonic())
+            candidates = [
+                (k, e) for k, e in self._entries.items()
+                if e.model == model and e.collection == collection and e.version == version and e.context_ids == ids
+            ]
+            if not candidates:
+                return None
+            sims = np.stack([e.vector for _, e in candidates]) @ query
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+            key, entry = candidates[best]
+            self._entries.move_to_end(key)
+            logger.info(f"Semantic answer cache hit (similarity {sims[best]:.3f})")
+            return entry.answer, entry.context_docs
+
+    def store(
+        self,
+        question_emb: Any,
+        model: str,
+        collection: str,
+        version: Any,
+        context_ids: Sequence[Any],
+        answer: str,
+        context_docs: List[Dict[str, Any]]
+    ) -> None:
+        """Cache an answer for later similar questions."""
+        with self._lock:
+            self._entries[next(self._ids)] = _Entry(
+                expires_at=time.monotonic() + self.ttl_seconds,
+                model=model,
+                collection=collection,
+                version=version,
+                vector=self._unit(question_emb),
+                context_ids=tuple(context_ids),
+                answer=answer,
+                context_docs=context_docs
+            )
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
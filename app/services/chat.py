@@ -1,9 +1,13 @@
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple
 import time 
 import openai
 
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.context_builder import ContextBuilder, estimate_tokens
 from app.services.embedder import Embedder
+from app.services.facet_index import FacetIndex, answer_counting_question, match_counting_question
+from app.services.openai_client import OpenAIChatClient
 from app.services.qdrant_wrapper import QdrantWrapper
 from app.services.prometheus import metrics
 from app.logger import logger
@@ -11,8 +15,22 @@ from app.logger import logger
 
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+ERROR_PREFIX = "Error: "
+CONTEXT_FIELDS = ("TITLE OF THE PAPER", "AIM OF THE PAPER", "MAIN FINDINGS OF THE PAPER")
+
 class ChatService:
-    def __init__(self, qdrant: QdrantWrapper, embedder: Embedder, model: str = "gpt-3.5-turbo"):
+    def __init__(
+        self,
+        qdrant: QdrantWrapper,
+        embedder: Embedder,
+        model: str = "gpt-3.5-turbo",
+        payload_fields: Optional[Sequence[str]] = CONTEXT_FIELDS,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        facet_index: Optional[FacetIndex] = None,
+        facet_aliases: Sequence[Tuple[str, str]] = (),
+        context_builder: Optional[ContextBuilder] = None,
+        client: Optional[OpenAIChatClient] = None
+    ):
         """
         Initialize the ChatService.
 
@@ -20,16 +38,43 @@ class ChatService:
             qdrant (QdrantWrapper): Wrapper for the Qdrant vector database.
             embedder (Embedder): Text embedding service.
             model (str): OpenAI chat model to use. Defaults to 'gpt-3.5-turbo'.
+            payload_fields (Optional[Sequence[str]]): Payload fields retrieved for the context. None fetches all fields.
+            answer_cache (Optional[SemanticAnswerCache]): Shared cache of answers to similar questions.
+            facet_index (Optional[FacetIndex]): Answers counting questions exactly, without retrieval or the LLM.
+            facet_aliases (Sequence[Tuple[str, str]]): (phrase, field) pairs used to recognize facet fields in questions.
+            context_builder (Optional[ContextBuilder]): Fits the context into a token budget. None includes every retrieved paper in full.
+            client (Optional[OpenAIChatClient]): Shared OpenAI client with timeouts, retries and concurrency limits.
+                Defaults to a client of this service's own.
         """
         self.qdrant = qdrant
         self.embedder = embedder
         self.model = model
+        self.payload_fields = payload_fields
+        self.answer_cache = answer_cache
+        self.facet_index = facet_index
+        self.facet_aliases = tuple(facet_aliases)
+        self.context_builder = context_builder
+        self.client = client or OpenAIChatClient(install_session=False)
+
+    def _answer_from_facets(self, question: str) -> Optional[str]:
+        """Answer a counting question from the facet index, or return None if it is not one."""
+        if self.facet_index is None or not len(self.facet_index):
+            return None
+        query = match_counting_question(question, self.facet_index, self.facet_aliases)
+        if query is None:
+            return None
+        labels: Dict[str, str] = {}
+        for alias, field in self.facet_aliases:
+            labels.setdefault(field, alias)
+        metrics.CHAT_FACET_ANSWERS.labels(model=self.model).inc()
+        logger.info(f"Answering counting question from facet index: group_by={query.group_by}, conditions={query.conditions}")
+        return answer_counting_question(query, self.facet_index, labels)
 
     def _embed_query(self, question: str) -> Any:
         """Compute the embedding for a question and record metrics."""
         try:
             logger.info("Embedding query for question.")
-            return self.embedder.embed([question])[0]
+            return self.embedder.embed([question], persist=False)[0]
         except Exception as e:
             metrics.CHAT_ERRORS.labels(model=self.model, stage="embedding").inc()
             logger.exception("Error during embedding")
@@ -39,7 +84,7 @@ class ChatService:
         """Perform a Qdrant search with metrics and logging."""
         try:
             qdrant_start = time.perf_counter()
-            results = self.qdrant.search(query_emb, top_k=top_k)
+            results = self.qdrant.search(query_emb, top_k=top_k, payload_include=self.payload_fields)
             duration = time.perf_counter() - qdrant_start
             metrics.QDRANT_SEARCH_LATENCY.observe(duration)
             logger.info(f"Qdrant search completed in {duration:.3f}s with {len(results)} results")
@@ -51,36 +96,89 @@ class ChatService:
 
     def _build_prompt(self, question: str, results: List[Dict[str, Any]]) -> str:
         """Build the full prompt text for the OpenAI API call."""
-        context_text = self._build_context(results)
+        context_text = self._build_context(results, question)
         return (
             f"Answer the following question based on the provided literature.\n\n"
             f"Literature:\n{context_text}\n\n"
             f"Question: {question}\nAnswer:"
         )
 
+    @staticmethod
+    def _build_messages(prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": "You are a helpful research assistant."},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _record_tokens(self, prompt: str, completion: str, usage: Any = None) -> None:
+        """Export prompt and completion token counts, from the API's usage report when there is one."""
+        if isinstance(usage, dict) and isinstance(usage.get("prompt_tokens"), int):
+            prompt_tokens, completion_tokens = usage["prompt_tokens"], usage.get("completion_tokens", 0)
+        else:
+            # Each chat message adds a few tokens of framing on top of its content.
+            messages = self._build_messages(prompt)
+            prompt_tokens = sum(estimate_tokens(m["content"], self.model) + 4 for m in messages) + 3
+            completion_tokens = estimate_tokens(completion, self.model)
+        metrics.CHAT_PROMPT_TOKENS.labels(model=self.model).observe(prompt_tokens)
+        metrics.CHAT_COMPLETION_TOKENS.labels(model=self.model).observe(completion_tokens)
+        logger.info(f"OpenAI usage: {prompt_tokens} prompt tokens, {completion_tokens} completion tokens")
+
+    def _stream_completion(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """Stream completion text from OpenAI, recording time to first token and total latency."""
+        openai_start = time.perf_counter()
+        first_token = True
+        parts: List[str] = []
+        try:
+            response = self.client.create(
+                model=self.model,
+                messages=self._build_messages(prompt),
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            for chunk in response:
+                text = chunk.choices[0].delta.get("content")
+                if not text:
+                    continue
+                if first_token:
+                    ttft = time.perf_counter() - openai_start
+                    metrics.OPENAI_TTFT.labels(model=self.model).observe(ttft)
+                    logger.info(f"OpenAI first token after {ttft:.3f}s")
+                    first_token = False
+                parts.append(text)
+                yield text
+            duration = time.perf_counter() - openai_start
+            metrics.OPENAI_LATENCY.labels(model=self.model).observe(duration)
+            logger.info(f"OpenAI streamed completion finished in {duration:.3f}s")
+            self._record_tokens(prompt, "".join(parts))
+        except Exception:
+            metrics.CHAT_ERRORS.labels(model=self.model, stage="openai").inc()
+            logger.exception("Error during streamed OpenAI completion")
+            raise
+
     def _generate_answer(self, prompt: str, max_tokens: int) -> str:
         """Send the prompt to OpenAI, record metrics, and return the answer."""
         try:
             openai_start = time.perf_counter()
-            response = openai.ChatCompletion.create(
+            response = self.client.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful research assistant."},
-                    {"role": "user", "content": prompt},
-                ],
+                messages=self._build_messages(prompt),
                 max_tokens=max_tokens,
             )
             duration = time.perf_counter() - openai_start
             metrics.OPENAI_LATENCY.labels(model=self.model).observe(duration)
             logger.info(f"OpenAI completion finished in {duration:.3f}s")
-            return response.choices[0].message.content.strip()
+            answer = response.choices[0].message.content.strip()
+            self._record_tokens(prompt, answer, response.get("usage") if isinstance(response, dict) else None)
+            return answer
         except Exception as e:
             metrics.CHAT_ERRORS.labels(model=self.model, stage="openai").inc()
             logger.exception("Error during OpenAI completion")
-            return f"Error: {e}"
+            return f"{ERROR_PREFIX}{e}"
 
-    def _build_context(self, results: List[Dict[str, Any]]) -> str:
-        """Helper: Build a textual context from Qdrant search results."""
+    def _build_context(self, results: List[Dict[str, Any]], question: str = "") -> str:
+        """Helper: Build a textual context from Qdrant search results, within the token budget if one is set."""
+        if self.context_builder is not None:
+            return self.context_builder.build(question, results)
         context_parts = []
         for r in results:
             payload = r.get("payload", {})
@@ -90,6 +188,28 @@ class ChatService:
             context_parts.append(f"Title: {title}\nAim: {aim}\nFindings: {findings}")
         return "\n\n".join(context_parts)
 
+    def _cache_scope(self) -> Tuple[str, str, Any]:
+        return self.model, self.qdrant.collection_name, self.qdrant.collection_version
+
+    def _lookup_cached_answer(self, query_emb: Any, results: List[Dict[str, Any]]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Return a cached answer for a similar question with the same retrieved context."""
+        if self.answer_cache is None:
+            return None
+        model, collection, version = self._cache_scope()
+        hit = self.answer_cache.lookup(query_emb, model, collection, version, [r.get("id") for r in results])
+        if hit is None:
+            metrics.CHAT_CACHE_MISSES.labels(model=self.model).inc()
+        else:
+            metrics.CHAT_CACHE_HITS.labels(model=self.model).inc()
+        return hit
+
+    def _store_answer(self, query_emb: Any, results: List[Dict[str, Any]], answer: str) -> None:
+        """Cache a successfully generated answer."""
+        if self.answer_cache is None or answer.startswith(ERROR_PREFIX):
+            return
+        model, collection, version = self._cache_scope()
+        self.answer_cache.store(query_emb, model, collection, version, [r.get("id") for r in results], answer, results)
+
     def answer_question(self, question: str, top_k: int = 5, max_tokens: int = 200) -> Dict[str, Any]:
         """
         Answer a user question using retrieved literature and an OpenAI chat model.
@@ -106,13 +226,79 @@ class ChatService:
         total_start = time.perf_counter()
         logger.info(f"Answering question with top_k={top_k}: {question}")
 
+        facet_answer = self._answer_from_facets(question)
+        if facet_answer is not None:
+            metrics.CHAT_LATENCY.labels(model=self.model).observe(time.perf_counter() - total_start)
+            return {"answer": facet_answer, "context_docs": []}
+
         query_emb = self._embed_query(question)
         results = self._search_qdrant(query_emb, top_k)
-        prompt = self._build_prompt(question, results)
-        answer = self._generate_answer(prompt, max_tokens)
+
+        cached = self._lookup_cached_answer(query_emb, results)
+        if cached is not None:
+            answer, results = cached
+        else:
+            prompt = self._build_prompt(question, results)
+            answer = self._generate_answer(prompt, max_tokens)
+            self._store_answer(query_emb, results, answer)
 
         total_duration = time.perf_counter() - total_start
         metrics.CHAT_LATENCY.labels(model=self.model).observe(total_duration)
         logger.info(f"Total ChatService duration: {total_duration:.3f}s")
 
-        return {"answer": answer, "context_docs": results}
\ No newline at end of file
+        return {"answer": answer, "context_docs": results}
+
+    def stream_answer(self, question: str, top_k: int = 5, max_tokens: int = 200) -> Iterator[Dict[str, Any]]:
+        """
+        Answer a user question incrementally.
+
+        Yields a 'context' event with the retrieved documents, then 'token' events as
+        the completion arrives, and finally a 'done' event. OpenAI failures are
+        reported as an 'error' event; embedding and search errors are raised.
+
+        Args:
+            question (str): The user's question.
+            top_k (int): Number of top relevant documents to use for context.
+            max_tokens (int): Max tokens for the OpenAI completion.
+
+        Yields:
+            Dict[str, Any]: Events with a 'type' key.
+        """
+        metrics.CHAT_REQUESTS.labels(model=self.model).inc()
+        total_start = time.perf_counter()
+        logger.info(f"Streaming answer with top_k={top_k}: {question}")
+
+        facet_answer = self._answer_from_facets(question)
+        if facet_answer is not None:
+            yield {"type": "context", "context_docs": []}
+            yield {"type": "token", "text": facet_answer}
+        else:
+            yield from self._stream_rag_answer(question, top_k, max_tokens)
+
+        total_duration = time.perf_counter() - total_start
+        metrics.CHAT_LATENCY.labels(model=self.model).observe(total_duration)
+        logger.info(f"Total streamed ChatService duration: {total_duration:.3f}s")
+        yield {"type": "done"}
+
+    def _stream_rag_answer(self, question: str, top_k: int, max_tokens: int) -> Iterator[Dict[str, Any]]:
+        """Retrieve context and stream the completion as 'context', 'token' and 'error' events."""
+        query_emb = self._embed_query(question)
+        results = self._search_qdrant(query_emb, top_k)
+
+        cached = self._lookup_cached_answer(query_emb, results)
+        if cached is not None:
+            answer, results = cached
+            yield {"type": "context", "context_docs": results}
+            yield {"type": "token", "text": answer}
+        else:
+            yield {"type": "context", "context_docs": results}
+            prompt = self._build_prompt(question, results)
+            parts: List[str] = []
+            try:
+                for text in self._stream_completion(prompt, max_tokens):
+                    parts.append(text)
+                    yield {"type": "token", "text": text}
+            except Exception as e:
+                yield {"type": "error", "message": str(e)}
+            else:
+                self._store_answer(query_emb, results, "".join(parts).strip())
@@ -0,0 +1,203 @@
+from __future__ import annotations
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+import math
+import re
+from app.logger import logger
+from app.services.keyword_index import tokenize
+
+CONTEXT_LABELS = (
+    ('Title', 'TITLE OF THE PAPER'),
+    ('Aim', 'AIM OF THE PAPER'),
+    ('Findings', 'MAIN FINDINGS OF THE PAPER'),
+)
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?;])\s+')
+WORD_PATTERN = re.compile(r'\w+|[^\w\s]')
+ELLIPSIS = ' ...'
+
+_encodings: Dict[str, Any] = {}
+
+
+def _encoding(model: str) -> Any:
+    """tiktoken encoding of a model, or None if tiktoken is not installed."""
+    if model not in _encodings:
+        try:
+            import tiktoken
+        except ImportError:
+            _encodings[model] = None
+        else:
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = tiktoken.get_encoding('cl100k_base')
+    return _encodings[model]
+
+
+def estimate_tokens(text: str, model: str = 'gpt-3.5-turbo') -> int:
+    """Number of tokens the model's tokenizer produces for text.
+
+    Exact when tiktoken is installed. Otherwise estimated as one token per four
+    characters, the average for English with OpenAI tokenizers, but at least one
+    token per word or punctuation mark, which numbers and units often need.
+
+    Args:
+        text: Text to measure.
+        model: OpenAI model whose tokenizer is used.
+
+    Returns:
+        int: Token count.
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(math.ceil(len(text) / 4), len(WORD_PATTERN.findall(text)))
+
+
+def _similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two term sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ContextBuilder:
+    """Builds the literature context of a chat prompt within a token budget.
+
+    Papers are taken in order of retrieval score. Each one is added whole if it
+    fits its share of the budget; otherwise its title is kept and the aim and
+    findings are cut down to the sentences that share the most terms with the
+    question. Papers whose text is a near-duplicate of one already added are
+    skipped, so the budget goes to distinct evidence.
+
+    Attributes:
+        max_tokens: Token budget of the whole context.
+        max_passage_tokens: Token budget of a single paper.
+        duplicate_threshold: Jaccard similarity of term sets above which a paper counts as a duplicate.
+        min_passage_tokens: Papers are not added once less than this is left of the budget.
+        model: OpenAI model whose tokenizer is used to count tokens.
+        fields: (label, payload field) pairs written for each paper, the first one being its title.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        max_passage_tokens: int = 400,
+        duplicate_threshold: float = 0.8,
+        min_passage_tokens: int = 24,
+        model: str = 'gpt-3.5-turbo',
+        fields: Sequence[Tuple[str, str]] = CONTEXT_LABELS
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.max_passage_tokens = max_passage_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.min_passage_tokens = min_passage_tokens
+        self.model = model
+        self.fields = tuple(fields)
+
+    def _tokens(self, text: str) -> int:
+        return estimate_tokens(text, self.model)
+
+    def _field_texts(self, payload: Optional[dict]) -> List[Tuple[str, str]]:
+        texts = []
+        for label, key in self.fields:
+            value = (payload or {}).get(key)
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                continue
+            text = ' '.join(str(value).split())
+            if text:
+                texts.append((label, text))
+        return texts
+
+    def build(self, question: str, results: Sequence[Dict[str, Any]]) -> str:
+        """Assemble the context text for a question from retrieved papers.
+
+        Args:
+            question: User question; its terms rank the sentences of long papers.
+            results: Search results with 'score' and 'payload'.
+
+        Returns:
+            str: One passage per paper, separated by blank lines.
+        """
+        query_terms = frozenset(tokenize(question))
+        ranked = sorted(results, key=lambda r: -(r.get('score') or 0.0))
+        remaining = self.max_tokens
+        passages: List[str] = []
+        seen: List[FrozenSet[str]] = []
+        duplicates = 0
+
+        for result in ranked:
+            if remaining < self.min_passage_tokens:
+                break
+            fields = self._field_texts(result.get('payload'))
+            if not fields:
+                continue
+            terms = frozenset(tokenize(' '.join(text for _, text in fields)))
+            if any(_similarity(terms, other) >= self.duplicate_threshold for other in seen):
+                duplicates += 1
+                continue
+            passage = self._fit(fields, query_terms, min(remaining, self.max_passage_tokens))
+            if not passage:
+                continue
+            passages.append(passage)
+            seen.append(terms)
+            remaining -= self._tokens(passage) + 1
+
+        logger.debug(
+            f"Context: {len(passages)} of {len(results)} papers, {self.max_tokens - remaining} tokens, "
+            f"{duplicates} near-duplicates skipped"
+        )
+        return "\n\n".join(passages)
+
+    def _fit(self, fields: List[Tuple[str, str]], query_terms: FrozenSet[str], allowance: int) -> str:
+        """Write a paper's fields in at most `allowance` tokens, keeping the most query-relevant sentences."""
+        lines = [f"{label}: {text}" for label, text in fields]
+        full = "\n".join(lines)
+        if self._tokens(full) <= allowance:
+            return full
+
+        title = self._truncate(lines[0], allowance)
+        left = allowance - self._tokens(title) - 1
+        candidates = []
+        sentence_counts: Dict[int, int] = {}
+        for position, (label, text) in enumerate(fields[1:], start=1):
+            sentences = SENTENCE_PATTERN.split(text)
+            sentence_counts[position] = len(sentences)
+            for order, sentence in enumerate(sentences):
+                sentence_terms = tokenize(sentence)
+                overlap = len(query_terms.intersection(sentence_terms))
+                relevance = overlap / math.sqrt(len(sentence_terms)) if sentence_terms else 0.0
+                candidates.append((-relevance, position, order, sentence))
+
+        chosen: Dict[int, List[Tuple[int, str]]] = {}
+        for _, position, order, sentence in sorted(candidates):
+            label_cost = 0 if position in chosen else self._tokens(f"{fields[position][0]}: ") + 1
+            cost = self._tokens(sentence) + self._tokens(ELLIPSIS) + label_cost
+            if cost <= left:
+                chosen.setdefault(position, []).append((order, sentence))
+                left -= cost
+            elif not chosen and left > label_cost + self.min_passage_tokens:
+                # Not even the best sentence fits: keep its beginning.
+                cut = self._truncate(sentence, left - label_cost - self._tokens(ELLIPSIS))
+                chosen[position] = [(order, cut)]
+                left = 0
+        lines = [title]
+        for position in sorted(chosen):
+            sentences = [s for _, s in sorted(chosen[position])]
+            omitted = len(sentences) < sentence_counts[position] and not sentences[-1].endswith(ELLIPSIS)
+            lines.append(f"{fields[position][0]}: {' '.join(sentences)}{ELLIPSIS if omitted else ''}")
+        return "\n".join(lines)
+
+    def _truncate(self, text: str, allowance: int) -> str:
+        """Cut text at a word boundary so it fits in `allowance` tokens."""
+        if self._tokens(text) <= allowance:
+            return text
+        words = text.split(' ')
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._tokens(' '.join(words[:middle]) + ELLIPSIS) <= allowance:
+                low = middle
+            else:
+                high = middle - 1
+        return ' '.join(words[:low]) + ELLIPSIS if low else ''
@@ -1,27 +1,66 @@
 from __future__ import annotations
 import io
+import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import IO, Iterator, List, Optional, Union
+
+TEXT_FIELDS = {
+    'TITLE OF THE PAPER', 'YOUR COMPLETE NAME', 'AIM OF THE PAPER',
+    'MAIN FINDINGS OF THE PAPER', 'REFERENCE IN APA FORMAT',
+    'TYPE OF INDOOR ENVIRONMENT', 'NOMINATE ACCORDING TO THE PAPER'
+}
+
 
 class CSVLoader:
     """Load and normalize CSV files for embedding and indexing.
 
     Attributes:
-        csv_bytes: CSV file content in bytes.
+        source: CSV content in bytes, a file path or a binary file object.
         encoding: Encoding of the CSV.
     """
 
-    def __init__(self, csv_bytes: bytes, encoding: str = 'utf-8') -> None:
-        self.csv_bytes = csv_bytes
+    def __init__(self, source: Union[bytes, str, IO[bytes]], encoding: str = 'utf-8') -> None:
+        self.source = source
         self.encoding = encoding
 
+    def _reader_input(self) -> Union[str, IO[bytes]]:
+        if isinstance(self.source, (bytes, bytearray)):
+            return io.BytesIO(self.source)
+        return self.source
+
     def load(self) -> pd.DataFrame:
         """Load CSV and create a textual `document` column for embeddings.
 
         Returns:
             pd.DataFrame: Normalized DataFrame with 'id' and 'document' columns.
         """
-        df = pd.read_csv(io.BytesIO(self.csv_bytes), encoding=self.encoding)
+        df = self._normalize_ids(pd.read_csv(self._reader_input(), encoding=self.encoding))
+        df['document'] = self._build_documents(df, self._text_fields(df))
+        return df
+
+    def iter_chunks(self, chunksize: int = 1000) -> Iterator[pd.DataFrame]:
+        """Stream the CSV as normalized chunks without reading it fully into memory.
+
+        Text fields are resolved on the first chunk and reused for the rest, so every
+        chunk builds its `document` column from the same columns.
+
+        Args:
+            chunksize: Number of rows per chunk.
+
+        Yields:
+            pd.DataFrame: Normalized chunk with 'id' and 'document' columns.
+        """
+        text_fields: Optional[List[str]] = None
+        with pd.read_csv(self._reader_input(), encoding=self.encoding, chunksize=chunksize) as reader:
+            for chunk in reader:
+                df = self._normalize_ids(chunk)
+                if text_fields is None:
+                    text_fields = self._text_fields(df)
+                df['document'] = self._build_documents(df, text_fields)
+                yield df
+
+    def _normalize_ids(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Strip column names and coerce the ID column to integers."""
         df.columns = [c.strip() for c in df.columns]
 
         if 'Id' in df.columns:
@@ -29,20 +68,63 @@ class CSVLoader:
         elif 'id' not in df.columns:
             df['id'] = df.index.astype(str)
 
-        df['id'] = df['id'].apply(self._normalize_id)
-        df['id'] = df['id'].fillna(pd.Series(range(len(df)))).astype(int)
+        df['id'] = self._coerce_ids(df['id'])
+        return df
 
-        text_fields = [c for c in df.columns if c.upper() in {
-            'TITLE OF THE PAPER', 'YOUR COMPLETE NAME', 'AIM OF THE PAPER',
-            'MAIN FINDINGS OF THE PAPER', 'REFERENCE IN APA FORMAT',
-            'TYPE OF INDOOR ENVIRONMENT', 'NOMINATE ACCORDING TO THE PAPER'
-        }]
+    @classmethod
+    def _coerce_ids(cls, ids: pd.Series) -> pd.Series:
+        """Coerce IDs to integers, filling missing ones with the row index.
 
+        Numeric coercion is done column-wise; if any non-null ID is not a finite
+        number the row-wise path is used so errors surface exactly as before.
+        """
+        numeric = pd.to_numeric(ids, errors='coerce').astype(float)
+        if (ids.notna() & ~np.isfinite(numeric)).any():
+            return cls._coerce_ids_rowwise(ids)
+        return np.trunc(numeric.fillna(pd.Series(ids.index, index=ids.index))).astype(int)
+
+    @classmethod
+    def _coerce_ids_rowwise(cls, ids: pd.Series) -> pd.Series:
+        """Reference per-element implementation of `_coerce_ids`."""
+        ids = ids.apply(cls._normalize_id)
+        return ids.fillna(pd.Series(ids.index, index=ids.index)).astype(int)
+
+    @classmethod
+    def _build_documents(cls, df: pd.DataFrame, text_fields: List[str]) -> pd.Series:
+        """Join the non-null text fields of every row into a single document.
+
+        Columns are converted to strings once and concatenated as object arrays.
+        Frames without object columns (where row-wise access would upcast values)
+        or with duplicate column names use the row-wise path.
+        """
+        if not df.columns.is_unique or not any(t == object for t in df.dtypes):
+            return cls._build_documents_rowwise(df, text_fields)
+
+        documents = np.full(len(df), '', dtype=object)
+        filled = np.zeros(len(df), dtype=bool)
+        for col in text_fields:
+            column = df[col]
+            present = column.notna().to_numpy()
+            if not present.any():
+                continue
+            values = (column.astype(str) if column.dtype == object else column.map(str)).to_numpy(dtype=object)
+            joined = np.where(filled, documents + ' \n', documents) + values
+            documents = np.where(present, joined, documents)
+            filled |= present
+        return pd.Series(documents, index=df.index, dtype=object)
+
+    @staticmethod
+    def _build_documents_rowwise(df: pd.DataFrame, text_fields: List[str]) -> pd.Series:
+        """Reference row-wise implementation of `_build_documents`."""
+        return df.apply(lambda row: ' \n'.join(str(row[col]) for col in text_fields if pd.notnull(row[col])), axis=1)
+
+    @staticmethod
+    def _text_fields(df: pd.DataFrame) -> List[str]:
+        """Select the columns concatenated into the `document` column."""
+        text_fields = [c for c in df.columns if c.upper() in TEXT_FIELDS]
         if not text_fields:
             text_fields = [c for c, t in df.dtypes.items() if t == 'object']
-
-        df['document'] = df.apply(lambda row: ' \n'.join(str(row[col]) for col in text_fields if pd.notnull(row[col])), axis=1)
-        return df
+        return text_fields
 
     @staticmethod
     def _normalize_id(val) -> Optional[int]:
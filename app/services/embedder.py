@@ -1,12 +1,38 @@
 from __future__ import annotations
-from typing import Iterable, Optional
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
 import os
+import re
+import threading
 import time
 import numpy as np
-import torch
-from sentence_transformers import SentenceTransformer
 from app.logger import logger
+from app.services.embedding_cache import EmbeddingCache
 from app.services.prometheus import metrics
+from app.startup import startup_phase
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer as _SentenceTransformer
+
+# torch and sentence-transformers take seconds to import, so they are only
+# imported when the model is first loaded (see `_import_backend`).
+SentenceTransformer: Any = None
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+
+def _import_backend() -> Any:
+    """Import torch and SentenceTransformer on first use.
+
+    Returns:
+        The torch module.
+    """
+    global SentenceTransformer
+    import torch
+    if SentenceTransformer is None:
+        from sentence_transformers import SentenceTransformer as model_class
+        SentenceTransformer = model_class
+    torch.set_grad_enabled(False)
+    return torch
 
 
 class Embedder:
@@ -14,52 +40,140 @@ class Embedder:
 
     Attributes:
         model_name: Name of the pre-trained embedding model.
+        cache: Optional embedding cache consulted before running the model.
+        backend: Inference backend, one of 'torch', 'onnx' or 'onnx-int8'.
+        onnx_quantization: ONNX Runtime quantization config used by 'onnx-int8'
+            ('arm64', 'avx2', 'avx512' or 'avx512_vnni').
         _model: Internal SentenceTransformer model instance.
     """
 
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2') -> None:
+    def __init__(
+        self,
+        model_name: str = 'all-MiniLM-L6-v2',
+        cache: Optional[EmbeddingCache] = None,
+        backend: str = 'torch',
+        onnx_quantization: str = 'avx2'
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
         self.model_name = model_name
-        self._model: Optional[SentenceTransformer] = None
+        self.cache = cache
+        self.backend = backend
+        self.onnx_quantization = onnx_quantization
+        self._model: Optional[_SentenceTransformer] = None
+        self._load_lock = threading.Lock()
 
         if "TORCH_DISABLE_METATENSOR" not in os.environ:
             os.environ["TORCH_DISABLE_METATENSOR"] = "1"
-        torch.set_grad_enabled(False)
 
+    @property
+    def cache_namespace(self) -> str:
+        """Key under which embeddings are cached; quantized vectors are kept apart from fp32 ones."""
+        return self.model_name if self.backend == 'torch' else f"{self.model_name}@{self.backend}"
+
+    @property
+    def dimension(self) -> int:
+        """Size of the produced embeddings; loads the model if needed."""
+        self._ensure_model()
+        return int(self._model.get_sentence_embedding_dimension())
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the model is loaded and warmed up."""
+        return self._model is not None
+
+    def preload(self) -> None:
+        """Load and warm up the model ahead of the first request."""
+        self._ensure_model()
 
     def _ensure_model(self) -> None:
         """Load the model if it hasn't been loaded yet."""
-        if self._model is None:
+        if self._model is not None:
+            return
+        with self._load_lock:
+            if self._model is not None:
+                return
             try:
-                logger.info(f"Loading embedding model '{self.model_name}'...")
-                device = 'cuda' if torch.cuda.is_available() else 'cpu'
-                self._model = SentenceTransformer(self.model_name, cache_folder='./models', device=device)
-                self._model.encode(["test"], show_progress_bar=False)
+                logger.info(f"Loading embedding model '{self.model_name}' ({self.backend} backend)...")
+                with startup_phase('model_import'):
+                    torch = _import_backend()
+                with startup_phase('model_load'):
+                    model = self._load_model(torch)
+                with startup_phase('model_warmup'):
+                    model.encode(["test"], show_progress_bar=False)
+                self._model = model
                 logger.info("Model loaded successfully")
             except Exception as e:
                 metrics.EMBEDDING_ERRORS.labels(model_name=self.model_name).inc()
                 logger.exception(f"Failed to load model '{self.model_name}': {e}")
-                metrics.EMBEDDING_ERRORS.labels(model_name=self.model_name).inc()
                 raise
 
-    def embed(self, texts: Iterable[str], batch_size: int = 32) -> np.ndarray:
+    def _load_model(self, torch: Any) -> _SentenceTransformer:
+        """Instantiate the SentenceTransformer for the configured backend."""
+        if self.backend == 'torch':
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            return SentenceTransformer(self.model_name, cache_folder='./models', device=device)
+        if self.backend == 'onnx':
+            return SentenceTransformer(self.model_name, cache_folder='./models', device='cpu', backend='onnx')
+        return self._load_quantized_onnx()
+
+    def _load_quantized_onnx(self) -> _SentenceTransformer:
+        """Load the int8 ONNX model, exporting it under ./models on first use.
+
+        The fp32 ONNX model is saved to a local directory together with the
+        tokenizer and pooling config, then dynamically quantized next to it.
+        """
+        from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+        local_dir = os.path.join('./models', re.sub(r'[^A-Za-z0-9_.-]+', '_', self.model_name) + '-onnx')
+        file_name = f"onnx/model_qint8_{self.onnx_quantization}.onnx"
+        if not os.path.exists(os.path.join(local_dir, file_name)):
+            logger.info(f"Exporting int8 ONNX model ({self.onnx_quantization}) to {local_dir}")
+            fp32 = SentenceTransformer(self.model_name, cache_folder='./models', device='cpu', backend='onnx')
+            fp32.save(local_dir)
+            export_dynamic_quantized_onnx_model(fp32, self.onnx_quantization, local_dir)
+        return SentenceTransformer(local_dir, device='cpu', backend='onnx', model_kwargs={'file_name': file_name})
+
+    def embed(self, texts: Iterable[str], batch_size: int = 32, persist: bool = True) -> np.ndarray:
         """Compute embeddings for a list of texts.
 
+        When a cache is configured, only texts that are not cached yet are
+        sent to the model.
+
         Args:
             texts: Iterable of strings to embed.
             batch_size: Number of texts per batch.
+            persist: Write new embeddings to the on-disk cache tier as well as
+                to memory; False for one-off texts such as search queries.
 
         Returns:
             np.ndarray: Array of shape (n_texts, embedding_dim) with float32 values.
         """
-        self._ensure_model()
         texts_list = list(texts)
+        if self.cache is None or not texts_list:
+            return self._encode(texts_list, batch_size)
+
+        vectors = self.cache.get_many(self.cache_namespace, texts_list)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        logger.info(f"Embedding cache: {len(texts_list) - len(missing)} hits, {len(missing)} misses")
+
+        if missing:
+            missing_texts = [texts_list[i] for i in missing]
+            fresh = self._encode(missing_texts, batch_size)
+            self.cache.put_many(self.cache_namespace, missing_texts, fresh, persist=persist)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    def _encode(self, texts_list: List[str], batch_size: int) -> np.ndarray:
+        """Run the model over texts and record embedding metrics."""
+        self._ensure_model()
         logger.info(f"Embedding {len(texts_list)} texts (batch_size={batch_size})")
 
         metrics.EMBEDDING_REQUESTS.labels(model_name=self.model_name).inc()
         metrics.CURRENT_EMBEDDING_LOAD.labels(model_name=self.model_name).inc()
 
         start_time = time.perf_counter()
-        logger.info(f"Embedding {len(texts_list)} texts (batch_size={batch_size})")
 
         try:
             embeddings = self._model.encode(
@@ -76,4 +190,4 @@ class Embedder:
             logger.exception(f"Error during embedding: {e}")
             raise
         finally:
-            metrics.CURRENT_EMBEDDING_LOAD.labels(model_name=self.model_name).dec()
\ No newline at end of file
+            metrics.CURRENT_EMBEDDING_LOAD.labels(model_name=self.model_name).dec()
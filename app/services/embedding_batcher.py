@@ -0,0 +1,117 @@
+from __future__ import annotations
+from concurrent.futures import Future
+from typing import Iterable, List, Optional, Tuple
+import queue
+import threading
+import time
+import numpy as np
+from app.logger import logger
+from app.services.embedder import Embedder
+from app.services.prometheus import metrics
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent single-text embedding requests into batched model calls.
+
+    Request threads calling `embed([text])` enqueue their text and block on a
+    future. A worker thread collects queued texts for up to `max_wait_ms` or
+    `max_batch_size` items, runs one `Embedder.embed` over all of them and hands
+    every caller its own row. Multi-text calls (e.g. ingestion) bypass the queue.
+    Coalesced texts are queries, so their embeddings are only cached in memory.
+
+    Attributes:
+        embedder: Embedder that performs the batched encoding.
+        max_batch_size: Maximum number of texts encoded in one batch.
+        max_wait_ms: Maximum time the first queued text waits for companions.
+        timeout: Seconds a caller waits for its embedding before giving up.
+    """
+
+    def __init__(self, embedder: Embedder, max_batch_size: int = 32, max_wait_ms: float = 5.0, timeout: float = 30.0) -> None:
+        self.embedder = embedder
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.timeout = timeout
+        self._queue: queue.Queue[Tuple[str, float, Future]] = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        return self.embedder.model_name
+
+    def embed(self, texts: Iterable[str], batch_size: int = 32, persist: bool = True) -> np.ndarray:
+        """Compute embeddings, coalescing single-text calls with concurrent ones.
+
+        Args:
+            texts: Iterable of strings to embed.
+            batch_size: Batch size for calls that bypass the batcher.
+            persist: Whether calls that bypass the batcher write new embeddings
+                to the on-disk cache tier.
+
+        Returns:
+            np.ndarray: Array of shape (n_texts, embedding_dim) with float32 values.
+
+        Raises:
+            concurrent.futures.TimeoutError: If a coalesced text is not embedded within `timeout` seconds.
+        """
+        texts_list = list(texts)
+        if len(texts_list) != 1:
+            return self.embedder.embed(texts_list, batch_size=batch_size, persist=persist)
+
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((texts_list[0], time.perf_counter(), future))
+        return future.result(timeout=self.timeout)[np.newaxis, :]
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread on first use."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[str, float, Future]]:
+        """Block for the first request, then gather more until the batch is full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                self._embed_batch(batch)
+            finally:
+                # Never leave a caller waiting, even if the worker thread is dying.
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError('Batched embedding was interrupted'))
+
+    def _embed_batch(self, batch: List[Tuple[str, float, Future]]) -> None:
+        """Encode one collected batch and resolve the callers' futures."""
+        started = time.perf_counter()
+        model_name = self.embedder.model_name
+        metrics.EMBEDDING_BATCHER_BATCH_SIZE.labels(model_name=model_name).observe(len(batch))
+        for _, enqueued, _ in batch:
+            metrics.EMBEDDING_BATCHER_QUEUE_WAIT.labels(model_name=model_name).observe(started - enqueued)
+
+        try:
+            embeddings = np.asarray(self.embedder.embed(
+                [text for text, _, _ in batch], batch_size=self.max_batch_size, persist=False
+            ))
+        except Exception as e:
+            logger.exception(f"Batched embedding of {len(batch)} queries failed: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), vector in zip(batch, embeddings):
+            future.set_result(vector)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import re
+import threading
+import numpy as np
+from app.logger import logger
+from app.services.file_lock import FileLock
+from app.services.prometheus import metrics
+
+
+class _DiskTier:
+    """Append-only on-disk embedding store for a single model.
+
+    Vectors are kept in a flat float32 file that is memory-mapped for reads,
+    and an index file maps text hashes to row numbers in that file. Appends
+    hold a lock file, so server processes sharing the directory never assign
+    the same rows; entries appended by other processes are picked up on restart.
+
+    Attributes:
+        directory: Directory holding `vectors.f32`, `index.tsv` and `dim`.
+        max_rows: Rows after which the store stops growing; None for no limit.
+    """
+
+    def __init__(self, directory: str, max_rows: Optional[int] = None) -> None:
+        self.directory = directory
+        self.max_rows = max_rows
+        self._vectors_path = os.path.join(directory, 'vectors.f32')
+        self._index_path = os.path.join(directory, 'index.tsv')
+        self._dim_path = os.path.join(directory, 'dim')
+        self._file_lock = FileLock(os.path.join(directory, 'lock'))
+        self._index: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        self._load()
+
+    def _load(self) -> None:
+        """Read the index and map the vectors file if the tier already exists."""
+        if not os.path.exists(self._dim_path):
+            return
+        with open(self._dim_path, 'r', encoding='utf-8') as f:
+            self._dim = int(f.read().strip())
+        if os.path.exists(self._index_path):
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 2:
+                        self._index[parts[0]] = int(parts[1])
+        self._remap()
+        logger.info(f"Loaded {len(self._index)} cached embeddings from {self.directory}")
+
+    def _remap(self) -> None:
+        """Memory-map the vectors file with its current size."""
+        if self._dim is None or not os.path.exists(self._vectors_path):
+            self._vectors = None
+            return
+        rows = os.path.getsize(self._vectors_path) // (4 * self._dim)
+        if rows == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r', shape=(rows, self._dim))
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self._index.get(key)
+        if row is None or self._vectors is None or row >= self._vectors.shape[0]:
+            return None
+        return np.array(self._vectors[row], dtype=np.float32)
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """Append new vectors to the store, skipping keys that are already present.
+
+        Safe to call concurrently with `get`: an index entry only becomes
+        readable once the vectors file is remapped to include its row.
+        """
+        with self._file_lock:
+            new, seen = [], set()
+            for i, key in enumerate(keys):
+                if key not in self._index and key not in seen:
+                    new.append((key, i))
+                    seen.add(key)
+            if not new:
+                return
+            if self._dim is None:
+                if os.path.exists(self._dim_path):
+                    with open(self._dim_path, 'r', encoding='utf-8') as f:
+                        self._dim = int(f.read().strip())
+                else:
+                    self._dim = int(vectors.shape[1])
+                    with open(self._dim_path, 'w', encoding='utf-8') as f:
+                        f.write(str(self._dim))
+            if vectors.shape[1] != self._dim:
+                raise ValueError(f"Cached dimension {self._dim} does not match embeddings of size {vectors.shape[1]}")
+
+            start_row = os.path.getsize(self._vectors_path) // (4 * self._dim) if os.path.exists(self._vectors_path) else 0
+            if self.max_rows is not None:
+                new = new[:max(0, self.max_rows - start_row)]
+                if not new:
+                    return
+            block = np.ascontiguousarray(vectors[[i for _, i in new]], dtype=np.float32)
+            with open(self._vectors_path, 'ab') as f:
+                f.write(block.tobytes())
+            with open(self._index_path, 'a', encoding='utf-8') as f:
+                for offset, (key, _) in enumerate(new):
+                    row = start_row + offset
+                    f.write(f"{key}\t{row}\n")
+                    self._index[key] = row
+            self._remap()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache with an in-memory LRU tier and an on-disk tier.
+
+    Entries are keyed by (model_name, sha256 of the text), so identical documents
+    are only ever encoded once per model, across uploads and restarts.
+
+    Attributes:
+        cache_dir: Root directory for the on-disk tier, or None for memory only.
+        max_memory_items: Capacity of the in-memory LRU tier.
+        max_disk_items: Embeddings per model after which the on-disk tier stops
+            growing; 0 for no limit.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = './embedding_cache',
+        max_memory_items: int = 10000,
+        max_disk_items: int = 0
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self._memory: OrderedDict[Tuple[str, str], np.ndarray] = OrderedDict()
+        self._disk: Dict[str, _DiskTier] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        """Return the content hash used as cache key for a text."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _disk_tier(self, model_name: str) -> Optional[_DiskTier]:
+        if self.cache_dir is None:
+            return None
+        if model_name not in self._disk:
+            safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+            self._disk[model_name] = _DiskTier(
+                os.path.join(self.cache_dir, safe_name), max_rows=self.max_disk_items or None
+            )
+        return self._disk[model_name]
+
+    def _remember(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        """Insert into the LRU tier, evicting the least recently used entries."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            metrics.EMBEDDING_CACHE_EVICTIONS.labels(model_name=key[0]).inc()
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings for texts.
+
+        Args:
+            model_name: Model the embeddings were computed with.
+            texts: Texts to look up.
+
+        Returns:
+            List[Optional[np.ndarray]]: Cached vector per text, None on a miss.
+        """
+        found: List[Optional[np.ndarray]] = []
+        memory_hits = disk_hits = misses = 0
+        with self._lock:
+            disk = self._disk_tier(model_name)
+            for text in texts:
+                key = (model_name, self.text_key(text))
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    memory_hits += 1
+                else:
+                    vector = disk.get(key[1]) if disk is not None else None
+                    if vector is not None:
+                        self._remember(key, vector)
+                        disk_hits += 1
+                    else:
+                        misses += 1
+                found.append(vector)
+
+        metrics.EMBEDDING_CACHE_HITS.labels(model_name=model_name, tier='memory').inc(memory_hits)
+        metrics.EMBEDDING_CACHE_HITS.labels(model_name=model_name, tier='disk').inc(disk_hits)
+        metrics.EMBEDDING_CACHE_MISSES.labels(model_name=model_name).inc(misses)
+        return found
+
+    def put_many(self, model_name: str, texts: Sequence[str], embeddings: np.ndarray, persist: bool = True) -> None:
+        """Store freshly computed embeddings in the memory tier and, if requested, on disk.
+
+        Args:
+            model_name: Model the embeddings were computed with.
+            texts: Texts that were embedded.
+            embeddings: Array of shape (len(texts), dim).
+            persist: Also append them to the on-disk tier; search queries are
+                only kept in memory.
+        """
+        keys = [self.text_key(t) for t in texts]
+        with self._lock:
+            for key, vector in zip(keys, embeddings):
+                self._remember((model_name, key), np.asarray(vector, dtype=np.float32))
+            disk = self._disk_tier(model_name) if persist else None
+        # Lookups must not wait for disk writes or other processes' locks; the tier has its own.
+        if disk is not None:
+            try:
+                disk.put_many(keys, embeddings)
+            except Exception as e:
+                logger.exception(f"Failed to persist embeddings to {disk.directory}: {e}")
@@ -0,0 +1,286 @@
+from __future__ import annotations
+from dataclasses import dataclass, field as dataclass_field
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import json
+import os
+import re
+import threading
+import pandas as pd
+from app.logger import logger
+
+COUNTING_PATTERN = re.compile(r'\b(how many|number of|count of|counts of|how often)\b', re.IGNORECASE)
+# "how many papers", "number of office studies", "how many research papers"
+PAPER_COUNT_PATTERN = re.compile(
+    r'\b(how many|number of|count of|counts of)\s+(?:[\w-]+\s+){0,2}?(papers?|studies|study|articles?|publications?)\b',
+    re.IGNORECASE
+)
+GROUPING_WORDS = r'(?:for each|for every|for various|for different|in each|across|each|per|by)'
+
+
+class FacetIndex:
+    """Counts, ID lists and co-occurrence tables over categorical payload columns.
+
+    Built from the CSVLoader DataFrame at ingestion and updated per point, so
+    aggregate questions ("how many papers per indoor environment?") are
+    answered exactly from memory instead of from a handful of retrieved
+    documents. Multi-select answers can be split into several values with
+    `separator`.
+
+    Attributes:
+        fields: Categorical columns that are indexed.
+        separator: Splits one cell into several values; None keeps cells whole.
+    """
+
+    def __init__(self, fields: Sequence[str], separator: Optional[str] = None) -> None:
+        self.fields = tuple(fields)
+        self.separator = separator or None
+        self._doc_values: Dict[Any, Dict[str, Tuple[str, ...]]] = {}
+        self._ids: Dict[str, Dict[str, Set[Any]]] = {f: {} for f in self.fields}
+        self._pairs: Dict[Tuple[str, str], Dict[Tuple[str, str], int]] = {p: {} for p in combinations(self.fields, 2)}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_values)
+
+    def __contains__(self, doc_id: Any) -> bool:
+        return doc_id in self._doc_values
+
+    def _split(self, value: Any) -> Tuple[str, ...]:
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            return ()
+        parts = str(value).split(self.separator) if self.separator else [str(value)]
+        return tuple(dict.fromkeys(p.strip() for p in parts if p.strip()))
+
+    def add(self, ids: Sequence[Any], rows: Sequence[Dict[str, Any]]) -> None:
+        """Index documents, replacing any previous values of the same ID.
+
+        Args:
+            ids: Point IDs.
+            rows: Column values per ID; columns not in `fields` are ignored.
+        """
+        with self._lock:
+            for doc_id, row in zip(ids, rows):
+                self._remove_one(doc_id)
+                values = {f: self._split(row.get(f)) for f in self.fields}
+                self._doc_values[doc_id] = values
+                self._count(doc_id, values, 1)
+
+    def add_dataframe(self, df: pd.DataFrame, ids: Iterable[Any]) -> None:
+        """Index the facet columns of a CSVLoader DataFrame.
+
+        Args:
+            df: DataFrame with (some of) the facet columns.
+            ids: Point IDs aligned with df's rows.
+        """
+        columns = [f for f in self.fields if f in df.columns]
+        rows = df[columns].to_dict('records') if columns else [{}] * len(df)
+        self.add(list(ids), rows)
+
+    def remove(self, ids: Iterable[Any]) -> None:
+        """Drop documents from the index."""
+        with self._lock:
+            for doc_id in ids:
+                self._remove_one(doc_id)
+
+    def _remove_one(self, doc_id: Any) -> None:
+        values = self._doc_values.pop(doc_id, None)
+        if values is not None:
+            self._count(doc_id, values, -1)
+
+    def _count(self, doc_id: Any, values: Dict[str, Tuple[str, ...]], delta: int) -> None:
+        """Add (delta=1) or remove (delta=-1) a document's values from all tables."""
+        for f, field_values in values.items():
+            for value in field_values:
+                ids = self._ids[f].setdefault(value, set())
+                if delta > 0:
+                    ids.add(doc_id)
+                else:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del self._ids[f][value]
+        for (a, b), table in self._pairs.items():
+            for va in values.get(a, ()):
+                for vb in values.get(b, ()):
+                    count = table.get((va, vb), 0) + delta
+                    if count:
+                        table[(va, vb)] = count
+                    else:
+                        table.pop((va, vb), None)
+
+    def counts(self, field: str, within: Optional[Set[Any]] = None, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Number of documents per value of a field, most frequent first.
+
+        Args:
+            field: Facet field.
+            within: Only count these document IDs.
+            top: Maximum number of values returned.
+
+        Returns:
+            List[Dict[str, Any]]: Items with 'value' and 'count'.
+        """
+        with self._lock:
+            if field not in self._ids:
+                raise KeyError(field)
+            items = [
+                (value, len(ids) if within is None else len(ids & within))
+                for value, ids in self._ids[field].items()
+            ]
+        items = sorted((i for i in items if i[1]), key=lambda i: (-i[1], i[0]))
+        return [{'value': value, 'count': count} for value, count in items[:top]]
+
+    def values(self, field: str) -> List[str]:
+        """Distinct values of a field."""
+        with self._lock:
+            return list(self._ids[field])
+
+    def ids(self, field: str, value: str) -> Set[Any]:
+        """IDs of the documents with the given value."""
+        with self._lock:
+            return set(self._ids[field].get(value, ()))
+
+    def cooccurrence(self, field: str, by: str) -> Dict[str, Dict[str, int]]:
+        """Number of documents per pair of values of two fields.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Counts keyed by a value of `field`, then a value of `by`.
+        """
+        if (field, by) in self._pairs:
+            key, flip = (field, by), False
+        elif (by, field) in self._pairs:
+            key, flip = (by, field), True
+        else:
+            raise KeyError(f"{field} x {by}")
+        table: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for (va, vb), count in self._pairs[key].items():
+                outer, inner = (vb, va) if flip else (va, vb)
+                table.setdefault(outer, {})[inner] = count
+        return table
+
+    def save(self, path: str) -> None:
+        """Write the per-document values to a JSON file; tables are rebuilt on load."""
+        with self._lock:
+            docs = [[doc_id, {f: list(v) for f, v in values.items() if v}] for doc_id, values in self._doc_values.items()]
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fields': list(self.fields), 'docs': docs}, f, default=str)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fields: Sequence[str], separator: Optional[str] = None) -> 'FacetIndex':
+        """Read an index written by `save`, or return an empty one if the file is missing."""
+        index = cls(fields, separator=separator)
+        if not os.path.exists(path):
+            return index
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.exception(f"Failed to read facet index {path}, starting empty: {e}")
+            return index
+        for doc_id, values in data.get('docs', []):
+            values = {f: tuple(values.get(f, ())) for f in index.fields}
+            index._doc_values[doc_id] = values
+            index._count(doc_id, values, 1)
+        logger.info(f"Loaded facet index with {len(index)} documents from {path}")
+        return index
+
+
+@dataclass
+class FacetQuery:
+    """A counting question resolved against the facet index.
+
+    Attributes:
+        group_by: Field whose value distribution is asked for, if any.
+        conditions: Values mentioned in the question, per field.
+    """
+    group_by: Optional[str] = None
+    conditions: Dict[str, List[str]] = dataclass_field(default_factory=dict)
+
+
+def _mentions(question: str, phrase: str) -> bool:
+    return re.search(rf'(?<!\w){re.escape(phrase.lower())}s?(?!\w)', question) is not None
+
+
+def _groups_by(question: str, phrase: str) -> bool:
+    """Whether the question asks for a breakdown by phrase, e.g. "per cleaning method" or "by type of indoor environment"."""
+    pattern = rf'\b{GROUPING_WORDS}\s+(?:the\s+)?(?:type of\s+|kind of\s+)?{re.escape(phrase.lower())}s?(?!\w)'
+    return re.search(pattern, question) is not None
+
+
+def match_counting_question(
+    question: str,
+    index: FacetIndex,
+    aliases: Sequence[Tuple[str, str]] = ()
+) -> Optional[FacetQuery]:
+    """Recognize a question that the facet index can answer exactly.
+
+    Only questions that count papers ("how many papers", "number of
+    studies") or ask for a count broken down by a known field ("how many ...
+    per cleaning method") qualify; other counting questions, such as "how many
+    air changes per hour", are left to retrieval. A field is grouped by when
+    its name or an alias follows "per", "by", "for each" and the like, and
+    values of any field that appear verbatim in a paper count become
+    conditions.
+
+    Args:
+        question: User question.
+        index: Facet index to resolve field values against.
+        aliases: (phrase, field) pairs, e.g. ('cleaning method', 'NOMINATE ACCORDING TO THE PAPER').
+
+    Returns:
+        Optional[FacetQuery]: The resolved query, or None if the facet index cannot answer the question.
+    """
+    if not COUNTING_PATTERN.search(question):
+        return None
+    text = question.lower()
+    query = FacetQuery()
+    phrases = [(field.lower(), field) for field in index.fields] + [(a.lower(), f) for a, f in aliases if f in index.fields]
+    for phrase, field in sorted(phrases, key=lambda p: -len(p[0])):
+        if _groups_by(text, phrase):
+            query.group_by = field
+            break
+    if PAPER_COUNT_PATTERN.search(question):
+        for field in index.fields:
+            matched = [v for v in index.values(field) if len(v) >= 3 and _mentions(text, v)]
+            if matched and field != query.group_by:
+                query.conditions[field] = matched
+    if query.group_by is None and not query.conditions:
+        return None
+    return query
+
+
+def answer_counting_question(query: FacetQuery, index: FacetIndex, labels: Optional[Dict[str, str]] = None) -> str:
+    """Format the exact answer to a resolved counting question.
+
+    Conditions on different fields must all hold; several values of the same
+    field match any of them.
+
+    Args:
+        query: Query from `match_counting_question`.
+        index: Facet index.
+        labels: Human-readable name per field, used in the answer.
+
+    Returns:
+        str: Answer text.
+    """
+    labels = labels or {}
+    within: Optional[Set[Any]] = None
+    described = []
+    for field, values in query.conditions.items():
+        ids = set().union(*(index.ids(field, v) for v in values))
+        within = ids if within is None else within & ids
+        described.append(f"{labels.get(field, field.lower())} {' or '.join(values)}")
+
+    scope = f" with {' and '.join(described)}" if described else ""
+    if query.group_by is None:
+        n = len(within or ())
+        return f"There is 1 paper{scope}." if n == 1 else f"There are {n} papers{scope}."
+
+    counts = index.counts(query.group_by, within=within)
+    total = len(within) if within is not None else len(index)
+    lines = [f"Number of papers{scope} per {labels.get(query.group_by, query.group_by.lower())} ({total} papers in total):"]
+    lines += [f"- {c['value']}: {c['count']}" for c in counts]
+    return "\n".join(lines)
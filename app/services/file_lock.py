@@ -0,0 +1,71 @@
+from __future__ import annotations
+from typing import Optional
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: the lock only covers threads of this process
+    fcntl = None
+
+
+class FileLock:
+    """Exclusive lock held by one thread of one process at a time.
+
+    Threads of this process are serialized by a thread lock; processes that
+    open the same lock file (e.g. gunicorn workers) by `flock` on it. The lock
+    is released by the OS if the holding process dies.
+
+    Attributes:
+        path: Lock file; its directory is created on first use.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd: Optional[int] = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock.
+
+        Args:
+            blocking: Wait until the lock is free; otherwise return at once.
+
+        Returns:
+            bool: Whether the lock was taken.
+        """
+        if not self._thread_lock.acquire(blocking=blocking):
+            return False
+        if fcntl is None:
+            return True
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                self._thread_lock.release()
+                return False
+            except BaseException:
+                os.close(fd)
+                raise
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        self._thread_lock.release()
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
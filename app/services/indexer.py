@@ -0,0 +1,241 @@
+from __future__ import annotations
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import hashlib
+import queue
+import threading
+import time
+import pandas as pd
+from app.logger import logger
+from app.services.embedder import Embedder
+from app.services.facet_index import FacetIndex
+from app.services.keyword_index import KeywordIndex
+from app.services.qdrant_wrapper import QdrantWrapper, FINGERPRINT_FIELD
+
+
+@dataclass
+class IndexSummary:
+    """Counts of what an ingestion run changed in the collection."""
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class Indexer:
+    """Synchronize a Qdrant collection with an uploaded DataFrame.
+
+    Every row gets a fingerprint (hash of its document and payload) that is stored
+    with the point. On re-upload only new or changed rows are embedded and upserted,
+    and points whose IDs disappeared from the upload are deleted.
+
+    Attributes:
+        qdrant: Wrapper of the target collection.
+        embedder: Text embedding service.
+        keyword_index: Optional keyword index kept in sync with the collection.
+        facet_index: Optional facet index kept in sync with the collection.
+    """
+
+    def __init__(
+        self,
+        qdrant: QdrantWrapper,
+        embedder: Embedder,
+        keyword_index: Optional[KeywordIndex] = None,
+        facet_index: Optional[FacetIndex] = None
+    ) -> None:
+        self.qdrant = qdrant
+        self.embedder = embedder
+        self.keyword_index = keyword_index
+        self.facet_index = facet_index
+
+    @property
+    def _side_indexes(self) -> List[Any]:
+        """In-memory indexes updated alongside the vector index."""
+        return [i for i in (self.keyword_index, self.facet_index) if i is not None]
+
+    @staticmethod
+    def fingerprint_rows(df: pd.DataFrame) -> pd.Series:
+        """Compute a content hash per row over all columns except internal ones.
+
+        Args:
+            df (pd.DataFrame): DataFrame produced by CSVLoader.
+
+        Returns:
+            pd.Series: Hex digest per row, aligned with df's index.
+        """
+        columns = sorted(c for c in df.columns if c not in ('id_fixed', FINGERPRINT_FIELD))
+        header = '\x1e'.join(columns)
+        joined = df[columns].astype(str).agg('\x1f'.join, axis=1) if columns else pd.Series('', index=df.index)
+        return joined.map(lambda row: hashlib.sha256(f"{header}\x1d{row}".encode('utf-8')).hexdigest())
+
+    def sync(self, df: pd.DataFrame, incremental: bool = True, delete_missing: bool = True) -> IndexSummary:
+        """Embed and upsert the rows of df that differ from the collection.
+
+        Args:
+            df (pd.DataFrame): DataFrame with 'id' and 'document' columns.
+            incremental (bool): Compare against stored fingerprints. When False every row is re-embedded.
+            delete_missing (bool): Delete points whose IDs are not present in df.
+
+        Returns:
+            IndexSummary: Counts of added, updated, deleted and unchanged rows.
+        """
+        return self.sync_stream([df], incremental=incremental, delete_missing=delete_missing)
+
+    def sync_stream(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        incremental: bool = True,
+        delete_missing: bool = True,
+        queue_size: int = 2,
+        progress: Optional[Callable[[str, int, int], None]] = None
+    ) -> IndexSummary:
+        """Synchronize the collection from a stream of DataFrame chunks.
+
+        Parsing, embedding and upserting run as overlapping stages connected by
+        bounded queues, so at most a few chunks are held in memory at any time and
+        Qdrant writes start as soon as the first chunk is embedded.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Normalized chunks, e.g. from CSVLoader.iter_chunks.
+            incremental (bool): Compare against stored fingerprints. When False every row is re-embedded.
+            delete_missing (bool): Delete points whose IDs are not present in the stream.
+            queue_size (int): Maximum number of chunks buffered between two stages.
+            progress (Optional[Callable[[str, int, int], None]]): Called with the current phase
+                ('fingerprints', 'embedding', 'upserting' or 'deleting'), rows read and rows written so far.
+
+        Returns:
+            IndexSummary: Counts of added, updated, deleted and unchanged rows.
+        """
+        start = time.perf_counter()
+        report = progress or (lambda phase, rows_read, rows_written: None)
+        report('fingerprints', 0, 0)
+        existing = self.qdrant.fetch_fingerprints() if incremental or delete_missing else {}
+        summary = IndexSummary()
+        seen_ids: Set[Any] = set()
+        rows_written = 0
+
+        def embedded_chunks() -> Iterator[Tuple[pd.DataFrame, Any]]:
+            for chunk in _prefetch(chunks, queue_size):
+                changed_df, ids = self._diff_chunk(chunk, existing, incremental, summary)
+                seen_ids.update(ids)
+                report('embedding', len(seen_ids), rows_written)
+                if len(changed_df):
+                    embs = self.embedder.embed(changed_df['document'].tolist())
+                    logger.debug(f"Generated embeddings shape: {embs.shape}")
+                    yield changed_df, embs
+
+        collection_ready = False
+        for changed_df, embs in _prefetch(embedded_chunks(), queue_size):
+            if not collection_ready:
+                self.qdrant.ensure_collection(vector_size=embs.shape[1])
+                collection_ready = True
+            self.qdrant.upsert_dataframe(changed_df, embs)
+            if self._side_indexes:
+                changed_ids = self.qdrant.normalize_ids(changed_df)
+                for side_index in self._side_indexes:
+                    side_index.add_dataframe(changed_df, changed_ids)
+            rows_written += len(changed_df)
+            report('upserting', len(seen_ids), rows_written)
+
+        if delete_missing:
+            removed = set(existing.keys()) - seen_ids
+            if removed:
+                report('deleting', len(seen_ids), rows_written)
+                self.qdrant.delete_ids(sorted(removed, key=str))
+                for side_index in self._side_indexes:
+                    side_index.remove(removed)
+            summary.deleted = len(removed)
+
+        duration = time.perf_counter() - start
+        logger.info(f"Indexing summary for '{self.qdrant.collection_name}' in {duration:.3f}s: {summary.as_dict()}")
+        return summary
+
+    def _diff_chunk(
+        self,
+        df: pd.DataFrame,
+        existing: Dict[Any, Optional[str]],
+        incremental: bool,
+        summary: IndexSummary
+    ) -> Tuple[pd.DataFrame, List[Any]]:
+        """Fingerprint a chunk, update the summary and return the rows that need writing."""
+        df = df.copy()
+        df[FINGERPRINT_FIELD] = self.fingerprint_rows(df)
+        ids = self.qdrant.normalize_ids(df).set_axis(df.index)
+
+        is_known = ids.isin(list(existing.keys()))
+        if incremental:
+            stored = ids.map(lambda pid: existing.get(pid))
+            is_changed = is_known & (stored != df[FINGERPRINT_FIELD])
+            to_write = ~is_known | is_changed
+        else:
+            is_changed = is_known
+            to_write = pd.Series(True, index=df.index)
+
+        for side_index in self._side_indexes:
+            # Rows stored before the side index existed are indexed without re-embedding.
+            unindexed = ~to_write & ~ids.map(lambda pid: pid in side_index).astype(bool)
+            if unindexed.any():
+                side_index.add_dataframe(df[unindexed], ids[unindexed])
+
+        summary.added += int((~is_known).sum())
+        summary.updated += int(is_changed.sum())
+        summary.unchanged += int((~to_write).sum())
+        return df[to_write].reset_index(drop=True), ids.tolist()
+
+
+class _Failure:
+    """Exception raised inside a prefetch thread, handed to the consumer."""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+_END = object()
+
+
+def _prefetch(iterable: Iterable[Any], maxsize: int) -> Iterator[Any]:
+    """Consume an iterable in a background thread through a bounded queue.
+
+    Args:
+        iterable: Source of items; iterated in a worker thread.
+        maxsize: Maximum number of items buffered ahead of the consumer.
+
+    Yields:
+        Items of the iterable, in order. Exceptions from the worker are re-raised.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker() -> None:
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(_Failure(e))
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,270 @@
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
+from typing import Any, Callable, Dict, Optional
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from app.logger import logger
+from app.services.file_lock import FileLock
+from app.services.prometheus import metrics
+
+JOB_STATES = ('queued', 'running', 'succeeded', 'failed')
+
+
+class JobQueueFull(Exception):
+    """Raised when no more ingestion jobs can be queued."""
+
+
+@dataclass
+class IngestionJob:
+    """State and progress of one background ingestion run.
+
+    Attributes:
+        id: Job ID.
+        filename: Name of the uploaded file.
+        collection: Target collection.
+        state: One of JOB_STATES.
+        phase: Latest pipeline phase reported by the indexer, e.g. 'embedding' or 'upserting'.
+        rows_read: Rows parsed and compared with the collection so far.
+        rows_written: Rows embedded and upserted so far.
+        summary: IndexSummary counts once the job succeeded.
+        error: Error message if the job failed.
+    """
+    id: str
+    filename: str
+    collection: str
+    state: str = 'queued'
+    phase: str = 'queued'
+    rows_read: int = 0
+    rows_written: int = 0
+    queued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    summary: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in ('succeeded', 'failed')
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds the job has been running, or ran for once finished."""
+        return (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Job state with elapsed time and row throughput, as served by /jobs/<id>."""
+        body = asdict(self)
+        elapsed = self.elapsed
+        body['elapsed_seconds'] = round(elapsed, 3)
+        body['rows_per_second'] = round(self.rows_read / elapsed, 1) if elapsed > 0 else 0.0
+        return body
+
+
+class IngestionJobManager:
+    """Runs ingestion jobs on a bounded pool of background threads.
+
+    Uploads return as soon as their job is queued; the job function reports
+    progress through `update`. Job state is also written as JSON to `jobs_dir`
+    after every change, so any server process can report a job started by
+    another one. Finished jobs beyond `max_history` are forgotten, oldest first.
+
+    With a `jobs_dir`, a job only starts once it holds one of `max_concurrent`
+    slot lock files there, so the limit holds for all server processes
+    together, and `collection_lock` serializes writers of a collection across
+    processes.
+
+    Attributes:
+        max_concurrent: Jobs running at the same time, in all processes sharing `jobs_dir`.
+        max_queued: Jobs waiting to run; further submissions raise JobQueueFull.
+        max_history: Finished jobs kept for status queries.
+        jobs_dir: Directory for job state and lock files, or None to keep them in memory only.
+        slot_poll_seconds: How often a queued job checks for a free slot held by another process.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 1,
+        max_queued: int = 8,
+        max_history: int = 100,
+        jobs_dir: Optional[str] = None,
+        slot_poll_seconds: float = 0.5
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max_queued
+        self.max_history = max_history
+        self.jobs_dir = jobs_dir or None
+        self.slot_poll_seconds = slot_poll_seconds
+        self._slots = [
+            FileLock(os.path.join(self.jobs_dir, f"slot-{i}.lock")) for i in range(self.max_concurrent)
+        ] if self.jobs_dir else []
+        self._collection_locks: Dict[str, Any] = {}
+        self._jobs: 'OrderedDict[str, IngestionJob]' = OrderedDict()
+        self._events: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='ingest')
+
+    def _count(self, state: str) -> int:
+        return sum(1 for job in self._jobs.values() if job.state == state)
+
+    def submit(self, run: Callable[[IngestionJob], Dict[str, int]], filename: str, collection: str) -> IngestionJob:
+        """Queue an ingestion job.
+
+        Args:
+            run: Does the ingestion and returns its summary counts; called in a worker thread with the job.
+            filename: Name of the uploaded file.
+            collection: Target collection.
+
+        Returns:
+            IngestionJob: The queued job.
+
+        Raises:
+            JobQueueFull: If `max_queued` jobs are already waiting.
+        """
+        with self._lock:
+            if self._count('queued') >= self.max_queued:
+                raise JobQueueFull(f"{self.max_queued} ingestion jobs are already waiting, try again later")
+            job = IngestionJob(id=uuid.uuid4().hex, filename=filename, collection=collection)
+            self._jobs[job.id] = job
+            self._events[job.id] = threading.Event()
+            metrics.INGEST_JOBS_QUEUED.inc()
+        self._persist(job)
+        logger.info(f"Queued ingestion job {job.id} for '{filename}' into '{collection}'")
+        self._executor.submit(self._run, job, run)
+        return job
+
+    def collection_lock(self, collection: str) -> Any:
+        """Lock that writers of a collection hold, shared by all processes using `jobs_dir`."""
+        with self._lock:
+            if collection not in self._collection_locks:
+                if self.jobs_dir:
+                    name = re.sub(r'[^A-Za-z0-9_.-]+', '_', collection)
+                    self._collection_locks[collection] = FileLock(os.path.join(self.jobs_dir, f"collection-{name}.lock"))
+                else:
+                    self._collection_locks[collection] = threading.Lock()
+            return self._collection_locks[collection]
+
+    def _acquire_slot(self, job: IngestionJob) -> Optional[FileLock]:
+        """Wait for a free server-wide job slot; without `jobs_dir` the thread pool is the only limit."""
+        if not self._slots:
+            return None
+        waiting = False
+        while True:
+            for slot in self._slots:
+                if slot.acquire(blocking=False):
+                    return slot
+            if not waiting:
+                self.update(job.id, phase='waiting for a free slot')
+                waiting = True
+            time.sleep(self.slot_poll_seconds)
+
+    def _run(self, job: IngestionJob, run: Callable[[IngestionJob], Dict[str, int]]) -> None:
+        slot = self._acquire_slot(job)
+        metrics.INGEST_JOBS_QUEUED.dec()
+        metrics.INGEST_JOBS_RUNNING.inc()
+        self.update(job.id, state='running', phase='starting', started_at=time.time())
+        try:
+            summary = run(job)
+        except Exception as e:
+            logger.exception(f"Ingestion job {job.id} failed: {e}")
+            self.update(job.id, state='failed', error=str(e), finished_at=time.time())
+        else:
+            self.update(job.id, state='succeeded', phase='done', summary=summary, finished_at=time.time())
+            logger.info(f"Ingestion job {job.id} finished: {summary}")
+        finally:
+            finished = self._events[job.id]
+            try:
+                if slot is not None:
+                    slot.release()
+                if not job.done:
+                    # Interrupted by a BaseException, e.g. SystemExit while the worker shuts down.
+                    self.update(job.id, state='failed', error='Interrupted', finished_at=time.time())
+                metrics.INGEST_JOBS_RUNNING.dec()
+                metrics.INGEST_JOBS_TOTAL.labels(status=job.state).inc()
+                metrics.INGEST_JOB_DURATION.labels(status=job.state).observe(job.elapsed)
+                self._prune()
+            finally:
+                finished.set()
+
+    def update(self, job_id: str, **changes: Any) -> None:
+        """Change fields of a job, e.g. phase and row counts, and persist it."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for name, value in changes.items():
+                setattr(job, name, value)
+        self._persist(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """State of a job, also if it runs in another process.
+
+        Returns:
+            Optional[Dict[str, Any]]: Job fields from `IngestionJob.as_dict`, or None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.as_dict()
+        path = self._path(job_id)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return IngestionJob(**json.load(f)).as_dict()
+        except Exception as e:
+            logger.exception(f"Failed to read ingestion job {job_id}: {e}")
+            return None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> bool:
+        """Block until a job of this process has finished.
+
+        Returns:
+            bool: True if the job finished within the timeout.
+        """
+        event = self._events.get(job_id)
+        return event.wait(timeout) if event is not None else False
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a free worker thread."""
+        with self._lock:
+            return self._count('queued')
+
+    def _path(self, job_id: str) -> Optional[str]:
+        if not self.jobs_dir or not job_id.isalnum():
+            return None
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _persist(self, job: IngestionJob) -> None:
+        path = self._path(job.id)
+        if path is None:
+            return
+        with self._lock:
+            state = asdict(job)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.jobs_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write state of ingestion job {job.id}: {e}")
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond max_history."""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.done]
+            expired = finished[:max(0, len(finished) - self.max_history)]
+            for job_id in expired:
+                del self._jobs[job_id]
+                del self._events[job_id]
+        for job_id in expired:
+            path = self._path(job_id)
+            if path is not None and os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,290 @@
+from __future__ import annotations
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+import json
+import math
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+from app.logger import logger
+from app.services.payload_filter import payload_matches
+from app.services.qdrant_wrapper import QdrantWrapper
+
+# Keeps technical terms such as "pm2.5", "co2", "uv-c" or "h1n1" as single tokens.
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-/][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the this to was were with'.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, keeping compound technical terms together.
+
+    Compound terms are also indexed by their parts, so "uv-c" matches both "uv-c"
+    and "uv", and "pm2.5" matches "pm2.5" and "pm2".
+
+    Args:
+        text: Text to tokenize.
+
+    Returns:
+        List[str]: Terms in order of appearance, without stopwords.
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        if not token.isalnum():
+            terms.extend(p for p in re.split(r'[.\-/]', token) if p and p not in STOPWORDS and not p.isdigit())
+    return terms
+
+
+class KeywordIndex:
+    """In-memory BM25 inverted index over the documents of a collection.
+
+    Postings map each term to the documents containing it with their term
+    frequency, so a query only touches the postings of its own terms.
+    A projection of each document's payload is stored next to it, which lets
+    keyword search answer without a vector index round trip.
+
+    Search scores postings as NumPy arrays over a row snapshot of the index
+    that is built on the first query after a write; term arrays are built
+    lazily and cached until the next write.
+
+    Documents loaded from a file saved before some of the configured fields
+    were stored are stale: they are reported as absent, so the next sync
+    re-indexes them from the CSV, and filters are refused until then.
+
+    Attributes:
+        payload_fields: Payload fields kept for search results.
+        filter_fields: Additional payload fields kept for filtering only.
+        k1: BM25 term frequency saturation.
+        b: BM25 document length normalization.
+    """
+
+    def __init__(
+        self,
+        payload_fields: Sequence[str] = (),
+        k1: float = 1.2,
+        b: float = 0.75,
+        filter_fields: Sequence[str] = ()
+    ) -> None:
+        self.payload_fields = tuple(payload_fields)
+        self.filter_fields = tuple(f for f in filter_fields if f not in self.payload_fields)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Any, int]] = {}
+        self._terms: Dict[Any, Dict[str, int]] = {}
+        self._lengths: Dict[Any, int] = {}
+        self._payloads: Dict[Any, dict] = {}
+        self._stale_ids: Set[Any] = set()
+        self._lock = threading.RLock()
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    @property
+    def _stored_fields(self) -> tuple:
+        return self.payload_fields + self.filter_fields
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: Any) -> bool:
+        return doc_id in self._lengths and doc_id not in self._stale_ids
+
+    def can_filter(self, query_filter: Optional[Dict[str, Any]]) -> bool:
+        """Whether search can apply a filter, i.e. no stored payload lacks the filter fields."""
+        return not query_filter or not self._stale_ids
+
+    def add(self, ids: Sequence[Any], texts: Sequence[str], payloads: Optional[Sequence[dict]] = None) -> None:
+        """Index documents, replacing any previous version with the same ID.
+
+        Args:
+            ids: Point IDs.
+            texts: Document text per ID.
+            payloads: Payload per ID; only `payload_fields` and `filter_fields` are kept.
+        """
+        payloads = payloads if payloads is not None else [{}] * len(ids)
+        with self._lock:
+            self._snapshot = None
+            for doc_id, text, payload in zip(ids, texts, payloads):
+                self._remove_one(doc_id)
+                terms = Counter(tokenize(text or ''))
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+                self._terms[doc_id] = dict(terms)
+                self._lengths[doc_id] = sum(terms.values())
+                self._payloads[doc_id] = {k: payload[k] for k in self._stored_fields if k in payload}
+
+    def add_dataframe(self, df: pd.DataFrame, ids: Iterable[Any]) -> None:
+        """Index the `document` column of a CSVLoader DataFrame.
+
+        Args:
+            df: DataFrame with a 'document' column and payload columns.
+            ids: Point IDs aligned with df's rows.
+        """
+        fields = [c for c in self._stored_fields if c in df.columns]
+        columns = [QdrantWrapper._sanitize_column(df[c]) for c in fields]
+        payloads = [dict(zip(fields, row)) for row in zip(*columns)] if fields else None
+        self.add(list(ids), df['document'].fillna('').astype(str).tolist(), payloads)
+
+    def remove(self, ids: Iterable[Any]) -> None:
+        """Drop documents from the index."""
+        with self._lock:
+            self._snapshot = None
+            for doc_id in ids:
+                self._remove_one(doc_id)
+
+    def _remove_one(self, doc_id: Any) -> None:
+        self._stale_ids.discard(doc_id)
+        terms = self._terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        del self._lengths[doc_id]
+        self._payloads.pop(doc_id, None)
+
+    def search(self, query: str, top_k: int = 5, query_filter: Optional[Dict[str, Any]] = None) -> List[dict]:
+        """Rank documents for a keyword query with BM25.
+
+        Args:
+            query: Keyword query.
+            top_k: Maximum number of results.
+            query_filter: Payload filter from `parse_filter`, over `payload_fields` and `filter_fields`.
+
+        Returns:
+            List[dict]: Results with 'id', 'score' and 'payload', best first.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            if not terms or not self._lengths:
+                return []
+            snapshot = self._get_snapshot()
+            n_docs = len(snapshot['ids'])
+            scores = np.zeros(n_docs, dtype=np.float64)
+            for term in terms:
+                postings = self._term_arrays(snapshot, term)
+                if postings is None:
+                    continue
+                rows, tfs = postings
+                idf = math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+                scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + snapshot['norms'][rows])
+
+            matched = np.flatnonzero(scores)
+            if query_filter:
+                ids = snapshot['ids']
+                keep = [payload_matches(self._payloads.get(ids[row]), query_filter) for row in matched]
+                matched = matched[np.array(keep, dtype=bool)]
+            if len(matched) > top_k:
+                matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+            best = matched[np.lexsort((matched, -scores[matched]))]
+            return [
+                {'id': snapshot['ids'][row], 'score': float(scores[row]), 'payload': self._result_payload(snapshot['ids'][row])}
+                for row in best
+            ]
+
+    def _result_payload(self, doc_id: Any) -> dict:
+        payload = self._payloads.get(doc_id, {})
+        return {k: payload[k] for k in self.payload_fields if k in payload}
+
+    def _get_snapshot(self) -> Dict[str, Any]:
+        """Row numbers and BM25 length norms of the current documents."""
+        if self._snapshot is None:
+            ids = list(self._lengths)
+            lengths = np.fromiter(self._lengths.values(), dtype=np.float64, count=len(ids))
+            avg_length = max(lengths.mean(), 1e-9)
+            self._snapshot = {
+                'ids': ids,
+                'rows': {doc_id: row for row, doc_id in enumerate(ids)},
+                'norms': self.k1 * (1 - self.b + self.b * lengths / avg_length),
+                'terms': {},
+            }
+        return self._snapshot
+
+    def _term_arrays(self, snapshot: Dict[str, Any], term: str) -> Optional[tuple]:
+        """Rows and term frequencies of a term's postings, cached per snapshot."""
+        arrays = snapshot['terms'].get(term)
+        if arrays is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            rows = np.fromiter((snapshot['rows'][d] for d in postings), dtype=np.int64, count=len(postings))
+            tfs = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            arrays = snapshot['terms'][term] = (rows, tfs)
+        return arrays
+
+    def save(self, path: str) -> None:
+        """Write the index to a JSON file, atomically replacing any previous one."""
+        with self._lock:
+            docs = [[doc_id, self._payloads.get(doc_id, {}), terms] for doc_id, terms in self._terms.items()]
+            stale_ids = list(self._stale_ids)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'payload_fields': list(self._stored_fields), 'docs': docs, 'stale_ids': stale_ids}, f, default=str)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        payload_fields: Sequence[str] = (),
+        k1: float = 1.2,
+        b: float = 0.75,
+        filter_fields: Sequence[str] = ()
+    ) -> 'KeywordIndex':
+        """Read an index written by `save`, or return an empty one if the file is missing."""
+        index = cls(payload_fields=payload_fields, k1=k1, b=b, filter_fields=filter_fields)
+        if not os.path.exists(path):
+            return index
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.exception(f"Failed to read keyword index {path}, starting empty: {e}")
+            return index
+        for doc_id, payload, terms in data.get('docs', []):
+            for term, tf in terms.items():
+                index._postings.setdefault(term, {})[doc_id] = tf
+            index._terms[doc_id] = terms
+            index._lengths[doc_id] = sum(terms.values())
+            index._payloads[doc_id] = {k: payload[k] for k in index._stored_fields if k in payload}
+        missing = [f for f in index._stored_fields if f not in data.get('payload_fields', [])]
+        if missing and index._terms:
+            logger.warning(
+                f"Keyword index {path} was saved without fields {missing}; "
+                f"its documents are re-indexed on the next upload"
+            )
+            index._stale_ids = set(index._terms)
+        else:
+            index._stale_ids = set(data.get('stale_ids', [])) & set(index._terms)
+        logger.info(f"Loaded keyword index with {len(index)} documents from {path}")
+        return index
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[dict]], top_k: int, k: int = 60) -> List[dict]:
+    """Fuse several ranked result lists with reciprocal rank fusion.
+
+    Each result contributes 1 / (k + rank) per list it appears in; payloads are
+    taken from the first list that returned the point.
+
+    Args:
+        rankings: Result lists with 'id' and 'payload', best first.
+        top_k: Number of fused results.
+        k: RRF damping constant.
+
+    Returns:
+        List[dict]: Results with 'id', fused 'score' and 'payload', best first.
+    """
+    fused: Dict[Any, dict] = {}
+    for ranking in rankings:
+        for rank, result in enumerate(ranking, start=1):
+            entry = fused.setdefault(result['id'], {'id': result['id'], 'score': 0.0, 'payload': result.get('payload')})
+            entry['score'] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda r: -r['score'])[:top_k]
@@ -0,0 +1,402 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+import pandas as pd
+from app.logger import logger
+from app.services.file_lock import FileLock
+from app.services.payload_filter import payload_matches
+from app.services.prometheus import metrics
+from app.services.qdrant_wrapper import (
+    FINGERPRINT_FIELD, QdrantWrapper, bump_collection_version, get_collection_version
+)
+
+
+class NumpyVectorIndex:
+    """In-process exact vector index with the interface of QdrantWrapper.
+
+    Unit-normalized vectors are appended to a float32 file that is memory-mapped
+    for search, so a query is one matrix-vector product plus `argpartition`.
+    Points are described by an append-only JSON lines log (row, ID and payload,
+    or a deletion); updated and deleted rows become tombstones that are dropped
+    when the files are compacted. Scores are cosine similarities, as with the
+    default Qdrant distance. Writes hold a lock file in the collection
+    directory, so server processes sharing it append to distinct rows.
+
+    Attributes:
+        collection_name: Name of the collection, also its directory name.
+        directory: Directory holding `vectors.f32`, `points.jsonl` and `dim`.
+        versions_dir: Directory of collection version stamps shared by all
+            server processes; None keeps the version per process.
+    """
+
+    def __init__(self, index_dir: str = './vector_index', collection_name: str = 'papers_poc',
+                 versions_dir: Optional[str] = None) -> None:
+        self.collection_name = collection_name
+        self.versions_dir = versions_dir
+        self.directory = os.path.join(index_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', collection_name))
+        self._vectors_path = os.path.join(self.directory, 'vectors.f32')
+        self._points_path = os.path.join(self.directory, 'points.jsonl')
+        self._dim_path = os.path.join(self.directory, 'dim')
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(os.path.join(self.directory, 'lock'))
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: List[Any] = []
+        self._payloads: List[Optional[dict]] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_of: Dict[Any, int] = {}
+        self._load()
+
+    @property
+    def collection_version(self) -> int:
+        """Counter bumped on every write to the collection, shared by processes through `versions_dir`."""
+        return get_collection_version(self.collection_name, self.versions_dir)
+
+    @staticmethod
+    def normalize_ids(df: pd.DataFrame, id_column: str = 'id') -> pd.Series:
+        return QdrantWrapper.normalize_ids(df, id_column=id_column)
+
+    def ping(self) -> bool:
+        return True
+
+    def _load(self) -> None:
+        """Replay the points log and map the vectors file if the collection exists."""
+        if not os.path.exists(self._dim_path):
+            return
+        with open(self._dim_path, 'r', encoding='utf-8') as f:
+            self._dim = int(f.read().strip())
+        entries = []
+        if os.path.exists(self._points_path):
+            with open(self._points_path, 'r', encoding='utf-8') as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        rows = [e['row'] for e in entries if 'row' in e]
+        self._grow(max([self._stored_rows()] + [r + 1 for r in rows]))
+        for entry in entries:
+            self._apply(entry)
+        self._remap()
+        logger.info(f"Loaded {len(self._row_of)} points of collection '{self.collection_name}' from {self.directory}")
+
+    def _reload(self) -> None:
+        """Drop the in-memory state and replay the files, including other processes' writes."""
+        self._dim, self._vectors = None, None
+        self._ids, self._payloads, self._row_of = [], [], {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._load()
+
+    def _stored_rows(self) -> int:
+        """Number of vectors in the vectors file."""
+        if self._dim is None or not os.path.exists(self._vectors_path):
+            return 0
+        return os.path.getsize(self._vectors_path) // (4 * self._dim)
+
+    def _grow(self, n_rows: int) -> None:
+        """Extend the per-row state to n_rows rows."""
+        extra = n_rows - len(self._alive)
+        if extra > 0:
+            self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+            self._ids.extend([None] * extra)
+            self._payloads.extend([None] * extra)
+
+    def _apply(self, entry: dict) -> None:
+        """Apply one points log entry to the in-memory state."""
+        if 'delete' in entry:
+            row = self._row_of.pop(entry['delete'], None)
+            if row is not None:
+                self._alive[row] = False
+                self._payloads[row] = None
+            return
+        row = entry['row']
+        previous = self._row_of.get(entry['id'])
+        if previous is not None:
+            self._alive[previous] = False
+            self._payloads[previous] = None
+        self._ids[row] = entry['id']
+        self._payloads[row] = entry['payload']
+        self._alive[row] = True
+        self._row_of[entry['id']] = row
+
+    def _remap(self) -> None:
+        """Memory-map the vectors file with its current size."""
+        rows = self._stored_rows()
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode='r', shape=(rows, self._dim)) if rows else None
+
+    def list_collections(self) -> List[str]:
+        """Return the names of all collections stored next to this one."""
+        index_dir = os.path.dirname(self.directory)
+        if not os.path.isdir(index_dir):
+            return []
+        return sorted(name for name in os.listdir(index_dir) if os.path.exists(os.path.join(index_dir, name, 'dim')))
+
+    def collection_info(self) -> Optional[Dict[str, Any]]:
+        """Describe the collection, or return None if it does not exist.
+
+        Returns:
+            Optional[Dict[str, Any]]: 'vector_size' and 'points_count'.
+        """
+        with self._lock:
+            if self._dim is None:
+                return None
+            return {'vector_size': self._dim, 'points_count': len(self._row_of)}
+
+    def ensure_collection(self, vector_size: int) -> None:
+        """Create the collection directory if it does not exist.
+
+        Args:
+            vector_size (int): Dimensionality of the vectors to be stored.
+        """
+        with self._lock:
+            if self._dim is not None:
+                if self._dim != vector_size:
+                    raise ValueError(f"Collection '{self.collection_name}' stores vectors of size {self._dim}, got {vector_size}")
+                logger.info(f"Collection '{self.collection_name}' already exists")
+                return
+            with self._file_lock:
+                if os.path.exists(self._dim_path):
+                    self._reload()
+                    return self.ensure_collection(vector_size)
+                logger.info(f"Creating local collection '{self.collection_name}' with vector size {vector_size}")
+                with open(self._dim_path, 'w', encoding='utf-8') as f:
+                    f.write(str(vector_size))
+                self._dim = vector_size
+
+    def upsert_dataframe(self, df: pd.DataFrame, embeddings: np.ndarray, id_column: str = 'id', wait: Optional[bool] = None) -> None:
+        """Append rows of a DataFrame and their normalized embeddings to the collection.
+
+        Args:
+            df (pd.DataFrame): DataFrame with data and documents.
+            embeddings (np.ndarray): Embeddings corresponding to the document column.
+            id_column (str): Column name to use as unique IDs.
+            wait (Optional[bool]): Ignored; writes are always applied before returning.
+        """
+        if df.shape[0] != embeddings.shape[0]:
+            raise ValueError('Number of embeddings must match number of rows in df')
+        if df.shape[0] == 0:
+            return
+
+        start = time.perf_counter()
+        ids = self.normalize_ids(df, id_column=id_column).tolist()
+        payloads = QdrantWrapper._build_payloads(df)
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+        with self._lock:
+            if self._dim is None:
+                self.ensure_collection(vectors.shape[1])
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Collection '{self.collection_name}' stores vectors of size {self._dim}, got {vectors.shape[1]}")
+
+            with self._file_lock:
+                first_row = self._stored_rows()
+                entries = [{'row': first_row + i, 'id': pid, 'payload': payload} for i, (pid, payload) in enumerate(zip(ids, payloads))]
+                with open(self._vectors_path, 'ab') as f:
+                    f.write(vectors.tobytes())
+                with open(self._points_path, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(e, default=str) + '\n' for e in entries)
+                self._grow(first_row + len(entries))
+                for entry in entries:
+                    self._apply(entry)
+                self._remap()
+                self._maybe_compact()
+
+        metrics.QDRANT_UPSERT_COUNTER.inc(len(ids))
+        metrics.QDRANT_UPSERT_LATENCY.observe(time.perf_counter() - start)
+        metrics.QDRANT_COLLECTION_SIZE.labels(collection=self.collection_name).set(len(self._row_of))
+        bump_collection_version(self.collection_name, self.versions_dir)
+        logger.info(f"Upserted {len(ids)} rows into local collection '{self.collection_name}'")
+
+    def fetch_fingerprints(self, field: str = FINGERPRINT_FIELD) -> Dict[Any, Optional[str]]:
+        """Collect the stored row fingerprint of every point.
+
+        Args:
+            field (str): Payload field holding the fingerprint.
+
+        Returns:
+            Dict[Any, Optional[str]]: Mapping of point ID to fingerprint (None if absent).
+        """
+        with self._lock:
+            return {pid: (self._payloads[row] or {}).get(field) for pid, row in self._row_of.items()}
+
+    def delete_ids(self, ids: Sequence[Any]) -> None:
+        """Delete points by ID from the collection.
+
+        Args:
+            ids (Sequence[Any]): Point IDs to delete.
+        """
+        with self._lock:
+            entries = [{'delete': pid} for pid in ids if pid in self._row_of]
+            if not entries:
+                # Nothing live to remove: keep the collection version so caches stay warm.
+                return
+            with self._file_lock:
+                with open(self._points_path, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(e, default=str) + '\n' for e in entries)
+                for entry in entries:
+                    self._apply(entry)
+                self._maybe_compact()
+        metrics.QDRANT_DELETE_COUNTER.inc(len(entries))
+        metrics.QDRANT_COLLECTION_SIZE.labels(collection=self.collection_name).set(len(self._row_of))
+        bump_collection_version(self.collection_name, self.versions_dir)
+
+    def _maybe_compact(self, min_dead_rows: int = 1024) -> None:
+        """Rewrite the files without tombstones once they outnumber live rows.
+
+        Called with the file lock held. The points log is replayed first, so
+        points that other processes appended are kept.
+        """
+        dead = len(self._alive) - len(self._row_of)
+        if dead < min_dead_rows or dead <= len(self._row_of):
+            return
+        self._reload()
+        dead = len(self._alive) - len(self._row_of)
+        live_rows = np.flatnonzero(self._alive)
+        vectors = np.array(self._vectors[live_rows]) if self._vectors is not None else np.zeros((0, self._dim), np.float32)
+        entries = [{'row': i, 'id': self._ids[row], 'payload': self._payloads[row]} for i, row in enumerate(live_rows.tolist())]
+
+        self._vectors = None
+        with open(self._vectors_path + '.tmp', 'wb') as f:
+            f.write(vectors.tobytes())
+        with open(self._points_path + '.tmp', 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(e, default=str) + '\n' for e in entries)
+        os.replace(self._vectors_path + '.tmp', self._vectors_path)
+        os.replace(self._points_path + '.tmp', self._points_path)
+
+        self._ids, self._payloads, self._row_of = [], [], {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._grow(len(entries))
+        for entry in entries:
+            self._apply(entry)
+        self._remap()
+        logger.info(f"Compacted local collection '{self.collection_name}': dropped {dead} stale rows")
+
+    @staticmethod
+    def _project(payload: Optional[dict], include: Optional[Sequence[str]], exclude: Optional[Sequence[str]]) -> dict:
+        """Apply include/exclude field lists like QdrantWrapper's payload selector."""
+        payload = payload or {}
+        if include:
+            return {k: payload[k] for k in include if k in payload}
+        excluded = set(exclude or ()) | {FINGERPRINT_FIELD}
+        return {k: v for k, v in payload.items() if k not in excluded}
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 5,
+        with_payload: bool = True,
+        payload_include: Optional[Sequence[str]] = None,
+        payload_exclude: Optional[Sequence[str]] = None,
+        query_filter: Optional[Dict[str, Any]] = None
+    ) -> List[dict]:
+        """Exact cosine top-k search over the memory-mapped vectors.
+
+        Args:
+            query_embedding (np.ndarray): Embedding vector for the query.
+            top_k (int): Maximum number of results to return.
+            with_payload (bool): Include payload data in search results.
+            payload_include (Optional[Sequence[str]]): Only return these payload fields.
+            payload_exclude (Optional[Sequence[str]]): Return all payload fields except these.
+            query_filter (Optional[Dict[str, Any]]): Payload filter from `parse_filter`.
+
+        Returns:
+            List[dict]: List of search results with 'id', 'score', and 'payload'.
+        """
+        return self.search_batch(
+            np.asarray(query_embedding, dtype=np.float32).reshape(1, -1), [top_k],
+            with_payload=with_payload, payload_include=payload_include, payload_exclude=payload_exclude,
+            query_filters=[query_filter]
+        )[0]
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        top_ks: Sequence[int],
+        with_payload: bool = True,
+        payload_include: Optional[Sequence[str]] = None,
+        payload_exclude: Optional[Sequence[str]] = None,
+        query_filters: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+    ) -> List[List[dict]]:
+        """Exact cosine top-k for several queries with one matrix-matrix product.
+
+        Filtered-out rows are masked before the top-k selection, so a filtered
+        query still returns up to top_k matching points.
+
+        Args:
+            query_embeddings (np.ndarray): Matrix with one query embedding per row.
+            top_ks (Sequence[int]): Maximum number of results per query.
+            with_payload (bool): Include payload data in search results.
+            payload_include (Optional[Sequence[str]]): Only return these payload fields.
+            payload_exclude (Optional[Sequence[str]]): Return all payload fields except these.
+            query_filters (Optional[Sequence[Optional[Dict[str, Any]]]]): Payload filter per query, or None.
+
+        Returns:
+            List[List[dict]]: Results per query, in input order, each with 'id', 'score' and 'payload'.
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if len(queries) != len(top_ks):
+            raise ValueError('Number of query embeddings must match number of top_k values')
+        query_filters = query_filters if query_filters is not None else [None] * len(top_ks)
+        metrics.QDRANT_SEARCH_COUNTER.inc(len(queries))
+        with metrics.QDRANT_SEARCH_LATENCY.time():
+            with self._lock:
+                # writers update these in place, so search a snapshot
+                vectors, alive = self._vectors, self._alive.copy()
+                ids, payloads = list(self._ids), list(self._payloads)
+                n_live = len(self._row_of)
+            if vectors is None or n_live == 0:
+                return [[] for _ in top_ks]
+
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            scores = (queries / np.where(norms == 0, 1.0, norms)) @ vectors.T
+            scores[:, ~alive[:scores.shape[1]]] = -np.inf
+
+            batches = []
+            for row_scores, top_k, query_filter in zip(scores, top_ks, query_filters):
+                n_candidates = n_live
+                if query_filter:
+                    matching = np.fromiter(
+                        (alive[row] and payload_matches(payloads[row], query_filter) for row in range(len(row_scores))),
+                        dtype=bool, count=len(row_scores)
+                    )
+                    row_scores[~matching] = -np.inf
+                    n_candidates = int(matching.sum())
+                k = min(top_k, n_candidates)
+                if k <= 0:
+                    batches.append([])
+                    continue
+                top = np.argpartition(-row_scores, k - 1)[:k]
+                top = top[np.argsort(-row_scores[top])]
+                batches.append([
+                    {
+                        'id': ids[row],
+                        'score': float(row_scores[row]),
+                        'payload': self._project(payloads[row], payload_include, payload_exclude) if with_payload else None
+                    }
+                    for row in top
+                ])
+            logger.info(f"Local search returned results for {len(batches)} queries")
+            return batches
+
+    def retrieve(
+        self,
+        ids: Sequence[Any],
+        payload_include: Optional[Sequence[str]] = None,
+        payload_exclude: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        """Fetch points by ID with their (optionally projected) payload.
+
+        Args:
+            ids (Sequence[Any]): Point IDs to fetch.
+            payload_include (Optional[Sequence[str]]): Only return these payload fields.
+            payload_exclude (Optional[Sequence[str]]): Return all payload fields except these.
+
+        Returns:
+            List[dict]: List of records with 'id' and 'payload'; unknown IDs are skipped.
+        """
+        with self._lock:
+            rows = [(pid, self._row_of[pid]) for pid in ids if pid in self._row_of]
+            return [{'id': pid, 'payload': self._project(self._payloads[row], payload_include, payload_exclude)} for pid, row in rows]
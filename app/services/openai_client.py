@@ -0,0 +1,258 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional
+import random
+import threading
+import time
+import openai
+import requests
+from app.logger import logger
+from app.services.prometheus import metrics
+
+BREAKER_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+
+class OpenAIUnavailable(Exception):
+    """Raised without calling the API when the circuit is open or no completion slot frees up in time."""
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts, connection errors and 5xx responses are worth retrying."""
+    if isinstance(error, (
+        openai.error.RateLimitError,
+        openai.error.Timeout,
+        openai.error.APIConnectionError,
+        openai.error.ServiceUnavailableError,
+        openai.error.TryAgain,
+    )):
+        return True
+    return isinstance(error, openai.error.APIError) and (error.http_status or 500) >= 500
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds to wait from the Retry-After header of an error response, if any."""
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after') or headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Stops calls to an upstream that keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast. Once `reset_seconds` have passed a single trial call is let
+    through (half-open); its success closes the circuit, its failure opens it
+    again.
+
+    Attributes:
+        failure_threshold: Consecutive failures that open the circuit.
+        reset_seconds: Time the circuit stays open before a trial call.
+        export_state: Report the state in the process-wide breaker state gauge;
+            only set for the breaker shared by the server.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, export_state: bool = False) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.export_state = export_state
+        self._state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        if export_state:
+            metrics.OPENAI_BREAKER_STATE.set(BREAKER_STATES['closed'])
+
+    @property
+    def state(self) -> str:
+        """'closed', 'half_open' or 'open'."""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the open circuit lets a trial call through."""
+        with self._lock:
+            return max(0.0, self._opened_at + self.reset_seconds - time.monotonic()) if self._state == 'open' else 0.0
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning(f"OpenAI circuit breaker: {self._state} -> {state}")
+            self._state = state
+            if self.export_state:
+                metrics.OPENAI_BREAKER_STATE.set(BREAKER_STATES[state])
+
+    def _maybe_half_open(self) -> None:
+        if self._state == 'open' and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._set_state('half_open')
+            self._trial_running = False
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; in the half-open state only one trial call is allowed."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == 'closed':
+                return True
+            if self._state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def release_trial(self) -> None:
+        """Let another trial call through after one that ended without a verdict."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self._set_state('closed')
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == 'half_open' or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state('open')
+
+
+class OpenAIChatClient:
+    """Shared client for OpenAI chat completions.
+
+    One instance is meant to live for the whole process. It bounds the number
+    of completions in flight with a semaphore (callers wait at most
+    `queue_timeout` for a slot), applies connect and read timeouts to every
+    call, retries rate limits and transient errors with jittered exponential
+    backoff (or the server's Retry-After), and fails fast through a circuit
+    breaker while the API keeps failing. All calls share one pooled HTTP
+    session, installed as the openai module's session.
+
+    Attributes:
+        timeout: Read timeout of a call in seconds; for streams, the maximum gap between chunks.
+        connect_timeout: Connect timeout in seconds.
+        max_retries: Retries after the first attempt.
+        backoff_base: Upper bound of the first backoff in seconds; doubled per retry.
+        backoff_max: Longest backoff; longer Retry-After values are not waited for.
+        max_in_flight: Completions running at the same time.
+        queue_timeout: Longest wait for a free slot in seconds.
+        breaker: Circuit breaker guarding the API.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        max_in_flight: int = 8,
+        queue_timeout: float = 10.0,
+        breaker: Optional[CircuitBreaker] = None,
+        install_session: bool = True
+    ) -> None:
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_in_flight = max(1, max_in_flight)
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        if install_session:
+            session = requests.Session()
+            # Retries are done here, with backoff, rather than by urllib3.
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_in_flight, max_retries=0)
+            session.mount('https://', adapter)
+            openai.requestssession = session
+
+    def create(self, model: str, messages: List[Dict[str, str]], max_tokens: int, stream: bool = False) -> Any:
+        """Request a chat completion.
+
+        Args:
+            model: OpenAI chat model.
+            messages: Chat messages.
+            max_tokens: Max tokens of the completion.
+            stream: Return an iterator of chunks instead of the whole response.
+
+        Returns:
+            Any: The completion response, or an iterator of chunks when streaming.
+                The slot is held until the stream is exhausted or closed.
+
+        Raises:
+            OpenAIUnavailable: If the circuit is open or no slot frees up within `queue_timeout`.
+            openai.error.OpenAIError: If the call fails after all retries.
+        """
+        if not self.breaker.allow():
+            metrics.OPENAI_REJECTED.labels(model=model, reason='circuit_open').inc()
+            raise OpenAIUnavailable(f"OpenAI is failing, not calling it for another {self.breaker.retry_in:.0f}s")
+        self._acquire(model)
+        try:
+            response = self._call_with_retries(model, messages=messages, max_tokens=max_tokens, stream=stream)
+        except BaseException:
+            self._release(model)
+            raise
+        if not stream:
+            self._release(model)
+            return response
+        return self._stream(model, response)
+
+    def _acquire(self, model: str) -> None:
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        metrics.OPENAI_QUEUE_WAIT.labels(model=model).observe(time.perf_counter() - start)
+        if not acquired:
+            metrics.OPENAI_REJECTED.labels(model=model, reason='queue_timeout').inc()
+            self.breaker.release_trial()
+            raise OpenAIUnavailable(f"All {self.max_in_flight} OpenAI slots busy for {self.queue_timeout:.0f}s")
+        metrics.OPENAI_IN_FLIGHT.labels(model=model).inc()
+
+    def _release(self, model: str) -> None:
+        metrics.OPENAI_IN_FLIGHT.labels(model=model).dec()
+        self._slots.release()
+
+    def _call_with_retries(self, model: str, **kwargs: Any) -> Any:
+        attempt = 0
+        while True:
+            try:
+                response = openai.ChatCompletion.create(
+                    model=model, request_timeout=(self.connect_timeout, self.timeout), **kwargs
+                )
+            except Exception as e:
+                if not _is_retryable(e):
+                    # The API answered, e.g. with an invalid request error: no verdict on its health.
+                    self.breaker.release_trial()
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if attempt >= self.max_retries or delay > self.backoff_max:
+                    self.breaker.record_failure()
+                    raise
+                attempt += 1
+                metrics.OPENAI_RETRIES.labels(model=model, reason=type(e).__name__).inc()
+                logger.warning(f"OpenAI call failed ({type(e).__name__}: {e}), retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+            else:
+                if not kwargs.get('stream'):
+                    self.breaker.record_success()
+                return response
+
+    def _stream(self, model: str, chunks: Iterator[Any]) -> Iterator[Any]:
+        """Pass chunks through, recording the stream's outcome and releasing its slot at the end."""
+        try:
+            yield from chunks
+        except Exception as e:
+            if _is_retryable(e):
+                self.breaker.record_failure()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            # A stream closed early by the caller gives no verdict on the API.
+            self.breaker.release_trial()
+            self._release(model)
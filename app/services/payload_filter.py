@@ -0,0 +1,96 @@
+from __future__ import annotations
+from typing import Any, Dict, Optional, Sequence
+import json
+import math
+
+RANGE_OPERATORS = ('gt', 'gte', 'lt', 'lte')
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def parse_filter(
+    spec: Any,
+    keyword_fields: Sequence[str],
+    numeric_fields: Sequence[str] = ()
+) -> Optional[Dict[str, Any]]:
+    """Validate a user-supplied payload filter.
+
+    Keyword fields take a single value (exact match) or a list of values
+    (match any). Numeric fields take a number (exact match) or an object with
+    any of 'gt', 'gte', 'lt' and 'lte'. All conditions must hold.
+
+    Args:
+        spec: Mapping of field name to condition, or None.
+        keyword_fields: Fields that accept exact and multi-value matches.
+        numeric_fields: Fields that accept numeric ranges.
+
+    Returns:
+        Optional[Dict[str, Any]]: Normalized filter, or None if spec is empty.
+
+    Raises:
+        ValueError: If spec is malformed or uses a field that is not filterable.
+    """
+    if not spec:
+        return None
+    if not isinstance(spec, dict):
+        raise ValueError("Filter must be an object mapping field names to conditions")
+
+    parsed: Dict[str, Any] = {}
+    for field, condition in spec.items():
+        if field in numeric_fields:
+            if isinstance(condition, dict):
+                if not condition or set(condition) - set(RANGE_OPERATORS) or not all(map(_is_number, condition.values())):
+                    raise ValueError(f"Range on '{field}' must use numeric {', '.join(RANGE_OPERATORS)} bounds")
+                parsed[field] = {op: float(condition[op]) for op in RANGE_OPERATORS if op in condition}
+            elif _is_number(condition):
+                parsed[field] = condition
+            else:
+                raise ValueError(f"Filter on '{field}' must be a number or a range object")
+        elif field in keyword_fields:
+            values = condition if isinstance(condition, list) else [condition]
+            if not values or not all(isinstance(v, (str, int)) and not isinstance(v, bool) for v in values):
+                raise ValueError(f"Filter on '{field}' must be a string, an integer or a non-empty list of them")
+            parsed[field] = values if isinstance(condition, list) else condition
+        else:
+            raise ValueError(f"Field '{field}' is not filterable")
+    return parsed or None
+
+
+def filter_key(query_filter: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Canonical string of a filter, for use in cache keys."""
+    return json.dumps(query_filter, sort_keys=True, default=str) if query_filter else None
+
+
+def _value_matches(value: Any, condition: Any) -> bool:
+    if isinstance(value, list):
+        return any(_value_matches(v, condition) for v in value)
+    if isinstance(condition, dict):
+        if not _is_number(value):
+            return False
+        return all((
+            'gt' not in condition or value > condition['gt'],
+            'gte' not in condition or value >= condition['gte'],
+            'lt' not in condition or value < condition['lt'],
+            'lte' not in condition or value <= condition['lte'],
+        ))
+    if isinstance(condition, list):
+        return value in condition
+    return value == condition
+
+
+def payload_matches(payload: Optional[dict], query_filter: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a parsed filter against a payload, with Qdrant's matching semantics.
+
+    Args:
+        payload: Point payload; list values match if any element matches.
+        query_filter: Filter returned by `parse_filter`.
+
+    Returns:
+        bool: True if every condition holds.
+    """
+    if not query_filter:
+        return True
+    payload = payload or {}
+    return all(field in payload and _value_matches(payload[field], condition) for field, condition in query_filter.items())
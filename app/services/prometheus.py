@@ -1,4 +1,5 @@
-from prometheus_client import REGISTRY
+import os
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
 from prometheus_client import Counter, Histogram, Gauge
 
 
@@ -11,6 +12,11 @@ class metrics:
         'Total number of points upserted into Qdrant', 
         registry=_registry
     )
+    QDRANT_DELETE_COUNTER = Counter(
+        'qdrant_delete_total', 
+        'Total number of points deleted from Qdrant', 
+        registry=_registry
+    )
     QDRANT_SEARCH_COUNTER = Counter(
         'qdrant_search_total', 
         'Total number of search queries to Qdrant', 
@@ -23,13 +29,59 @@ class metrics:
     )
     QDRANT_UPSERT_LATENCY = Histogram(
         'qdrant_upsert_latency_seconds', 
-        'Latency of upsert operations in seconds', 
+        'Latency of upsert batches in seconds', 
+        registry=_registry
+    )
+    QDRANT_UPSERT_RETRIES = Counter(
+        'qdrant_upsert_retries_total', 
+        'Number of upsert batch retries after transient errors', 
+        registry=_registry
+    )
+    QDRANT_UPSERT_BATCH_SIZE = Histogram(
+        'qdrant_upsert_batch_size', 
+        'Number of points per upsert batch', 
+        buckets=(8, 16, 32, 64, 128, 256, 512, 1024, 2048),
         registry=_registry
     )
     QDRANT_COLLECTION_SIZE = Gauge(
         'qdrant_collection_size', 
         'Number of points in Qdrant collection', 
         ['collection'], 
+        registry=_registry,
+        multiprocess_mode='mostrecent'
+    )
+
+    SEARCH_CACHE_HITS = Counter(
+        'search_cache_hits_total', 
+        'Number of search requests served from the result cache', 
+        registry=_registry
+    )
+    SEARCH_CACHE_MISSES = Counter(
+        'search_cache_misses_total', 
+        'Number of search requests that missed the result cache', 
+        registry=_registry
+    )
+    SEARCH_CACHE_SAVED_SECONDS = Counter(
+        'search_cache_saved_seconds_total', 
+        'Embedding and search time saved by result cache hits', 
+        registry=_registry
+    )
+    SEARCH_API_REQUEST_LATENCY = Histogram(
+        'search_api_request_latency_seconds', 
+        'Latency of a /api/search batch request', 
+        registry=_registry
+    )
+    SEARCH_API_BATCH_SIZE = Histogram(
+        'search_api_batch_size', 
+        'Number of queries per /api/search request', 
+        buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+        registry=_registry
+    )
+    SEARCH_MODE_LATENCY = Histogram(
+        'search_mode_latency_seconds', 
+        'Latency of a search by mode (dense, keyword or hybrid)', 
+        ['mode'], 
+        buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
         registry=_registry
     )
 
@@ -58,6 +110,44 @@ class metrics:
         'embedder_in_progress', 
         'Number of embedding operations currently running', 
         ['model_name'], 
+        registry=_registry,
+        multiprocess_mode='livesum'
+    )
+
+    EMBEDDING_CACHE_HITS = Counter(
+        'embedder_cache_hits_total', 
+        'Number of embeddings served from the embedding cache', 
+        ['model_name', 'tier'], 
+        registry=_registry
+    )
+
+    EMBEDDING_CACHE_MISSES = Counter(
+        'embedder_cache_misses_total', 
+        'Number of texts that had to be encoded by the model', 
+        ['model_name'], 
+        registry=_registry
+    )
+
+    EMBEDDING_CACHE_EVICTIONS = Counter(
+        'embedder_cache_evictions_total', 
+        'Number of entries evicted from the in-memory embedding cache', 
+        ['model_name'], 
+        registry=_registry
+    )
+
+    EMBEDDING_BATCHER_BATCH_SIZE = Histogram(
+        'embedder_batcher_batch_size', 
+        'Number of coalesced query texts per batched encode', 
+        ['model_name'], 
+        buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+        registry=_registry
+    )
+
+    EMBEDDING_BATCHER_QUEUE_WAIT = Histogram(
+        'embedder_batcher_queue_wait_seconds', 
+        'Time a query text waited in the micro-batcher queue', 
+        ['model_name'], 
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
         registry=_registry
     )
 
@@ -82,9 +172,145 @@ class metrics:
         registry=_registry
     )
 
+    CHAT_CACHE_HITS = Counter(
+        "chatservice_cache_hits_total", 
+        "Number of chat questions answered from the semantic answer cache", 
+        ["model"], 
+        registry=_registry
+    )
+
+    CHAT_CACHE_MISSES = Counter(
+        "chatservice_cache_misses_total", 
+        "Number of chat questions that missed the semantic answer cache", 
+        ["model"], 
+        registry=_registry
+    )
+
+    CHAT_FACET_ANSWERS = Counter(
+        "chatservice_facet_answers_total", 
+        "Number of counting questions answered exactly from the facet index", 
+        ["model"], 
+        registry=_registry
+    )
+
+    CHAT_PROMPT_TOKENS = Histogram(
+        "chatservice_prompt_tokens", 
+        "Tokens sent to the OpenAI chat model per completion", 
+        ["model"], 
+        buckets=(64, 128, 256, 512, 1024, 1536, 2048, 3072, 4096, 8192, 16384),
+        registry=_registry
+    )
+
+    CHAT_COMPLETION_TOKENS = Histogram(
+        "chatservice_completion_tokens", 
+        "Tokens generated by the OpenAI chat model per completion", 
+        ["model"], 
+        buckets=(16, 32, 64, 128, 256, 512, 1024, 2048),
+        registry=_registry
+    )
+
     OPENAI_LATENCY = Histogram(
         "chatservice_openai_latency_seconds", 
         "Latency of OpenAI API call", 
         ["model"], 
         registry=_registry
-    )
\ No newline at end of file
+    )
+
+    OPENAI_TTFT = Histogram(
+        "chatservice_openai_time_to_first_token_seconds", 
+        "Time from sending a streamed OpenAI request to receiving the first token", 
+        ["model"], 
+        registry=_registry
+    )
+
+    OPENAI_QUEUE_WAIT = Histogram(
+        "chatservice_openai_queue_wait_seconds", 
+        "Time a chat completion waited for a free OpenAI slot", 
+        ["model"], 
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30),
+        registry=_registry
+    )
+
+    OPENAI_IN_FLIGHT = Gauge(
+        "chatservice_openai_in_flight", 
+        "OpenAI chat completions currently running", 
+        ["model"], 
+        registry=_registry,
+        multiprocess_mode='livesum'
+    )
+
+    OPENAI_RETRIES = Counter(
+        "chatservice_openai_retries_total", 
+        "OpenAI calls retried after a rate limit or transient error", 
+        ["model", "reason"], 
+        registry=_registry
+    )
+
+    OPENAI_REJECTED = Counter(
+        "chatservice_openai_rejected_total", 
+        "Chat completions refused without calling OpenAI", 
+        ["model", "reason"], 
+        registry=_registry
+    )
+
+    OPENAI_BREAKER_STATE = Gauge(
+        "chatservice_openai_circuit_state", 
+        "State of the OpenAI circuit breaker: 0 closed, 1 half-open, 2 open", 
+        registry=_registry,
+        multiprocess_mode='livemax'
+    )
+
+    INGEST_JOBS_QUEUED = Gauge(
+        "ingest_jobs_queued", 
+        "Ingestion jobs waiting for a free worker thread", 
+        registry=_registry,
+        multiprocess_mode='livesum'
+    )
+
+    INGEST_JOBS_RUNNING = Gauge(
+        "ingest_jobs_running", 
+        "Ingestion jobs currently running", 
+        registry=_registry,
+        multiprocess_mode='livesum'
+    )
+
+    INGEST_JOBS_TOTAL = Counter(
+        "ingest_jobs_total", 
+        "Finished ingestion jobs", 
+        ["status"], 
+        registry=_registry
+    )
+
+    INGEST_JOB_DURATION = Histogram(
+        "ingest_job_duration_seconds", 
+        "Run time of ingestion jobs, from start to finish", 
+        ["status"], 
+        buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 3600),
+        registry=_registry
+    )
+
+    STARTUP_PHASE_SECONDS = Gauge(
+        "app_startup_phase_seconds", 
+        "Duration of each application startup phase", 
+        ["phase"], 
+        registry=_registry,
+        multiprocess_mode='max'
+    )
+
+
+def exposition_registry() -> CollectorRegistry:
+    """Registry served on /metrics.
+
+    Under a multi-process server (PROMETHEUS_MULTIPROC_DIR set) each worker
+    writes its metrics to files in that directory; a fresh registry with a
+    MultiProcessCollector aggregates all of them, so a scrape sees the whole
+    server no matter which worker answers it.
+
+    Returns:
+        CollectorRegistry: The aggregating registry, or the default one in a single process.
+    """
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
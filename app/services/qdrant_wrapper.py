@@ -1,17 +1,85 @@
 from __future__ import annotations
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, Future, wait as wait_futures, FIRST_COMPLETED
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 import json
+import os
+import random
+import re
+import threading
+import time
 import numpy as np
 import pandas as pd
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qmodels
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from qdrant_client.local.qdrant_local import QdrantLocal
 from app.models import AppConfig
 from dataclasses import dataclass
 from app.logger import logger  
+from app.services.file_lock import FileLock
 from app.services.prometheus import metrics
 
 
 DEFAULT_DISTANCE = qmodels.Distance.COSINE
+FINGERPRINT_FIELD = '_fingerprint'
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+_collection_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()
+_version_file_locks: Dict[str, FileLock] = {}
+
+
+def _version_path(versions_dir: str, collection_name: str) -> str:
+    return os.path.join(versions_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', collection_name) + '.version')
+
+
+def get_collection_version(collection_name: str, versions_dir: Optional[str] = None) -> int:
+    """Return the write counter of a collection, used to key result caches.
+
+    Args:
+        collection_name (str): Name of the collection.
+        versions_dir (Optional[str]): Directory of version stamps shared by all
+            server processes. Without it the counter is kept per process.
+
+    Returns:
+        int: Version of the collection, 0 if it was never written.
+    """
+    if not versions_dir:
+        return _collection_versions.get(collection_name, 0)
+    try:
+        with open(_version_path(versions_dir, collection_name)) as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def bump_collection_version(collection_name: str, versions_dir: Optional[str] = None) -> None:
+    """Advance the write counter of a collection after its contents changed.
+
+    Args:
+        collection_name (str): Name of the collection.
+        versions_dir (Optional[str]): Directory of version stamps shared by all
+            server processes. Without it only this process sees the new version.
+    """
+    if not versions_dir:
+        with _versions_lock:
+            _collection_versions[collection_name] = _collection_versions.get(collection_name, 0) + 1
+        return
+    path = _version_path(versions_dir, collection_name)
+    with _version_file_lock(versions_dir):
+        version = get_collection_version(collection_name, versions_dir) + 1
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(str(version))
+        os.replace(tmp_path, path)
+
+
+def _version_file_lock(versions_dir: str) -> FileLock:
+    with _versions_lock:
+        lock = _version_file_locks.get(versions_dir)
+        if lock is None:
+            lock = _version_file_locks[versions_dir] = FileLock(os.path.join(versions_dir, 'versions.lock'))
+        return lock
 
 @dataclass
 class QdrantConfig:
@@ -19,10 +87,85 @@ class QdrantConfig:
     port: int
     api_key: Optional[str] = None
     prefer_grpc: bool = False
+    upsert_batch_size: int = 128
+    upsert_min_batch_size: int = 16
+    upsert_max_batch_size: int = 1024
+    upsert_max_batch_bytes: int = 8 * 1024 * 1024
+    upsert_target_latency: float = 1.0
+    upsert_workers: int = 4
+    upsert_max_in_flight: int = 8
+    upsert_wait: bool = True
+    upsert_retries: int = 3
+    upsert_backoff: float = 0.5
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    search_hnsw_ef: Optional[int] = None
+    on_disk_vectors: bool = False
+    vector_datatype: str = 'float32'
+    quantization: str = 'none'
+    quantization_always_ram: bool = True
+    search_rescore: bool = True
+    search_oversampling: float = 2.0
+    filter_fields: Tuple[str, ...] = ()
+    numeric_filter_fields: Tuple[str, ...] = ()
 
     @classmethod
     def from_app_config(cls, config: AppConfig) -> 'QdrantConfig':
-        return cls(host=config.qdrant_host, port=config.qdrant_port, api_key=config.qdrant_api_key)
+        return cls(
+            host=config.qdrant_host,
+            port=config.qdrant_port,
+            api_key=config.qdrant_api_key,
+            upsert_batch_size=config.qdrant_upsert_batch_size,
+            upsert_min_batch_size=config.qdrant_upsert_min_batch_size,
+            upsert_max_batch_size=config.qdrant_upsert_max_batch_size,
+            upsert_max_batch_bytes=config.qdrant_upsert_max_batch_bytes,
+            upsert_target_latency=config.qdrant_upsert_target_latency,
+            upsert_workers=config.qdrant_upsert_workers,
+            upsert_max_in_flight=config.qdrant_upsert_max_in_flight,
+            upsert_wait=config.qdrant_upsert_wait,
+            upsert_retries=config.qdrant_upsert_retries,
+            upsert_backoff=config.qdrant_upsert_backoff,
+            hnsw_m=config.qdrant_hnsw_m,
+            hnsw_ef_construct=config.qdrant_hnsw_ef_construct,
+            search_hnsw_ef=config.qdrant_search_hnsw_ef,
+            on_disk_vectors=config.qdrant_on_disk_vectors,
+            vector_datatype=config.qdrant_vector_datatype,
+            quantization=config.qdrant_quantization,
+            quantization_always_ram=config.qdrant_quantization_always_ram,
+            search_rescore=config.qdrant_search_rescore,
+            search_oversampling=config.qdrant_search_oversampling,
+            filter_fields=config.payload_filter_fields,
+            numeric_filter_fields=config.payload_numeric_filter_fields
+        )
+
+
+@dataclass
+class AdaptiveBatchSize:
+    """Batch size controller for upserts.
+
+    The size is halved when a batch is slower than the target latency and doubled
+    when a full batch finishes in under half of it, always staying within the
+    configured bounds. The byte budget per request takes precedence over the
+    minimum size, so rows too large for `min_size` per request go in smaller batches.
+    """
+    size: int
+    min_size: int
+    max_size: int
+    target_latency: float
+    max_bytes: int
+    row_bytes: float = 0.0
+
+    def next_size(self) -> int:
+        cap = self.max_size
+        if self.row_bytes > 0:
+            cap = min(cap, int(self.max_bytes // self.row_bytes))
+        return min(max(self.min_size, self.size), max(1, cap))
+
+    def observe(self, latency: float, batch_len: int) -> None:
+        if latency > self.target_latency:
+            self.size = max(self.min_size, self.size // 2)
+        elif latency < self.target_latency / 2 and batch_len >= self.next_size():
+            self.size = min(self.max_size, self.size * 2)
 
 
 class QdrantWrapper:
@@ -37,30 +180,179 @@ class QdrantWrapper:
         self.config = QdrantConfig.from_app_config(app_config)
         self.collection_name = collection_name or app_config.default_collection
         self.distance = distance
+        self.versions_dir = app_config.vector_index_versions_dir
         self.client = QdrantClient(url=f'http://{self.config.host}:{self.config.port}', api_key=self.config.api_key, prefer_grpc=self.config.prefer_grpc)
+        self.batch_sizer = AdaptiveBatchSize(
+            size=self.config.upsert_batch_size,
+            min_size=self.config.upsert_min_batch_size,
+            max_size=self.config.upsert_max_batch_size,
+            target_latency=self.config.upsert_target_latency,
+            max_bytes=self.config.upsert_max_batch_bytes
+        )
+
+    @property
+    def collection_version(self) -> int:
+        """Counter bumped on every write to the collection, shared by processes through `versions_dir`."""
+        return get_collection_version(self.collection_name, self.versions_dir)
+
+    def _bump_version(self) -> None:
+        bump_collection_version(self.collection_name, self.versions_dir)
+
+    def ping(self) -> bool:
+        """Check that the Qdrant server answers requests.
+
+        Returns:
+            bool: True if the collections list could be fetched.
+        """
+        try:
+            self.client.get_collections()
+            return True
+        except Exception as e:
+            logger.warning(f"Qdrant is not reachable: {e}")
+            return False
+
+    def _vectors_config(self, vector_size: int) -> qmodels.VectorParams:
+        """Vector storage parameters: size, distance, on-disk storage and datatype."""
+        datatype = {
+            'float32': None,
+            'float16': qmodels.Datatype.FLOAT16,
+        }.get(self.config.vector_datatype.lower())
+        if datatype is None and self.config.vector_datatype.lower() != 'float32':
+            raise ValueError(f"Unsupported vector datatype '{self.config.vector_datatype}'")
+        return qmodels.VectorParams(
+            size=vector_size,
+            distance=self.distance,
+            on_disk=self.config.on_disk_vectors or None,
+            datatype=datatype
+        )
+
+    def _hnsw_config(self) -> Optional[qmodels.HnswConfigDiff]:
+        """HNSW graph parameters, or None to keep the server defaults."""
+        if self.config.hnsw_m is None and self.config.hnsw_ef_construct is None:
+            return None
+        return qmodels.HnswConfigDiff(m=self.config.hnsw_m, ef_construct=self.config.hnsw_ef_construct)
+
+    def _quantization_config(self) -> Optional[qmodels.QuantizationConfig]:
+        """Scalar (int8) or binary quantization, or None for full-precision vectors only."""
+        mode = self.config.quantization.lower()
+        always_ram = self.config.quantization_always_ram
+        if mode == 'none':
+            return None
+        if mode == 'scalar':
+            return qmodels.ScalarQuantization(scalar=qmodels.ScalarQuantizationConfig(
+                type=qmodels.ScalarType.INT8, quantile=0.99, always_ram=always_ram
+            ))
+        if mode == 'binary':
+            return qmodels.BinaryQuantization(binary=qmodels.BinaryQuantizationConfig(always_ram=always_ram))
+        raise ValueError(f"Unsupported quantization '{self.config.quantization}', expected none, scalar or binary")
+
+    def _search_params(self) -> Optional[qmodels.SearchParams]:
+        """Search-time HNSW ef and rescoring of quantized candidates."""
+        quantization = None
+        if self.config.quantization.lower() != 'none':
+            quantization = qmodels.QuantizationSearchParams(
+                rescore=self.config.search_rescore,
+                oversampling=self.config.search_oversampling if self.config.search_rescore else None
+            )
+        if self.config.search_hnsw_ef is None and quantization is None:
+            return None
+        return qmodels.SearchParams(hnsw_ef=self.config.search_hnsw_ef, quantization=quantization)
+
+    def list_collections(self) -> List[str]:
+        """Return the names of all collections on the Qdrant server."""
+        return [c.name for c in self.client.get_collections().collections]
+
+    def collection_info(self) -> Optional[Dict[str, Any]]:
+        """Describe the collection, or return None if it does not exist.
+
+        Returns:
+            Optional[Dict[str, Any]]: 'vector_size' (None for named vectors) and exact 'points_count'.
+        """
+        if not self.client.collection_exists(self.collection_name):
+            return None
+        vectors = self.client.get_collection(self.collection_name).config.params.vectors
+        vector_size = vectors.size if isinstance(vectors, qmodels.VectorParams) else None
+        points_count = self.client.count(collection_name=self.collection_name, exact=True).count
+        return {'vector_size': vector_size, 'points_count': points_count}
 
     def ensure_collection(self, vector_size: int) -> None:
         """Create the collection if it does not exist.
 
+        HNSW, on-disk storage, datatype and quantization settings come from the
+        QDRANT section of the config and only apply when the collection is created.
+
         Args:
             vector_size (int): Dimensionality of the vectors to be stored.
         """
-        """Create the collection if it does not exist."""
         try:
             if not self.client.collection_exists(self.collection_name):
-                logger.info(f"Creating collection '{self.collection_name}' with vector size {vector_size}")
+                logger.info(
+                    f"Creating collection '{self.collection_name}' with vector size {vector_size} "
+                    f"(hnsw m={self.config.hnsw_m}, ef_construct={self.config.hnsw_ef_construct}, "
+                    f"datatype={self.config.vector_datatype}, on_disk={self.config.on_disk_vectors}, "
+                    f"quantization={self.config.quantization})"
+                )
                 self.client.recreate_collection(
                     collection_name=self.collection_name,
-                    vectors_config=qmodels.VectorParams(size=vector_size, distance=self.distance)
+                    vectors_config=self._vectors_config(vector_size),
+                    hnsw_config=self._hnsw_config(),
+                    quantization_config=self._quantization_config()
                 )
             else:
                 logger.info(f"Collection '{self.collection_name}' already exists")
+            self.ensure_payload_indexes()
         except Exception as e:
             logger.exception(f"Error ensuring collection '{self.collection_name}': {e}")
             raise
 
-    def _normalize_ids(self, df: pd.DataFrame, id_column: str = 'id') -> pd.Series:
+    @staticmethod
+    def _payload_key(field: str) -> str:
+        """Qdrant key path of a top-level payload field; names with spaces or dots must be quoted."""
+        return field if re.fullmatch(r'[A-Za-z0-9_\-]+', field) else json.dumps(field)
+
+    def ensure_payload_indexes(self) -> None:
+        """Create payload indexes for the configured filterable fields that do not have one.
+
+        Keyword indexes serve exact and multi-value matches, float indexes serve
+        numeric ranges. With indexes in place Qdrant applies filters while
+        traversing the HNSW graph instead of scanning payloads.
+        """
+        schemas = [(f, qmodels.PayloadSchemaType.KEYWORD) for f in self.config.filter_fields]
+        schemas += [(f, qmodels.PayloadSchemaType.FLOAT) for f in self.config.numeric_filter_fields]
+        if not schemas:
+            return
+        existing = self.client.get_collection(self.collection_name).payload_schema or {}
+        for field, schema in schemas:
+            key = self._payload_key(field)
+            if field in existing or key in existing:
+                continue
+            logger.info(f"Creating {schema.value} payload index on '{field}' in '{self.collection_name}'")
+            self.client.create_payload_index(collection_name=self.collection_name, field_name=key, field_schema=schema)
+
+    @classmethod
+    def _build_filter(cls, query_filter: Optional[Dict[str, Any]]) -> Optional[qmodels.Filter]:
+        """Translate a filter from `parse_filter` into a Qdrant filter."""
+        if not query_filter:
+            return None
+        conditions = []
+        for field, condition in query_filter.items():
+            key = cls._payload_key(field)
+            if isinstance(condition, dict):
+                conditions.append(qmodels.FieldCondition(key=key, range=qmodels.Range(**condition)))
+            elif isinstance(condition, list):
+                conditions.append(qmodels.FieldCondition(key=key, match=qmodels.MatchAny(any=condition)))
+            elif isinstance(condition, float):
+                # MatchValue only takes strings, integers and booleans
+                conditions.append(qmodels.FieldCondition(key=key, range=qmodels.Range(gte=condition, lte=condition)))
+            else:
+                conditions.append(qmodels.FieldCondition(key=key, match=qmodels.MatchValue(value=condition)))
+        return qmodels.Filter(must=conditions)
+
+    @staticmethod
+    def normalize_ids(df: pd.DataFrame, id_column: str = 'id') -> pd.Series:
         """Normalize IDs to integer or string suitable for Qdrant. """
+        if df[id_column].dtype.kind in 'iu':
+            return pd.Series(df[id_column].tolist(), name='id_fixed')
         ids_fixed = []
         for idx, pid in enumerate(df[id_column]):
             if isinstance(pid, float):
@@ -76,64 +368,259 @@ class QdrantWrapper:
                 ids_fixed.append(idx)
         return pd.Series(ids_fixed, name='id_fixed')
 
-    def _prepare_payload(self, row: pd.Series) -> dict:
-        """Prepare the payload dictionary for a single DataFrame row.  """
-        payload = row.drop(labels=['document', 'id_fixed']).to_dict()
-        for k, v in payload.items():
-            if isinstance(v, (np.generic,)):
-                payload[k] = v.item()
+    @staticmethod
+    def _sanitize_value(value: Any) -> Any:
+        """Convert a single payload value into a JSON-serializable one."""
+        if value is None or isinstance(value, (str, bool, int)):
+            return value
+        if isinstance(value, float):
+            return None if value != value else value
+        if value is pd.NA or value is pd.NaT:
+            return None
+        if isinstance(value, np.generic):
+            return QdrantWrapper._sanitize_value(value.item())
+        try:
+            json.dumps(value)
+            return value
+        except Exception:
+            return str(value)
+
+    @classmethod
+    def _sanitize_column(cls, column: pd.Series) -> List[Any]:
+        """Convert a payload column to JSON-serializable Python values in one pass.
+
+        Numeric and boolean columns are converted by dtype, NaN becomes None, and only
+        object columns are inspected value by value.
+        """
+        kind = column.dtype.kind
+        if kind in 'iub':
+            return column.tolist()
+        if kind == 'f':
+            return [None if v != v else v for v in column.tolist()]
+        if kind == 'O':
+            return [cls._sanitize_value(v) for v in column.tolist()]
+        return [None if pd.isna(v) else str(v) for v in column.tolist()]
+
+    @classmethod
+    def _build_payloads(cls, df: pd.DataFrame) -> List[dict]:
+        """Build one payload dict per row from sanitized payload columns."""
+        columns = [c for c in df.columns if c not in ('document', 'id_fixed')]
+        if not columns:
+            return [{} for _ in range(len(df))]
+        values = [cls._sanitize_column(df[c]) for c in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
+
+    def _prepare_columns(self, df: pd.DataFrame, embeddings: np.ndarray, id_column: str = 'id') -> Tuple[List[Any], List[dict], np.ndarray]:
+        """Return point IDs, payloads and a contiguous float32 vector matrix for df."""
+        ids = self.normalize_ids(df, id_column=id_column).tolist()
+        payloads = self._build_payloads(df)
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        return ids, payloads, vectors
+
+    @staticmethod
+    def _make_batch(ids: List[Any], payloads: List[dict], vectors: np.ndarray, start: int, end: int) -> qmodels.Batch:
+        return qmodels.Batch(ids=ids[start:end], vectors=vectors[start:end].tolist(), payloads=payloads[start:end])
+
+    def _iter_batches(self, df: pd.DataFrame, embeddings: np.ndarray, id_column: str = 'id', batch_size: int = 128) -> Iterator[qmodels.Batch]:
+        """Convert a DataFrame and embeddings into fixed-size columnar Qdrant batches."""
+        ids, payloads, vectors = self._prepare_columns(df, embeddings, id_column=id_column)
+        for i in range(0, len(ids), batch_size):
+            yield self._make_batch(ids, payloads, vectors, i, i + batch_size)
+
+    def _estimate_row_bytes(self, payloads: List[dict], vectors: np.ndarray, sample: int = 32) -> float:
+        """Estimate the request size of one point from a sample of payloads."""
+        if not payloads:
+            return 0.0
+        payload_bytes = len(json.dumps(payloads[:sample], default=str)) / min(sample, len(payloads))
+        bytes_per_value = 4 if self.config.prefer_grpc else 20
+        return payload_bytes + vectors.shape[1] * bytes_per_value
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Return True for errors worth retrying (connection problems, throttling, 5xx)."""
+        if isinstance(error, UnexpectedResponse):
+            return error.status_code in TRANSIENT_STATUS_CODES
+        return isinstance(error, (ResponseHandlingException, ConnectionError, TimeoutError))
+
+    def _upsert_concurrency(self) -> Tuple[int, int]:
+        """Return (workers, max in-flight batches); in-process clients are not thread-safe and get one of each."""
+        if isinstance(getattr(self.client, '_client', None), QdrantLocal):
+            return 1, 1
+        return max(1, self.config.upsert_workers), max(1, self.config.upsert_max_in_flight)
+
+    def _upsert_batch(self, batch: qmodels.Batch, wait: bool, record: bool = True) -> float:
+        """Upsert one batch, retrying transient errors with exponential backoff and jitter.
+
+        Returns:
+            float: Latency of the successful attempt in seconds.
+        """
+        attempt = 0
+        while True:
+            start = time.perf_counter()
             try:
-                json.dumps(payload[k])
-            except Exception:
-                payload[k] = str(payload[k])
-        return payload
+                self.client.upsert(collection_name=self.collection_name, points=batch, wait=wait)
+                latency = time.perf_counter() - start
+                if record:
+                    metrics.QDRANT_UPSERT_LATENCY.observe(latency)
+                    metrics.QDRANT_UPSERT_BATCH_SIZE.observe(len(batch.ids))
+                    metrics.QDRANT_UPSERT_COUNTER.inc(len(batch.ids))
+                return latency
+            except Exception as e:
+                if attempt >= self.config.upsert_retries or not self._is_transient(e):
+                    raise
+                delay = self.config.upsert_backoff * (2 ** attempt) * (1 + random.random())
+                attempt += 1
+                metrics.QDRANT_UPSERT_RETRIES.inc()
+                logger.warning(f"Transient upsert error ({e}); retry {attempt}/{self.config.upsert_retries} in {delay:.2f}s")
+                time.sleep(delay)
 
-    def _create_points(self, df: pd.DataFrame, embeddings: np.ndarray) -> List[qmodels.PointStruct]:
-        """Convert a DataFrame and embeddings into Qdrant PointStruct objects.  """
-        points = []
-        for idx, row in df.iterrows():
-            point_id = row['id_fixed']
-            payload = self._prepare_payload(row)
-            points.append(qmodels.PointStruct(id=point_id, vector=embeddings[idx].tolist(), payload=payload))
-        return points
+    def upsert_dataframe(self, df: pd.DataFrame, embeddings: np.ndarray, id_column: str = 'id', wait: Optional[bool] = None) -> None:
+        """Upsert a DataFrame into the Qdrant collection in concurrent batches.
 
-    def upsert_dataframe(self, df: pd.DataFrame, embeddings: np.ndarray, id_column: str = 'id') -> None:
-        """Upsert a DataFrame into the Qdrant collection in batches.
+        Batches are sent by a bounded worker pool with at most `upsert_max_in_flight`
+        requests outstanding. Each batch is retried on transient errors, and the
+        batch size adapts to observed latency and payload size. With `wait=False`
+        batches are only acknowledged by Qdrant; the last batch is then re-sent with
+        `wait=True`, which returns once all earlier operations have been applied.
 
         Args:
             df (pd.DataFrame): DataFrame with data and documents.
             embeddings (np.ndarray): Embeddings corresponding to the document column.
             id_column (str): Column name to use as unique IDs.
+            wait (Optional[bool]): Wait for each batch to be applied. Defaults to the configured value.
         """
         if df.shape[0] != embeddings.shape[0]:
             raise ValueError('Number of embeddings must match number of rows in df')
         
         logger.info(f"Upserting {df.shape[0]} rows into collection '{self.collection_name}'")
-        df['id_fixed'] = self._normalize_ids(df, id_column=id_column)
-        points = self._create_points(df, embeddings)
-        batch_size = 128
+        wait = self.config.upsert_wait if wait is None else wait
+        ids, payloads, vectors = self._prepare_columns(df, embeddings, id_column=id_column)
+        self.batch_sizer.row_bytes = self._estimate_row_bytes(payloads, vectors)
 
-        with metrics.QDRANT_UPSERT_LATENCY.time():
-            for i in range(0, len(points), batch_size):
-                batch = points[i:i + batch_size]
-                try:
-                    self.client.upsert(
-                        collection_name=self.collection_name,
-                        points=batch
-                    )
-                    logger.info(f"Upserted batch {i // batch_size + 1} ({len(batch)} points)")
-                    metrics.QDRANT_UPSERT_COUNTER.inc(len(batch))
-                except Exception as e:
-                    logger.exception(f"Error during upsert of batch starting at index {i}: {e}")
-                    raise
+        workers, max_in_flight = self._upsert_concurrency()
+        pending: Dict[Future, Tuple[int, int]] = {}
+        last_batch: Optional[qmodels.Batch] = None
+        start = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                while start < len(ids) or pending:
+                    while start < len(ids) and len(pending) < max_in_flight:
+                        end = min(len(ids), start + self.batch_sizer.next_size())
+                        last_batch = self._make_batch(ids, payloads, vectors, start, end)
+                        pending[pool.submit(self._upsert_batch, last_batch, wait)] = (start, end - start)
+                        start = end
+
+                    done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        offset, batch_len = pending.pop(future)
+                        try:
+                            latency = future.result()
+                        except Exception as e:
+                            logger.exception(f"Error during upsert of batch starting at index {offset}: {e}")
+                            raise
+                        self.batch_sizer.observe(latency, batch_len)
+                        logger.info(f"Upserted {batch_len} points at offset {offset} in {latency:.3f}s")
+            except Exception:
+                for future in pending:
+                    future.cancel()
+                self._bump_version()
+                raise
+
+        if not wait and last_batch is not None:
+            self._upsert_batch(last_batch, wait=True, record=False)
+            logger.info(f"Confirmed asynchronous upsert of {len(ids)} points")
+        self._bump_version()
+
+    def fetch_fingerprints(self, field: str = FINGERPRINT_FIELD, page_size: int = 1024) -> Dict[Any, Optional[str]]:
+        """Scroll the collection and collect the stored row fingerprint of every point.
+
+        Args:
+            field (str): Payload field holding the fingerprint.
+            page_size (int): Number of points fetched per scroll request.
+
+        Returns:
+            Dict[Any, Optional[str]]: Mapping of point ID to fingerprint (None if absent).
+        """
+        if not self.client.collection_exists(self.collection_name):
+            return {}
+
+        fingerprints: Dict[Any, Optional[str]] = {}
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=qmodels.PayloadSelectorInclude(include=[field]),
+                with_vectors=False
+            )
+            for record in records:
+                fingerprints[record.id] = (record.payload or {}).get(field)
+            if offset is None:
+                break
+        logger.info(f"Fetched {len(fingerprints)} fingerprints from collection '{self.collection_name}'")
+        return fingerprints
+
+    def delete_ids(self, ids: Sequence[Any], batch_size: int = 1024) -> None:
+        """Delete points by ID from the collection.
+
+        Args:
+            ids (Sequence[Any]): Point IDs to delete.
+            batch_size (int): Number of IDs per delete request.
+        """
+        ids = list(ids)
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i:i + batch_size]
+            try:
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=qmodels.PointIdsList(points=batch)
+                )
+                metrics.QDRANT_DELETE_COUNTER.inc(len(batch))
+                logger.info(f"Deleted {len(batch)} points from collection '{self.collection_name}'")
+            except Exception as e:
+                logger.exception(f"Error deleting batch starting at index {i}: {e}")
+                raise
+            finally:
+                self._bump_version()
+
+    @staticmethod
+    def _payload_selector(
+        with_payload: bool,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None
+    ) -> Any:
+        """Translate include/exclude field lists into a Qdrant payload selector.
+
+        Internal fields such as the row fingerprint are always excluded.
+        """
+        if not with_payload:
+            return False
+        if include:
+            return qmodels.PayloadSelectorInclude(include=list(include))
+        excluded = list(exclude) if exclude else []
+        if FINGERPRINT_FIELD not in excluded:
+            excluded.append(FINGERPRINT_FIELD)
+        return qmodels.PayloadSelectorExclude(exclude=excluded)
 
-    def search(self, query_embedding: np.ndarray, top_k: int = 5, with_payload: bool = True) -> List[dict]:
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 5,
+        with_payload: bool = True,
+        payload_include: Optional[Sequence[str]] = None,
+        payload_exclude: Optional[Sequence[str]] = None,
+        query_filter: Optional[Dict[str, Any]] = None
+    ) -> List[dict]:
         """Search the Qdrant collection using a query embedding.
 
         Args:
             query_embedding (np.ndarray): Embedding vector for the query.
             top_k (int): Maximum number of results to return.
             with_payload (bool): Include payload data in search results.
+            payload_include (Optional[Sequence[str]]): Only return these payload fields.
+            payload_exclude (Optional[Sequence[str]]): Return all payload fields except these.
+            query_filter (Optional[Dict[str, Any]]): Payload filter from `parse_filter`, applied during the search.
 
         Returns:
             List[dict]: List of search results with 'id', 'score', and 'payload'.
@@ -145,8 +632,10 @@ class QdrantWrapper:
                 hits = self.client.search(
                     collection_name=self.collection_name,
                     query_vector=query_embedding.tolist(),
+                    query_filter=self._build_filter(query_filter),
                     limit=top_k,
-                    with_payload=with_payload
+                    search_params=self._search_params(),
+                    with_payload=self._payload_selector(with_payload, payload_include, payload_exclude)
                 )
                 results = [{'id': h.id, 'score': h.score, 'payload': h.payload} for h in hits]
                 logger.info(f"Search returned {len(results)} results")
@@ -154,3 +643,74 @@ class QdrantWrapper:
         except Exception as e:
             logger.exception(f"Search failed: {e}")
             raise
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        top_ks: Sequence[int],
+        with_payload: bool = True,
+        payload_include: Optional[Sequence[str]] = None,
+        payload_exclude: Optional[Sequence[str]] = None,
+        query_filters: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+    ) -> List[List[dict]]:
+        """Run several searches in one Qdrant request.
+
+        Args:
+            query_embeddings (np.ndarray): Matrix with one query embedding per row.
+            top_ks (Sequence[int]): Maximum number of results per query.
+            with_payload (bool): Include payload data in search results.
+            payload_include (Optional[Sequence[str]]): Only return these payload fields.
+            payload_exclude (Optional[Sequence[str]]): Return all payload fields except these.
+            query_filters (Optional[Sequence[Optional[Dict[str, Any]]]]): Payload filter per query, or None.
+
+        Returns:
+            List[List[dict]]: Results per query, in input order, each with 'id', 'score' and 'payload'.
+        """
+        if len(query_embeddings) != len(top_ks):
+            raise ValueError('Number of query embeddings must match number of top_k values')
+        query_filters = query_filters if query_filters is not None else [None] * len(top_ks)
+        selector = self._payload_selector(with_payload, payload_include, payload_exclude)
+        params = self._search_params()
+        requests = [
+            qmodels.SearchRequest(
+                vector=vector.tolist(), filter=self._build_filter(query_filter), limit=top_k, with_payload=selector, params=params
+            )
+            for vector, top_k, query_filter in zip(np.asarray(query_embeddings, dtype=np.float32), top_ks, query_filters)
+        ]
+        try:
+            logger.info(f"Batch searching collection '{self.collection_name}' with {len(requests)} queries")
+            metrics.QDRANT_SEARCH_COUNTER.inc(len(requests))
+            with metrics.QDRANT_SEARCH_LATENCY.time():
+                batches = self.client.search_batch(collection_name=self.collection_name, requests=requests)
+            return [[{'id': h.id, 'score': h.score, 'payload': h.payload} for h in hits] for hits in batches]
+        except Exception as e:
+            logger.exception(f"Batch search failed: {e}")
+            raise
+
+    def retrieve(
+        self,
+        ids: Sequence[Any],
+        payload_include: Optional[Sequence[str]] = None,
+        payload_exclude: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        """Fetch points by ID with their (optionally projected) payload.
+
+        Args:
+            ids (Sequence[Any]): Point IDs to fetch.
+            payload_include (Optional[Sequence[str]]): Only return these payload fields.
+            payload_exclude (Optional[Sequence[str]]): Return all payload fields except these.
+
+        Returns:
+            List[dict]: List of records with 'id' and 'payload', in the order Qdrant returns them.
+        """
+        try:
+            records = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=list(ids),
+                with_payload=self._payload_selector(True, payload_include, payload_exclude),
+                with_vectors=False
+            )
+            return [{'id': r.id, 'payload': r.payload} for r in records]
+        except Exception as e:
+            logger.exception(f"Retrieve failed for ids {list(ids)}: {e}")
+            raise
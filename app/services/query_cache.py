@@ -0,0 +1,80 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+import re
+import threading
+import time
+from app.services.payload_filter import filter_key
+from app.services.prometheus import metrics
+
+
+class QueryResultCache:
+    """TTL + LRU cache for search results.
+
+    Keys include the collection version, so any write to the collection makes
+    earlier entries unreachable; they then age out through TTL or LRU eviction.
+
+    Attributes:
+        max_items: Maximum number of cached result lists.
+        ttl_seconds: Lifetime of an entry in seconds.
+    """
+
+    def __init__(self, max_items: int = 1024, ttl_seconds: float = 300.0) -> None:
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, Tuple[float, float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lowercase the query and collapse whitespace."""
+        return re.sub(r'\s+', ' ', query).strip().lower()
+
+    @classmethod
+    def make_key(
+        cls,
+        query: str,
+        top_k: int,
+        collection: str,
+        version: Any,
+        payload_fields: Optional[Sequence[str]] = None,
+        query_filter: Optional[Dict[str, Any]] = None
+    ) -> Hashable:
+        """Build the cache key for a search request."""
+        fields = tuple(payload_fields) if payload_fields else None
+        return (cls.normalize_query(query), top_k, collection, version, fields, filter_key(query_filter))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached results for key, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                metrics.SEARCH_CACHE_MISSES.inc()
+                return None
+            self._entries.move_to_end(key)
+
+        metrics.SEARCH_CACHE_HITS.inc()
+        metrics.SEARCH_CACHE_SAVED_SECONDS.inc(entry[1])
+        return entry[2]
+
+    def put(self, key: Hashable, value: Any, cost_seconds: float = 0.0) -> None:
+        """Store results together with the time it took to compute them.
+
+        Args:
+            key: Cache key from `make_key`.
+            value: Results to cache.
+            cost_seconds: Latency of the uncached request, credited as saved time on hits.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, cost_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+import os
+import sys
+from typing import Optional
+from flask import Flask
+from prometheus_flask_exporter import PrometheusMetrics
+from app import routes as routes_module
+from app.models import AppConfig
+from app.logger import logger
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+
+def create_app() -> Flask:
+    """Build the Flask application with the routes and HTTP request metrics.
+
+    Returns:
+        Flask: The configured application.
+    """
+    app = Flask(__name__, template_folder=TEMPLATE_DIR)
+    app.secret_key = AppConfig().flask_secret_key
+    app.register_blueprint(routes_module.routes)
+
+    metrics = PrometheusMetrics(app, path='/metrics')
+    metrics.info('app_info', 'Application info', version='1.0.0', app_name='Net4CleanAir Literature Review Explorer')
+    return app
+
+
+def startup(preload_model: Optional[bool] = None) -> None:
+    """Warm the model, then reattach to collections indexed before the restart.
+
+    Args:
+        preload_model: Load the embedding model now; defaults to `preload_model` in the config.
+    """
+    if AppConfig().preload_model if preload_model is None else preload_model:
+        routes_module.embedder.preload()
+    routes_module.discover_collections()
+
+
+def worker_torch_threads(workers: int, configured: int = 0, cpu_count: int = 0) -> int:
+    """Number of torch threads per worker process.
+
+    With several workers, each one running torch with a thread per core
+    oversubscribes the CPU, so the cores are split between the workers.
+
+    Args:
+        workers: Number of worker processes.
+        configured: Explicit thread count; 0 splits the cores.
+        cpu_count: Number of CPU cores; 0 detects them.
+
+    Returns:
+        int: Threads per worker, at least 1.
+    """
+    if configured > 0:
+        return configured
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, workers))
+
+
+def configure_worker(torch_threads: int) -> None:
+    """Set up a server worker right after it is forked from the master.
+
+    Args:
+        torch_threads: Intra-op threads for torch in this worker.
+    """
+    os.environ['OMP_NUM_THREADS'] = str(torch_threads)
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(torch_threads)
+    routes_module.reset_after_fork()
+    logger.info(f"Worker {os.getpid()} ready with {torch_threads} torch threads")
@@ -0,0 +1,53 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Callable, Iterator
+import threading
+import time
+from app.logger import logger
+from app.services.prometheus import metrics
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """Export the duration of a startup phase.
+
+    Args:
+        phase: Name of the phase, e.g. 'imports' or 'model_load'.
+        seconds: Time the phase took.
+    """
+    metrics.STARTUP_PHASE_SECONDS.labels(phase=phase).set(seconds)
+    logger.info(f"Startup phase '{phase}' took {seconds:.3f}s")
+
+
+@contextmanager
+def startup_phase(phase: str) -> Iterator[None]:
+    """Time the enclosed block and export it as a startup phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - start)
+
+
+def preload_in_background(load: Callable[[], None], name: str = 'model-preload') -> threading.Thread:
+    """Run a preload function in a daemon thread so the server can start accepting probes.
+
+    Failures are logged; readiness checks keep reporting the instance as not ready.
+
+    Args:
+        load: Function that loads and warms up a resource.
+        name: Thread name.
+
+    Returns:
+        threading.Thread: The started thread.
+    """
+    def run() -> None:
+        try:
+            with startup_phase('preload'):
+                load()
+        except Exception as e:
+            logger.exception(f"Background preload failed: {e}")
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
+
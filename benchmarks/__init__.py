@@ -0,0 +1,5 @@
+"""Performance benchmarks for the Net4CleanAir services.
+
+Run a benchmark as a module from the repository root, e.g.
+`python -m benchmarks.bench_csv_loader`.
+"""
@@ -0,0 +1,96 @@
+"""Prompt context size and build time with and without the token budget.
+
+Usage:
+    python -m benchmarks.bench_context_builder --top-k 5 20 50 --budget 1500
+
+Retrieved papers are synthetic reviews with descending scores. The unbounded
+context is what ChatService builds without a ContextBuilder. Synthetic texts
+are drawn from a small vocabulary, so their term sets overlap far more than
+real abstracts and more of them are skipped as near-duplicates; pass
+--duplicate-threshold 1.01 to disable that step.
+"""
+from __future__ import annotations
+import argparse
+import logging
+import time
+from typing import Dict, List
+import numpy as np
+from app.logger import logger
+from app.services.chat import ChatService
+from app.services.context_builder import ContextBuilder, estimate_tokens
+from benchmarks.synthetic import WORDS, synthetic_reviews
+
+FIELDS = {
+    'TITLE OF THE PAPER': 'Title of the paper',
+    'AIM OF THE PAPER': 'Aim of the paper',
+    'MAIN FINDINGS OF THE PAPER': 'Main findings of the paper',
+}
+
+
+def _results(n: int, seed: int) -> List[dict]:
+    df = synthetic_reviews(n, seed=seed)
+    # Long findings made of several sentences, as in the real review sheets.
+    findings = df['Main findings of the paper'].fillna('')
+    df['Main findings of the paper'] = findings.map(lambda text: '. '.join([text] * 4) + '.')
+    return [
+        {'id': i, 'score': 1.0 - i / (n + 1), 'payload': {key: row[column] for key, column in FIELDS.items()}}
+        for i, row in enumerate(df.to_dict('records'))
+    ]
+
+
+def run(top_ks: List[int], budget: int, passage_tokens: int, duplicate_threshold: float, repeats: int = 20) -> Dict[int, Dict[str, float]]:
+    """Build the context for random questions at each top_k, with and without the budget.
+
+    Args:
+        top_ks: Numbers of retrieved papers.
+        budget: Context token budget.
+        passage_tokens: Token budget per paper.
+        duplicate_threshold: Jaccard similarity above which papers are skipped.
+        repeats: Questions per top_k.
+
+    Returns:
+        Dict[int, Dict[str, float]]: Tokens and build time in milliseconds per top_k.
+    """
+    builder = ContextBuilder(max_tokens=budget, max_passage_tokens=passage_tokens, duplicate_threshold=duplicate_threshold)
+    unbounded = ChatService(qdrant=None, embedder=None)
+    rng = np.random.default_rng(0)
+    report = {}
+    for top_k in top_ks:
+        full_tokens, budget_tokens, full_ms, budget_ms = [], [], [], []
+        for repeat in range(repeats):
+            results = _results(top_k, seed=repeat)
+            question = ' '.join(rng.choice(WORDS, size=4))
+            start = time.perf_counter()
+            full = unbounded._build_context(results, question)
+            full_ms.append((time.perf_counter() - start) * 1e3)
+            start = time.perf_counter()
+            fitted = builder.build(question, results)
+            budget_ms.append((time.perf_counter() - start) * 1e3)
+            full_tokens.append(estimate_tokens(full))
+            budget_tokens.append(estimate_tokens(fitted))
+        report[top_k] = {
+            'full_tokens': float(np.mean(full_tokens)),
+            'budget_tokens': float(np.mean(budget_tokens)),
+            'full_ms': float(np.median(full_ms)),
+            'budget_ms': float(np.median(budget_ms)),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top-k', type=int, nargs='+', default=[5, 20, 50])
+    parser.add_argument('--budget', type=int, default=1500)
+    parser.add_argument('--passage-tokens', type=int, default=400)
+    parser.add_argument('--duplicate-threshold', type=float, default=0.8)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    report = run(args.top_k, args.budget, args.passage_tokens, args.duplicate_threshold)
+    print(f"{'top_k':>6} {'full tokens':>12} {'budget tokens':>14} {'full [ms]':>10} {'budget [ms]':>12}")
+    for top_k, r in report.items():
+        print(f"{top_k:>6} {r['full_tokens']:>12.0f} {r['budget_tokens']:>14.0f} {r['full_ms']:>10.2f} {r['budget_ms']:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
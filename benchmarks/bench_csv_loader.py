@@ -0,0 +1,72 @@
+"""Compare the columnar and row-wise CSVLoader normalization paths.
+
+Usage:
+    python -m benchmarks.bench_csv_loader --rows 100000 1000000
+"""
+from __future__ import annotations
+import argparse
+import io
+import time
+from typing import Callable, Dict, Tuple
+import pandas as pd
+from app.services.csv_loader import CSVLoader
+from benchmarks.synthetic import synthetic_csv
+
+
+def _timed(fn: Callable[[], pd.DataFrame]) -> Tuple[pd.DataFrame, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _rowwise(raw: pd.DataFrame) -> pd.DataFrame:
+    df = raw.copy()
+    df.columns = [c.strip() for c in df.columns]
+    df.rename(columns={'Id': 'id'}, inplace=True)
+    df['id'] = CSVLoader._coerce_ids_rowwise(df['id'])
+    df['document'] = CSVLoader._build_documents_rowwise(df, CSVLoader._text_fields(df))
+    return df
+
+
+def _columnar(raw: pd.DataFrame) -> pd.DataFrame:
+    df = CSVLoader(b'')._normalize_ids(raw.copy())
+    df['document'] = CSVLoader._build_documents(df, CSVLoader._text_fields(df))
+    return df
+
+
+def run(n_rows: int) -> Dict[str, float]:
+    """Benchmark both paths on one synthetic sheet and check they agree.
+
+    Args:
+        n_rows: Number of rows in the synthetic CSV.
+
+    Returns:
+        Dict[str, float]: Parse time, both normalization times and the speedup.
+    """
+    csv_bytes = synthetic_csv(n_rows)
+    raw, parse_s = _timed(lambda: pd.read_csv(io.BytesIO(csv_bytes)))
+    expected, rowwise_s = _timed(lambda: _rowwise(raw))
+    actual, columnar_s = _timed(lambda: _columnar(raw))
+    pd.testing.assert_frame_equal(actual, expected)
+    return {
+        'rows': n_rows,
+        'parse_s': parse_s,
+        'rowwise_s': rowwise_s,
+        'columnar_s': columnar_s,
+        'speedup': rowwise_s / columnar_s,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'parse [s]':>10} {'row-wise [s]':>13} {'columnar [s]':>13} {'speedup':>8}")
+    for n_rows in args.rows:
+        r = run(n_rows)
+        print(f"{r['rows']:>10} {r['parse_s']:>10.3f} {r['rowwise_s']:>13.3f} {r['columnar_s']:>13.3f} {r['speedup']:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Compare Embedder backends: throughput, single-query latency and parity with torch.
+
+Usage:
+    python -m benchmarks.bench_embedder_backends --docs 2000 --backends torch onnx onnx-int8
+
+Parity is the cosine similarity between each document's embedding and the torch
+embedding of the same document. The run exits with status 1 if the minimum
+cosine of any backend falls below --min-cosine.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from app.services.csv_loader import CSVLoader
+from app.services.embedder import Embedder
+from benchmarks.synthetic import synthetic_csv
+
+
+def _documents(n_docs: int) -> List[str]:
+    return CSVLoader(synthetic_csv(n_docs)).load()['document'].tolist()
+
+
+def _row_cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def run(
+    backend: str,
+    docs: List[str],
+    reference: Optional[np.ndarray],
+    model_name: str,
+    batch_size: int,
+    n_queries: int
+) -> Dict[str, float]:
+    """Benchmark one backend on the given documents.
+
+    Args:
+        backend: Embedder backend name.
+        docs: Documents embedded as one bulk job.
+        reference: Torch embeddings of docs for the parity check, or None.
+        model_name: SentenceTransformer model to load.
+        batch_size: Batch size of the bulk job.
+        n_queries: Number of single-text calls used to measure query latency.
+
+    Returns:
+        Dict[str, float]: Load time, throughput, latency percentiles and parity.
+    """
+    embedder = Embedder(model_name=model_name, backend=backend)
+    start = time.perf_counter()
+    embedder.preload()
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embeddings = embedder.embed(docs, batch_size=batch_size)
+    bulk_s = time.perf_counter() - start
+
+    latencies = []
+    for text in docs[:n_queries]:
+        start = time.perf_counter()
+        embedder.embed([text])
+        latencies.append(time.perf_counter() - start)
+
+    result = {
+        'load_s': load_s,
+        'docs_per_s': len(docs) / bulk_s,
+        'p50_ms': float(np.percentile(latencies, 50)) * 1000,
+        'p95_ms': float(np.percentile(latencies, 95)) * 1000,
+        'embeddings': embeddings,
+    }
+    if reference is not None:
+        cosine = _row_cosine(embeddings, reference)
+        result['cos_mean'] = float(cosine.mean())
+        result['cos_min'] = float(cosine.min())
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--backends', nargs='+', default=['torch', 'onnx', 'onnx-int8'])
+    parser.add_argument('--min-cosine', type=float, default=0.98)
+    args = parser.parse_args()
+
+    docs = _documents(args.docs)
+    backends = ['torch'] + [b for b in args.backends if b != 'torch']
+    reference = None
+    failed = False
+
+    print(f"{'backend':>10} {'load [s]':>9} {'docs/s':>9} {'p50 [ms]':>9} {'p95 [ms]':>9} {'cos mean':>9} {'cos min':>9}")
+    for backend in backends:
+        r = run(backend, docs, reference, args.model, args.batch_size, args.queries)
+        if reference is None:
+            reference = r['embeddings']
+        cos_mean, cos_min = r.get('cos_mean', 1.0), r.get('cos_min', 1.0)
+        failed |= cos_min < args.min_cosine
+        print(
+            f"{backend:>10} {r['load_s']:>9.2f} {r['docs_per_s']:>9.1f} {r['p50_ms']:>9.2f} "
+            f"{r['p95_ms']:>9.2f} {cos_mean:>9.4f} {cos_min:>9.4f}"
+        )
+
+    if failed:
+        print(f"Parity check failed: minimum cosine below {args.min_cosine}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Latency of keyword (BM25), dense and hybrid search over the same collection.
+
+Usage:
+    python -m benchmarks.bench_keyword_search --rows 20000 --queries 500
+    python -m benchmarks.bench_keyword_search --model all-MiniLM-L6-v2   # real embedder instead of the stub
+
+Documents come from the synthetic review generator, normalized by CSVLoader.
+Dense search embeds every query and searches a NumpyVectorIndex; without
+--model a hashing stub embedder stands in for the model, so the dense numbers
+are a lower bound of the real path. Queries are 1-3 random vocabulary terms.
+The synthetic vocabulary is small, so most terms match most documents; real
+abstracts have far shorter posting lists and faster keyword queries.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import logging
+import tempfile
+import time
+from typing import Callable, Dict, List
+import numpy as np
+from app.logger import logger
+from app.services.csv_loader import CSVLoader
+from app.services.embedder import Embedder
+from app.services.keyword_index import KeywordIndex, reciprocal_rank_fusion
+from app.services.numpy_index import NumpyVectorIndex
+from benchmarks.synthetic import WORDS, synthetic_csv
+
+DIM = 384
+
+
+class HashingEmbedder:
+    """Deterministic stand-in for Embedder: a random unit vector per text."""
+
+    def embed(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        vectors = np.empty((len(texts), DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+            vectors[i] = np.random.default_rng(seed).normal(size=DIM)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _percentiles(search: Callable[[str], object], queries: List[str]) -> Dict[str, float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append(time.perf_counter() - start)
+    return {
+        'p50_us': float(np.percentile(latencies, 50)) * 1e6,
+        'p99_us': float(np.percentile(latencies, 99)) * 1e6,
+    }
+
+
+def run(n_rows: int, n_queries: int, top_k: int, model: str = None, candidates: int = 50) -> Dict[str, Dict[str, float]]:
+    """Build both indexes over the same documents and time every search mode.
+
+    Args:
+        n_rows: Number of synthetic papers.
+        n_queries: Number of timed queries per mode.
+        top_k: Results per query.
+        model: SentenceTransformer model for the dense path, or None for the stub embedder.
+        candidates: Dense and keyword candidates fused in hybrid mode.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Build time and p50/p99 latency in microseconds per mode.
+    """
+    df = CSVLoader(synthetic_csv(n_rows)).load()
+    embedder = Embedder(model_name=model) if model else HashingEmbedder()
+    rng = np.random.default_rng(1)
+    queries = [' '.join(rng.choice(WORDS, size=rng.integers(1, 4))) for _ in range(n_queries)]
+
+    start = time.perf_counter()
+    keyword_index = KeywordIndex(payload_fields=('TITLE OF THE PAPER',))
+    keyword_index.add_dataframe(df, df['id'].tolist())
+    keyword_build_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        dense_index = NumpyVectorIndex(index_dir=index_dir, collection_name='bench_keyword')
+        start = time.perf_counter()
+        embeddings = embedder.embed(df['document'].tolist())
+        dense_index.ensure_collection(vector_size=embeddings.shape[1])
+        dense_index.upsert_dataframe(df, embeddings)
+        dense_build_s = time.perf_counter() - start
+
+        def dense(query: str, k: int = top_k) -> list:
+            return dense_index.search(embedder.embed([query])[0], top_k=k, payload_include=['TITLE OF THE PAPER'])
+
+        def hybrid(query: str) -> list:
+            return reciprocal_rank_fusion(
+                [dense(query, candidates), keyword_index.search(query, top_k=candidates)], top_k=top_k
+            )
+
+        results = {
+            'keyword': dict(_percentiles(lambda q: keyword_index.search(q, top_k=top_k), queries), build_s=keyword_build_s),
+            'dense': dict(_percentiles(dense, queries), build_s=dense_build_s),
+            'hybrid': dict(_percentiles(hybrid, queries), build_s=keyword_build_s + dense_build_s),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--candidates', type=int, default=50)
+    parser.add_argument('--model', default=None, help='SentenceTransformer model; defaults to a hashing stub')
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+
+    results = run(args.rows, args.queries, args.top_k, model=args.model, candidates=args.candidates)
+    print(f"{'mode':>8} {'build [s]':>10} {'p50 [us]':>10} {'p99 [us]':>10}")
+    for mode, r in results.items():
+        print(f"{mode:>8} {r['build_s']:>10.2f} {r['p50_us']:>10.1f} {r['p99_us']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Recall@k, latency and memory of Qdrant HNSW / storage / quantization settings.
+
+Usage:
+    python -m benchmarks.bench_qdrant_hnsw --rows 100000 --queries 500 --top-k 10
+    python -m benchmarks.bench_qdrant_hnsw --url :memory: --rows 5000   # smoke run, exact search only
+
+Every configuration gets its own collection filled with the same clustered
+synthetic vectors. Ground truth is exact cosine top-k computed with NumPy.
+HNSW is only built for segments above Qdrant's indexing threshold (about 20k
+vectors of this size), so use large --rows against a real server.
+The memory column estimates resident memory from the settings. It counts
+full-precision vectors unless they are on disk, quantized vectors when kept
+in RAM, and 2*m links per point for the HNSW graph.
+"""
+from __future__ import annotations
+import argparse
+import dataclasses
+import time
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+from app.models import AppConfig
+from app.services.qdrant_wrapper import QdrantWrapper
+
+DIM = 384
+
+CONFIGS: Dict[str, Dict[str, object]] = {
+    'default': {},
+    'm32-ef200': {'qdrant_hnsw_m': 32, 'qdrant_hnsw_ef_construct': 200, 'qdrant_search_hnsw_ef': 256},
+    'float16': {'qdrant_vector_datatype': 'float16'},
+    'scalar': {'qdrant_quantization': 'scalar'},
+    'scalar-on-disk': {'qdrant_quantization': 'scalar', 'qdrant_on_disk_vectors': True},
+    'binary-x3': {'qdrant_quantization': 'binary', 'qdrant_search_oversampling': 3.0},
+    'binary-norescore': {'qdrant_quantization': 'binary', 'qdrant_search_rescore': False},
+}
+
+
+def clustered_vectors(n_rows: int, n_clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """Unit vectors drawn around random centroids, closer to real embeddings than pure noise."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(n_clusters, DIM)).astype(np.float32)
+    vectors = centroids[rng.integers(0, n_clusters, size=n_rows)] + 0.5 * rng.normal(size=(n_rows, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k most similar vectors per query (cosine, vectors are normalized)."""
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+
+def estimated_memory_bytes(config: AppConfig, n_rows: int) -> int:
+    """Rough resident memory of vectors, quantized vectors and HNSW links."""
+    vector_bytes = 2 if config.qdrant_vector_datatype == 'float16' else 4
+    total = 0 if config.qdrant_on_disk_vectors else n_rows * DIM * vector_bytes
+    if config.qdrant_quantization != 'none' and config.qdrant_quantization_always_ram:
+        total += n_rows * (DIM if config.qdrant_quantization == 'scalar' else DIM // 8)
+    total += n_rows * 2 * (config.qdrant_hnsw_m or 16) * 4
+    return total
+
+
+def _wait_for_indexing(client: QdrantClient, collection: str, timeout: float = 600.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get_collection(collection).status == qmodels.CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+
+
+def run(name: str, overrides: Dict[str, object], client: QdrantClient, vectors: np.ndarray,
+        queries: np.ndarray, truth: np.ndarray, k: int) -> Dict[str, float]:
+    """Build one collection with the given config overrides and measure it.
+
+    Args:
+        name: Configuration name, used as collection suffix.
+        overrides: AppConfig fields to change.
+        client: Qdrant client shared by all configurations.
+        vectors: Collection vectors.
+        queries: Query vectors.
+        truth: Exact top-k indices per query.
+        k: Number of neighbours.
+
+    Returns:
+        Dict[str, float]: Recall@k, p50/p99 latency in ms, estimated memory and build time.
+    """
+    config = dataclasses.replace(AppConfig(), **overrides)
+    wrapper = QdrantWrapper(config, collection_name=f"bench_hnsw_{name}")
+    wrapper.client = client
+    if client.collection_exists(wrapper.collection_name):
+        client.delete_collection(wrapper.collection_name)
+
+    start = time.perf_counter()
+    wrapper.ensure_collection(vector_size=DIM)
+    wrapper.upsert_dataframe(pd.DataFrame({'id': np.arange(len(vectors))}), vectors)
+    _wait_for_indexing(client, wrapper.collection_name)
+    build_s = time.perf_counter() - start
+
+    latencies: List[float] = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = wrapper.search(query, top_k=k, with_payload=False)
+        latencies.append(time.perf_counter() - start)
+        hits += len({r['id'] for r in results} & set(expected.tolist()))
+
+    client.delete_collection(wrapper.collection_name)
+    return {
+        'recall': hits / (len(queries) * k),
+        'p50_ms': float(np.percentile(latencies, 50)) * 1000,
+        'p99_ms': float(np.percentile(latencies, 99)) * 1000,
+        'memory_mb': estimated_memory_bytes(config, len(vectors)) / 2 ** 20,
+        'build_s': build_s,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=None, help="Qdrant URL, ':memory:' for the in-process client")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--configs', nargs='+', default=list(CONFIGS), choices=list(CONFIGS))
+    args = parser.parse_args()
+
+    app_config = AppConfig()
+    url = args.url or f"http://{app_config.qdrant_host}:{app_config.qdrant_port}"
+    client = QdrantClient(':memory:') if url == ':memory:' else QdrantClient(url=url)
+
+    data = clustered_vectors(args.rows + args.queries)
+    vectors, queries = data[:args.rows], data[args.rows:]
+    truth = exact_top_k(vectors, queries, args.top_k)
+
+    print(f"{'config':>18} {'recall@' + str(args.top_k):>10} {'p50 [ms]':>9} {'p99 [ms]':>9} {'mem [MB]':>9} {'build [s]':>10}")
+    for name in args.configs:
+        r = run(name, CONFIGS[name], client, vectors, queries, truth, args.top_k)
+        print(f"{name:>18} {r['recall']:>10.4f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['memory_mb']:>9.1f} {r['build_s']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Compare columnar Qdrant batch construction with the former per-row PointStruct path.
+
+Usage:
+    python -m benchmarks.bench_qdrant_points --rows 1000 10000 50000
+"""
+from __future__ import annotations
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+from app.services.csv_loader import CSVLoader
+from app.services.qdrant_wrapper import QdrantWrapper
+from benchmarks.synthetic import synthetic_csv
+
+DIM = 384
+BATCH_SIZE = 128
+
+
+def _legacy_prepare_payload(row: pd.Series) -> dict:
+    payload = row.drop(labels=['document', 'id_fixed']).to_dict()
+    for k, v in payload.items():
+        if isinstance(v, (np.generic,)):
+            payload[k] = v.item()
+        try:
+            json.dumps(payload[k])
+        except Exception:
+            payload[k] = str(payload[k])
+    return payload
+
+
+def _legacy_batches(wrapper: QdrantWrapper, df: pd.DataFrame, embeddings: np.ndarray) -> List[List[qmodels.PointStruct]]:
+    """Reference copy of the iterrows/PointStruct implementation this replaced."""
+    df = df.copy()
+    df['id_fixed'] = wrapper.normalize_ids(df)
+    points = []
+    for idx, row in df.iterrows():
+        points.append(qmodels.PointStruct(id=row['id_fixed'], vector=embeddings[idx].tolist(), payload=_legacy_prepare_payload(row)))
+    return [points[i:i + BATCH_SIZE] for i in range(0, len(points), BATCH_SIZE)]
+
+
+def _columnar_batches(wrapper: QdrantWrapper, df: pd.DataFrame, embeddings: np.ndarray) -> List[qmodels.Batch]:
+    return list(wrapper._iter_batches(df, embeddings, batch_size=BATCH_SIZE))
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _upsert_all(client: QdrantClient, batches: List[Any]) -> None:
+    if client.collection_exists('bench'):
+        client.delete_collection('bench')
+    client.create_collection('bench', vectors_config=qmodels.VectorParams(size=DIM, distance=qmodels.Distance.COSINE))
+    for batch in batches:
+        client.upsert(collection_name='bench', points=batch)
+
+
+def run(n_rows: int, with_upsert: bool = True) -> Dict[str, float]:
+    """Benchmark both builders (and optionally an in-process upsert) on a synthetic sheet.
+
+    Args:
+        n_rows: Number of rows to convert.
+        with_upsert: Also upsert the batches into an in-memory Qdrant client.
+
+    Returns:
+        Dict[str, float]: Build times, optional upsert times and the build speedup.
+    """
+    df = CSVLoader(synthetic_csv(n_rows)).load()
+    embeddings = np.random.default_rng(0).random((n_rows, DIM), dtype=np.float32)
+    wrapper = QdrantWrapper(collection_name='bench')
+
+    legacy, legacy_s = _timed(lambda: _legacy_batches(wrapper, df, embeddings))
+    columnar, columnar_s = _timed(lambda: _columnar_batches(wrapper, df, embeddings))
+    result = {'rows': n_rows, 'legacy_build_s': legacy_s, 'columnar_build_s': columnar_s, 'build_speedup': legacy_s / columnar_s}
+
+    if with_upsert:
+        client = QdrantClient(':memory:')
+        _, result['legacy_upsert_s'] = _timed(lambda: _upsert_all(client, legacy))
+        _, result['columnar_upsert_s'] = _timed(lambda: _upsert_all(client, columnar))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--no-upsert', action='store_true', help='Only time point construction')
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        r = run(n_rows, with_upsert=not args.no_upsert)
+        line = (f"rows={r['rows']:>7}  legacy build {r['legacy_build_s']:.3f}s  "
+                f"columnar build {r['columnar_build_s']:.3f}s  ({r['build_speedup']:.1f}x)")
+        if 'legacy_upsert_s' in r:
+            line += f"  | in-memory upsert legacy {r['legacy_upsert_s']:.3f}s columnar {r['columnar_upsert_s']:.3f}s"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Throughput of the pre-fork server with 1 vs N worker processes.
+
+Usage:
+    python -m benchmarks.bench_serving_throughput --workers 1 4 --clients 16 --requests 400
+    python -m benchmarks.bench_serving_throughput --path /healthz   # server overhead only
+
+For every worker count, starts `gunicorn -c gunicorn.conf.py wsgi:app` on a
+free local port, waits until it answers, and sends requests from concurrent
+client threads. The default POST /api/search sends a distinct query per
+request, so every request embeds its query instead of hitting the result
+cache; it needs an indexed collection on the backend configured in
+config.ini (`backend = numpy` in [VECTOR_INDEX] works without Qdrant).
+Memory is the summed proportional set size (PSS) of the master and its
+workers, which counts pages shared copy-on-write only once (Linux only).
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+from benchmarks.synthetic import WORDS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _request(base_url: str, path: str, i: int) -> bool:
+    if path == '/api/search':
+        rng = np.random.default_rng(i)
+        query = ' '.join(rng.choice(WORDS, size=3)) + f' {i}'
+        body = json.dumps({'queries': [query], 'top_k': 5}).encode('utf-8')
+        req = urllib.request.Request(base_url + path, data=body, headers={'Content-Type': 'application/json'})
+    else:
+        req = urllib.request.Request(base_url + path)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def _wait_until_up(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {process.returncode}")
+        if _request(base_url, '/healthz', 0):
+            return
+        time.sleep(0.25)
+    raise RuntimeError(f"gunicorn did not answer within {timeout:.0f}s")
+
+
+def _pss_mb(pid: int) -> Optional[float]:
+    """PSS of a process and its children in MB, or None where /proc is unavailable."""
+    pids = [pid]
+    try:
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                pids += [int(child) for child in f.read().split()]
+        total_kb = 0
+        for p in pids:
+            with open(f'/proc/{p}/smaps_rollup') as f:
+                total_kb += sum(int(line.split()[1]) for line in f if line.startswith('Pss:'))
+    except OSError:
+        return None
+    return total_kb / 1024
+
+
+def run(workers: int, clients: int, n_requests: int, path: str = '/api/search', startup_timeout: float = 300) -> Dict[str, float]:
+    """Serve with the given number of workers and measure throughput under concurrent load.
+
+    Args:
+        workers: Number of gunicorn worker processes.
+        clients: Concurrent client threads.
+        n_requests: Timed requests.
+        path: '/api/search' or any GET endpoint.
+        startup_timeout: Seconds to wait for the server, including model loading.
+
+    Returns:
+        Dict[str, float]: Requests per second, p50/p99 latency in milliseconds, error count and memory.
+    """
+    port = _free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    with tempfile.TemporaryDirectory() as metrics_dir:
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir)
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             '--workers', str(workers), '--bind', f'127.0.0.1:{port}', 'wsgi:app'],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _wait_until_up(base_url, process, startup_timeout)
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                list(pool.map(lambda i: _request(base_url, path, -1 - i), range(clients * 2)))
+
+                latencies: List[float] = []
+
+                def timed(i: int) -> bool:
+                    start = time.perf_counter()
+                    ok = _request(base_url, path, i)
+                    latencies.append(time.perf_counter() - start)
+                    return ok
+
+                start = time.perf_counter()
+                ok = list(pool.map(timed, range(n_requests)))
+                elapsed = time.perf_counter() - start
+            memory_mb = _pss_mb(process.pid)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    return {
+        'rps': n_requests / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)) * 1e3,
+        'p99_ms': float(np.percentile(latencies, 99)) * 1e3,
+        'errors': n_requests - sum(ok),
+        'pss_mb': memory_mb if memory_mb is not None else float('nan'),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--path', default='/api/search')
+    parser.add_argument('--startup-timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'req/s':>8} {'p50 [ms]':>9} {'p99 [ms]':>9} {'errors':>7} {'PSS [MB]':>9}")
+    for workers in dict.fromkeys(args.workers):
+        r = run(workers, args.clients, args.requests, path=args.path, startup_timeout=args.startup_timeout)
+        print(f"{workers:>8} {r['rps']:>8.1f} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['errors']:>7} {r['pss_mb']:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
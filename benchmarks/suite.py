@@ -0,0 +1,373 @@
+"""Latency and throughput suite for ingestion, search and the Flask routes, with baseline comparison.
+
+Usage:
+    python -m benchmarks.suite                                   # print the report as JSON
+    python -m benchmarks.suite --rows 5000 --out report.json
+    python -m benchmarks.suite --write-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json   # exit code 1 on regression
+    BENCHMARK_BASELINE=benchmarks/baseline.json python -m pytest tests/test_benchmark_suite.py
+
+Everything runs in-process and is reproducible from a seed: synthetic review
+CSVs of --rows papers, an in-memory Qdrant (`QdrantClient(":memory:")`) and
+an Embedder whose model is replaced by a hashing stub, so no model download,
+Qdrant server or OpenAI key is needed. Chat completions are answered by a
+stub client. The numbers therefore measure this repository's code (parsing,
+batching, payload handling, prompt building, routing and templates), not
+model inference or network latency.
+
+Stages:
+    csv_load             CSVLoader.load of the whole sheet, per run.
+    embed                Embedder.embed of all documents, per run.
+    upsert               QdrantWrapper.upsert_dataframe into a fresh collection, per run.
+    search               QdrantWrapper.search of one query vector, per query.
+    route_api_search     POST /api/search with one query, per request.
+    route_search         POST /search (dense), rendered HTML, per request.
+    route_chat           POST /chat with the stub completion, per request.
+    route_upload         POST / of the CSV until its ingestion job finished, per run.
+
+Each stage reports p50/p95/p99 latency in milliseconds and throughput in
+items (rows, queries or requests) per second. Baselines are JSON reports of
+an earlier run; they depend on the machine, so write them on the machine that
+compares against them. A comparison reruns with the baseline's parameters.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import warnings
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+import numpy as np
+import openai
+from flask import Flask
+from qdrant_client import QdrantClient
+from app import routes as routes_module
+from app.logger import logger
+from app.serving import TEMPLATE_DIR
+from app.services.csv_loader import CSVLoader
+from app.services.embedder import Embedder
+from app.services.ingestion_jobs import IngestionJobManager
+from app.services.qdrant_wrapper import QdrantWrapper
+from benchmarks.synthetic import WORDS, synthetic_reviews
+
+DIM = 384
+STAGES = (
+    'csv_load', 'embed', 'upsert', 'search',
+    'route_api_search', 'route_search', 'route_chat', 'route_upload',
+)
+DEFAULT_PARAMS = {'rows': 2000, 'queries': 200, 'repeats': 5, 'top_k': 5, 'seed': 0}
+
+
+class HashingModel:
+    """Stand-in for the SentenceTransformer inside Embedder: a deterministic unit vector per text."""
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return DIM
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        vectors = np.empty((len(texts), DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+            vectors[i] = np.random.default_rng(seed).normal(size=DIM)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class StubChatClient:
+    """Stand-in for OpenAIChatClient that answers at once with a fixed completion."""
+
+    def create(self, model: str, messages: List[Dict[str, str]], max_tokens: int, stream: bool = False) -> Any:
+        return openai.openai_object.OpenAIObject.construct_from({
+            'choices': [{'message': {'role': 'assistant', 'content': 'Stub answer.'}}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 2},
+        })
+
+
+def stub_embedder() -> Embedder:
+    """An Embedder that runs HashingModel instead of loading a model."""
+    embedder = Embedder(model_name='hashing-stub')
+    embedder._model = HashingModel()
+    return embedder
+
+
+def summarize(latencies: List[float], items_per_sample: int = 1) -> Dict[str, float]:
+    """Latency percentiles in milliseconds and throughput in items per second."""
+    seconds = np.asarray(latencies, dtype=np.float64)
+    return {
+        'samples': int(seconds.size),
+        'p50_ms': round(float(np.percentile(seconds, 50)) * 1e3, 4),
+        'p95_ms': round(float(np.percentile(seconds, 95)) * 1e3, 4),
+        'p99_ms': round(float(np.percentile(seconds, 99)) * 1e3, 4),
+        'throughput': round(items_per_sample * seconds.size / float(seconds.sum()), 2),
+    }
+
+
+def _timed(fn: Callable[[int], Any], n: int, warmup: int = 1) -> List[float]:
+    """Call fn(i) n times after `warmup` untimed calls and return the latencies in seconds."""
+    for i in range(warmup):
+        fn(-1 - i)
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def review_csv(rows: int, seed: int = 0) -> bytes:
+    """Synthetic sheet with upper-case headers, which the payload, chat and facet fields in config.ini refer to."""
+    df = synthetic_reviews(rows, seed)
+    df.columns = [c if c == 'Id' else c.upper() for c in df.columns]
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def _queries(n: int, seed: int) -> List[str]:
+    rng = np.random.default_rng(seed)
+    return [' '.join(rng.choice(WORDS, size=3)) for _ in range(n)]
+
+
+def _wrapper(client: QdrantClient, collection_name: str) -> QdrantWrapper:
+    wrapper = QdrantWrapper(collection_name=collection_name)
+    wrapper.client = client
+    wrapper.versions_dir = None  # one process: keep collection versions in memory
+    return wrapper
+
+
+def _fresh_collection(client: QdrantClient, collection_name: str) -> QdrantWrapper:
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    wrapper = _wrapper(client, collection_name)
+    wrapper.ensure_collection(vector_size=DIM)
+    return wrapper
+
+
+def _test_client(stack: ExitStack, client: QdrantClient, searched: QdrantWrapper, embedder: Embedder, work_dir: str):
+    """Flask test client with the routes module pointed at the in-process collection and stubs."""
+    for name, value in {
+        'qwrap': searched,
+        'embedder': embedder,
+        'query_embedder': embedder,
+        'search_cache': None,
+        'answer_cache': None,
+        'keyword_index': None,
+        'facet_index': None,
+        'openai_client': StubChatClient(),
+        '_chat': None,
+        'ingestion_jobs': IngestionJobManager(max_queued=1),
+        'UPLOAD_FOLDER': work_dir,
+        '_open_index': lambda name: _wrapper(client, name),
+        '_follow_other_workers': False,
+    }.items():
+        stack.enter_context(patch.object(routes_module, name, value))
+    stack.enter_context(patch.dict(routes_module.collections))
+    stack.enter_context(patch.dict(routes_module._sync_stamps))
+    stack.enter_context(patch.object(routes_module.config, 'keyword_dir', work_dir))
+    stack.enter_context(patch.object(routes_module.config, 'facets_dir', work_dir))
+    stack.enter_context(patch.object(routes_module.config, 'ingest_jobs_dir', work_dir))
+
+    app = Flask(__name__, template_folder=TEMPLATE_DIR)
+    app.secret_key = 'benchmark'
+    app.register_blueprint(routes_module.routes)
+    return app.test_client()
+
+
+def _check(response: Any, status: int = 200) -> Any:
+    if response.status_code != status:
+        raise RuntimeError(f"{response.request.path} answered {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def run(rows: int = 2000, queries: int = 200, repeats: int = 5, top_k: int = 5, seed: int = 0) -> Dict[str, Any]:
+    """Run every stage on a synthetic sheet and report latency percentiles and throughput.
+
+    Args:
+        rows: Papers in the synthetic CSV.
+        queries: Timed queries or requests per search, chat and route stage.
+        repeats: Timed runs of the whole-sheet stages (load, embed, upsert, upload).
+        top_k: Results per search.
+        seed: Seed of the synthetic sheet and queries.
+
+    Returns:
+        Dict[str, Any]: 'params', 'environment' and per-stage 'results'.
+    """
+    params = {'rows': rows, 'queries': queries, 'repeats': repeats, 'top_k': top_k, 'seed': seed}
+    previous_level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        with warnings.catch_warnings():
+            # The in-memory client warns that payload indexes have no effect.
+            warnings.simplefilter('ignore', UserWarning)
+            results = _run_stages(rows, queries, repeats, top_k, seed)
+    finally:
+        logger.setLevel(previous_level)
+    return {
+        'params': params,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def _run_stages(rows: int, queries: int, repeats: int, top_k: int, seed: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    csv_bytes = review_csv(rows, seed)
+    query_texts = _queries(queries, seed)
+    embedder = stub_embedder()
+    client = QdrantClient(':memory:')
+
+    results['csv_load'] = summarize(_timed(lambda i: CSVLoader(csv_bytes).load(), repeats), rows)
+    df = CSVLoader(csv_bytes).load()
+    documents = df['document'].tolist()
+
+    results['embed'] = summarize(_timed(lambda i: embedder.embed(documents), repeats), rows)
+    embeddings = embedder.embed(documents)
+
+    results['upsert'] = summarize(_timed(
+        lambda i: _fresh_collection(client, 'bench_upsert').upsert_dataframe(df, embeddings), repeats
+    ), rows)
+
+    searched = _fresh_collection(client, 'bench_search')
+    searched.upsert_dataframe(df, embeddings)
+    query_vectors = embedder.embed(query_texts)
+    results['search'] = summarize(_timed(lambda i: searched.search(query_vectors[i], top_k=top_k), queries))
+
+    with tempfile.TemporaryDirectory() as work_dir, ExitStack() as stack:
+        http = _test_client(stack, client, searched, embedder, work_dir)
+        # Warmup calls get negative indices and so reuse the last queries.
+        results['route_api_search'] = summarize(_timed(lambda i: _check(http.post(
+            '/api/search', json={'queries': [query_texts[i]], 'top_k': top_k}
+        )), queries))
+        results['route_search'] = summarize(_timed(lambda i: _check(http.post(
+            '/search', data={'query': query_texts[i], 'top_k': str(top_k), 'mode': 'dense'}
+        )), queries))
+        results['route_chat'] = summarize(_timed(lambda i: _check(http.post(
+            '/chat', data={'question': query_texts[i], 'top_k': str(top_k)}
+        )), queries))
+
+        collection_ids = itertools.count()
+
+        def upload(i: int) -> None:
+            collection = f'bench_upload_{next(collection_ids)}'
+            with patch.object(routes_module.config, 'default_collection', collection), \
+                    patch.object(routes_module, 'keyword_index', None), \
+                    patch.object(routes_module, 'facet_index', None):
+                response = _check(http.post(
+                    '/', data={'csv_file': (io.BytesIO(csv_bytes), 'bench.csv')},
+                    content_type='multipart/form-data', headers={'Accept': 'application/json'}
+                ), 202)
+                job_id = response.get_json()['id']
+                routes_module.ingestion_jobs.wait(job_id)
+                job = routes_module.ingestion_jobs.get(job_id)
+            if job['state'] != 'succeeded':
+                raise RuntimeError(f"Upload job failed: {job['error']}")
+            client.delete_collection(collection)
+
+        results['route_upload'] = summarize(_timed(upload, repeats), rows)
+    return results
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    latency_tolerance: float = 0.5,
+    throughput_tolerance: float = 0.5,
+    min_delta_ms: float = 0.5
+) -> List[str]:
+    """Find stages that got slower than the baseline.
+
+    A stage regressed if its p50 or p95 latency grew by more than
+    `latency_tolerance` (0.5 = 50%) and by more than `min_delta_ms`, or if its
+    throughput fell below baseline / (1 + `throughput_tolerance`). p99 is
+    reported but not compared, since short runs have few samples in the tail.
+
+    Args:
+        report: Report of the current run from `run`.
+        baseline: Earlier report.
+        latency_tolerance: Allowed relative latency increase.
+        throughput_tolerance: Allowed relative throughput decrease.
+        min_delta_ms: Latency increases below this are treated as noise.
+
+    Returns:
+        List[str]: One message per regression; empty if none.
+
+    Raises:
+        ValueError: If the reports were run with different parameters.
+    """
+    if report['params'] != baseline['params']:
+        raise ValueError(f"Parameters differ from the baseline: {report['params']} vs {baseline['params']}")
+    regressions = []
+    for stage, base in baseline['results'].items():
+        current = report['results'].get(stage)
+        if current is None:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            if current[key] > base[key] * (1 + latency_tolerance) and current[key] - base[key] > min_delta_ms:
+                regressions.append(f"{stage}: {key} {current[key]:.3f} vs baseline {base[key]:.3f}")
+        if current['throughput'] < base['throughput'] / (1 + throughput_tolerance):
+            regressions.append(
+                f"{stage}: throughput {current['throughput']:.1f}/s vs baseline {base['throughput']:.1f}/s"
+            )
+    return regressions
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for name, default in DEFAULT_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=None, help=f"default: {default}")
+    parser.add_argument('--out', help='Write the report to this file')
+    parser.add_argument('--baseline', help='Compare against this report, with its parameters unless given')
+    parser.add_argument('--write-baseline', help='Write the report as the new baseline to this file')
+    parser.add_argument('--latency-tolerance', type=float, default=0.5)
+    parser.add_argument('--throughput-tolerance', type=float, default=0.5)
+    parser.add_argument('--min-delta-ms', type=float, default=0.5)
+    args = parser.parse_args()
+
+    baseline = load_report(args.baseline) if args.baseline else None
+    params = dict(baseline['params'] if baseline else DEFAULT_PARAMS)
+    params.update({name: getattr(args, name) for name in DEFAULT_PARAMS if getattr(args, name) is not None})
+
+    report = run(**params)
+    print(json.dumps(report, indent=2))
+    for path in (args.out, args.write_baseline):
+        if path:
+            write_report(report, path)
+
+    print(f"\n{'stage':>18} {'p50 [ms]':>10} {'p95 [ms]':>10} {'p99 [ms]':>10} {'items/s':>10}", file=sys.stderr)
+    for stage, r in report['results'].items():
+        print(f"{stage:>18} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['throughput']:>10.1f}", file=sys.stderr)
+
+    if baseline is not None:
+        regressions = compare(
+            report, baseline, args.latency_tolerance, args.throughput_tolerance, args.min_delta_ms
+        )
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+ENVIRONMENTS = ['Office', 'School', 'Hospital', 'Residential', 'Laboratory', 'Public transport']
+METHODS = ['HEPA filter', 'UV light disinfection', 'Ionization', 'Photocatalytic oxidation', 'Activated carbon']
+REVIEWERS = ['Anna Nowak', 'John Smith', 'Maria Rossi', 'Luis Garcia']
+WORDS = (
+    'indoor air quality ventilation particulate matter PM2.5 PM10 aerosol virus bacteria '
+    'removal efficiency filtration ozone VOC exposure occupants concentration airflow '
+    'clean air delivery rate field study chamber test reduction infection risk'
+).split()
+
+
+def synthetic_reviews(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Generate a review sheet with the same columns as the Net4CleanAir exports.
+
+    Args:
+        n_rows: Number of papers to generate.
+        seed: Random seed, so runs are reproducible.
+
+    Returns:
+        pd.DataFrame: Raw sheet, before CSVLoader normalization.
+    """
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS, dtype=object)
+
+    def sentences(length: int) -> np.ndarray:
+        picks = rng.integers(0, len(words), size=(n_rows, length))
+        return np.array([' '.join(row) for row in words[picks]], dtype=object)
+
+    findings = sentences(30)
+    findings[rng.random(n_rows) < 0.05] = None
+    return pd.DataFrame({
+        'Id': np.arange(1, n_rows + 1),
+        'Your complete name': rng.choice(REVIEWERS, size=n_rows),
+        'Title of the paper': sentences(8),
+        'Aim of the paper': sentences(15),
+        'Main findings of the paper': findings,
+        'Type of indoor environment': rng.choice(ENVIRONMENTS, size=n_rows),
+        'Nominate according to the paper': rng.choice(METHODS, size=n_rows),
+        'Year': rng.integers(1990, 2025, size=n_rows),
+    })
+
+
+def synthetic_csv(n_rows: int, seed: int = 0) -> bytes:
+    """Return `synthetic_reviews` serialized as CSV bytes."""
+    return synthetic_reviews(n_rows, seed).to_csv(index=False).encode('utf-8')
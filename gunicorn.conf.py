@@ -0,0 +1,33 @@
+"""Gunicorn settings for the pre-fork server, read from the [SERVER] section of config.ini.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import glob
+import os
+from app.models import AppConfig
+
+_config = AppConfig()
+
+# Must be set before the app imports prometheus_client; every process then
+# writes its metrics to files here and /metrics aggregates them.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.abspath(_config.server_metrics_dir))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+for _stale in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+    os.remove(_stale)
+
+bind = _config.server_bind
+workers = _config.server_workers or os.cpu_count() or 1
+worker_class = 'gthread'
+threads = _config.server_threads
+timeout = _config.server_timeout
+preload_app = True
+
+
+def post_fork(server, worker):
+    from app.serving import configure_worker, worker_torch_threads
+    configure_worker(worker_torch_threads(server.num_workers, _config.server_torch_threads))
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
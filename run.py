@@ -1,17 +1,27 @@
+import time
+_import_start = time.perf_counter()
+
 import os
-from flask import Flask
-from app.routes import routes
-from app.models import AppConfig
-from prometheus_flask_exporter import PrometheusMetrics
+from flask.helpers import get_debug_flag
+from app.serving import create_app, startup
+from app.startup import record_phase, preload_in_background
+
+record_phase('imports', time.perf_counter() - _import_start)
+
+DEBUG = True
+
+app = create_app()
 
-template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'templates')
 
-app = Flask(__name__, template_folder=template_dir)
-app.secret_key = AppConfig().flask_secret_key
-app.register_blueprint(routes)
+def _serves_requests(reloader: bool) -> bool:
+    """False in the Werkzeug reloader's watcher process, which only restarts the server child."""
+    return not reloader or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
 
-metrics = PrometheusMetrics(app, path='/metrics')
-metrics.info('app_info', 'Application info', version='1.0.0', app_name='Net4CleanAir Literature Review Explorer')
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    if _serves_requests(reloader=DEBUG):
+        preload_in_background(startup, name='startup')
+    app.run(host='0.0.0.0', port=5001, debug=DEBUG)
+elif _serves_requests(reloader=get_debug_flag()):
+    # Imported by `flask run`, whose reloader is on with --debug or FLASK_DEBUG.
+    preload_in_background(startup, name='startup')
@@ -0,0 +1,65 @@
+import copy
+import os
+import pytest
+from benchmarks import suite
+
+
+@pytest.fixture(scope="module")
+def report():
+    """Fixture running the whole suite once on a small sheet."""
+    return suite.run(rows=60, queries=4, repeats=2)
+
+
+def test_suite_reports_every_stage(report):
+    """Test that every stage reports ordered percentiles and a positive throughput."""
+    assert report["params"] == {"rows": 60, "queries": 4, "repeats": 2, "top_k": 5, "seed": 0}
+    assert list(report["results"]) == list(suite.STAGES)
+    for stage in report["results"].values():
+        assert 0 < stage["p50_ms"] <= stage["p95_ms"] <= stage["p99_ms"]
+        assert stage["throughput"] > 0
+    assert report["results"]["search"]["samples"] == 4
+    assert report["results"]["route_upload"]["samples"] == 2
+
+
+def test_suite_leaves_routes_untouched(report):
+    """Test that the routes module is restored after the suite patched it."""
+    from app import routes as routes_module
+    assert not isinstance(routes_module.openai_client, suite.StubChatClient)
+    assert routes_module.config.default_collection != "bench_upload_0"
+
+
+def test_compare_flags_slower_stages(report):
+    """Test that latency and throughput regressions beyond the tolerances are reported."""
+    assert suite.compare(report, report) == []
+
+    slower = copy.deepcopy(report)
+    slower["results"]["upsert"]["p95_ms"] = report["results"]["upsert"]["p95_ms"] * 2 + 10
+    slower["results"]["search"]["throughput"] = report["results"]["search"]["throughput"] / 3
+    regressions = sorted(suite.compare(slower, report))
+    assert len(regressions) == 2
+    assert regressions[0].startswith("search: throughput")
+    assert regressions[1].startswith("upsert: p95_ms")
+
+
+def test_compare_ignores_changes_below_noise_floor(report):
+    """Test that tiny absolute latency increases are not regressions."""
+    noisy = copy.deepcopy(report)
+    noisy["results"]["search"]["p50_ms"] = report["results"]["search"]["p50_ms"] * 2
+    noisy["results"]["search"]["p95_ms"] = report["results"]["search"]["p95_ms"]
+    assert suite.compare(noisy, report, min_delta_ms=1e6) == []
+
+
+def test_compare_requires_same_parameters(report):
+    """Test that reports of differently sized runs are not compared."""
+    other = copy.deepcopy(report)
+    other["params"]["rows"] = 10
+    with pytest.raises(ValueError):
+        suite.compare(report, other)
+
+
+@pytest.mark.skipif(not os.environ.get("BENCHMARK_BASELINE"), reason="set BENCHMARK_BASELINE to a baseline report")
+def test_no_regression_against_baseline():
+    """Test that a full run stays within the tolerances of the stored baseline."""
+    baseline = suite.load_report(os.environ["BENCHMARK_BASELINE"])
+    current = suite.run(**baseline["params"])
+    assert suite.compare(current, baseline) == []
@@ -1,42 +1,106 @@
 import io
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, PropertyMock, ANY
 from app.routes import routes
+from app.services.indexer import IndexSummary
 
 @pytest.fixture
-def client():
+def client(tmp_path):
+    """Test client; ingestion job state and sync stamps go to a temporary directory."""
     from flask import Flask
+    from app import routes as routes_module
     app = Flask(__name__)
     app.secret_key = "test_secret"
     app.register_blueprint(routes)
     app.testing = True
-    return app.test_client()
+    with patch.object(routes_module.config, 'ingest_jobs_dir', str(tmp_path / 'ingestion_jobs')):
+        yield app.test_client()
 
 @patch('app.routes.render_template', return_value="INDEX_HTML")
 def test_index_get(mock_render, client):
     """GET request returns index page"""
     response = client.get('/')
     assert response.data == b"INDEX_HTML"
-    mock_render.assert_called_with('index.html')
+    mock_render.assert_called_with('index.html', job_id=None)
 
-@patch('app.routes.render_template', return_value="INDEX_HTML")
 @patch('app.routes.CSVLoader')
-@patch('app.routes.Embedder.embed')
+@patch('app.routes.Indexer')
 @patch('app.routes.QdrantWrapper')
-def test_index_post_success(mock_qdrant, mock_embed, mock_csvloader, mock_render, client):
-    """POST request with valid CSV file should flash success"""
-    mock_df = MagicMock()
-    mock_df.__getitem__.return_value.tolist.return_value = ["doc1", "doc2"]
-    mock_csvloader.return_value.load.return_value = mock_df
-    mock_embed.return_value.shape = (2, 768)
+@patch('app.routes.facet_index', new_callable=MagicMock)
+@patch('app.routes.keyword_index', new_callable=MagicMock)
+def test_index_post_runs_ingestion_job(mock_keyword_index, mock_facet_index, mock_qdrant, mock_indexer, mock_csvloader, client):
+    """POST with a CSV file queues a background job that syncs the collection"""
+    from app.services.ingestion_jobs import IngestionJobManager
+    mock_chunks = MagicMock()
+    mock_csvloader.return_value.iter_chunks.return_value = mock_chunks
+    mock_indexer.return_value.sync_stream.return_value = IndexSummary(added=2)
+    jobs = IngestionJobManager()
 
-    file_data = io.BytesIO(b"col1,col2\ndoc1,text1\ndoc2,text2")
-    data = {'csv_file': (file_data, 'test.csv')}
+    with patch('app.routes.ingestion_jobs', jobs):
+        file_data = io.BytesIO(b"col1,col2\ndoc1,text1\ndoc2,text2")
+        response = client.post(
+            '/', data={'csv_file': (file_data, 'test.csv')}, content_type='multipart/form-data',
+            headers={'Accept': 'application/json'}
+        )
+        assert response.status_code == 202
+        job_id = response.get_json()['id']
+        assert response.headers['Location'] == f'/jobs/{job_id}'
+        assert jobs.wait(job_id, timeout=10)
 
-    response = client.post('/', data=data, content_type='multipart/form-data', follow_redirects=True)
-    assert b"INDEX_HTML" in response.data
-    mock_qdrant.return_value.ensure_collection.assert_called()
-    mock_qdrant.return_value.upsert_dataframe.assert_called()
+        body = client.get(f'/jobs/{job_id}').get_json()
+        assert body['state'] == 'succeeded'
+        assert body['summary']['added'] == 2
+    mock_indexer.assert_called_once_with(
+        mock_qdrant.return_value, ANY, keyword_index=mock_keyword_index, facet_index=mock_facet_index
+    )
+    mock_indexer.return_value.sync_stream.assert_called_once_with(mock_chunks, incremental=ANY, queue_size=ANY, progress=ANY)
+    mock_keyword_index.save.assert_called_once()
+    mock_facet_index.save.assert_called_once()
+
+
+@patch('app.routes.CSVLoader')
+@patch('app.routes.Indexer')
+@patch('app.routes.QdrantWrapper')
+@patch('app.routes.facet_index', MagicMock())
+@patch('app.routes.keyword_index', MagicMock())
+@patch('app.routes.qwrap', new_callable=MagicMock)
+def test_collection_is_published_only_after_a_successful_sync(mock_qwrap, mock_qdrant, mock_indexer, mock_csvloader, client):
+    """Searches keep the previous collection while a sync runs and after it fails"""
+    from app import routes as routes_module
+    from app.services.ingestion_jobs import IngestionJobManager
+    seen_during_sync = []
+
+    def failing_sync(*args, **kwargs):
+        seen_during_sync.append(routes_module.qwrap)
+        raise RuntimeError("qdrant down")
+
+    mock_indexer.return_value.sync_stream.side_effect = failing_sync
+    jobs = IngestionJobManager()
+    with patch('app.routes.ingestion_jobs', jobs):
+        response = client.post(
+            '/', data={'csv_file': (io.BytesIO(b"a,b\n1,2"), 'test.csv')}, content_type='multipart/form-data',
+            headers={'Accept': 'application/json'}
+        )
+        assert jobs.wait(response.get_json()['id'], timeout=10)
+    assert seen_during_sync == [mock_qwrap]
+    assert routes_module.qwrap is mock_qwrap
+
+
+@patch('app.routes.CSVLoader', side_effect=ValueError("bad csv"))
+def test_index_post_reports_failed_job(mock_csvloader, client):
+    """A form upload redirects to the page polling the job, which reports the failure"""
+    from app.services.ingestion_jobs import IngestionJobManager
+    jobs = IngestionJobManager()
+
+    with patch('app.routes.ingestion_jobs', jobs):
+        response = client.post('/', data={'csv_file': (io.BytesIO(b"a,b"), 'bad.csv')}, content_type='multipart/form-data')
+        assert response.status_code == 302
+        job_id = response.headers['Location'].split('job=')[1]
+        assert jobs.wait(job_id, timeout=10)
+        body = client.get(f'/jobs/{job_id}').get_json()
+        assert body['state'] == 'failed'
+        assert body['error'] == 'bad csv'
+    assert client.get('/jobs/unknown').status_code == 404
 
 
 @patch('app.routes.render_template', return_value="INDEX_HTML")
@@ -67,6 +131,7 @@ def test_search_post_success(mock_embed, mock_qwrap, mock_render, client):
     mock_qwrap.search.assert_called()
 
 @patch('app.routes.render_template', return_value="SEARCH_HTML")
+@patch('app.routes.discover_collections', MagicMock())
 @patch('app.routes.qwrap', None)
 def test_search_post_no_qwrap(mock_render, client):
     """POST search with no indexed collection should flash danger"""
@@ -104,12 +169,74 @@ def test_chat_post_empty_question(mock_render, client):
     assert b"CHAT_HTML" in response.data
 
 @patch('app.routes.render_template', return_value="CHAT_HTML")
+@patch('app.routes.discover_collections', MagicMock())
 @patch('app.routes.qwrap', None)
 def test_chat_post_no_qwrap(mock_render, client):
     """POST chat without indexed collection should flash danger"""
     response = client.post('/chat', data={'question': 'Any question'})
     assert b"CHAT_HTML" in response.data
 
+@patch('app.routes.qwrap', new_callable=MagicMock)
+@patch('app.routes.ChatService')
+def test_chat_stream_emits_server_sent_events(mock_chat_service, mock_qwrap, client):
+    """GET /chat/stream relays ChatService events as SSE frames"""
+    mock_chat_service.return_value.stream_answer.return_value = iter([
+        {"type": "context", "context_docs": []},
+        {"type": "token", "text": "Hi"},
+        {"type": "done"},
+    ])
+    response = client.get('/chat/stream?question=What&top_k=2')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert 'event: context' in body
+    assert 'event: token\ndata: {"type": "token", "text": "Hi"}' in body
+    assert body.endswith('event: done\ndata: {"type": "done"}\n\n')
+    mock_chat_service.return_value.stream_answer.assert_called_with('What', top_k=2)
+
+
+@patch('app.routes.discover_collections', MagicMock())
+@patch('app.routes.qwrap', None)
+def test_chat_stream_requires_collection(client):
+    """GET /chat/stream without indexed collection returns 503"""
+    assert client.get('/chat/stream?question=What').status_code == 503
+
+
+def test_healthz(client):
+    """GET /healthz reports liveness without touching dependencies"""
+    response = client.get('/healthz')
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'ok'}
+
+
+@patch('app.routes.qwrap', new_callable=MagicMock)
+@patch('app.routes.embedder')
+def test_readyz_waits_for_model(mock_embedder, mock_qwrap, client):
+    """GET /readyz returns 503 until the model is loaded and Qdrant answers"""
+    mock_qwrap.ping.return_value = True
+    mock_embedder.is_loaded = False
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['checks'] == {'model': False, 'qdrant': True}
+
+    mock_embedder.is_loaded = True
+    assert client.get('/readyz').status_code == 200
+
+    mock_qwrap.ping.return_value = False
+    assert client.get('/readyz').status_code == 503
+
+
+def test_open_index_selects_numpy_backend(tmp_path):
+    """The vector index backend follows the VECTOR_INDEX config section"""
+    from app import routes as routes_module
+    from app.services.numpy_index import NumpyVectorIndex
+    with patch.object(routes_module.config, 'vector_index_backend', 'numpy'), \
+            patch.object(routes_module.config, 'vector_index_dir', str(tmp_path)):
+        index = routes_module._open_index('papers')
+    assert isinstance(index, NumpyVectorIndex)
+    assert index.ping()
+
+
 def test_metrics_route(client):
     """GET /metrics returns Prometheus metrics"""
     response = client.get('/metrics')
@@ -121,3 +248,329 @@ def test_metrics_dashboard(mock_render, client):
     """GET /metrics_dashboard renders dashboard page"""
     response = client.get('/metrics_dashboard')
     assert b"DASHBOARD_HTML" in response.data
+
+@patch('app.routes.qwrap', new_callable=MagicMock)
+def test_paper_returns_full_payload(mock_qwrap, client):
+    """GET /papers/<id> returns the payload fetched by ID"""
+    mock_qwrap.retrieve.return_value = [{'id': 7, 'payload': {'TITLE OF THE PAPER': 'Paper A'}}]
+    response = client.get('/papers/7')
+    assert response.status_code == 200
+    assert response.get_json()['payload'] == {'TITLE OF THE PAPER': 'Paper A'}
+    mock_qwrap.retrieve.assert_called_once_with([7])
+
+@patch('app.routes.qwrap', new_callable=MagicMock)
+def test_paper_not_found(mock_qwrap, client):
+    """GET /papers/<id> for an unknown ID returns 404"""
+    mock_qwrap.retrieve.return_value = []
+    response = client.get('/papers/123e4567-e89b-12d3-a456-426614174000')
+    assert response.status_code == 404
+    mock_qwrap.retrieve.assert_called_once_with(['123e4567-e89b-12d3-a456-426614174000'])
+
+
+@patch('app.routes.qwrap', new_callable=MagicMock)
+def test_paper_rejects_malformed_id(mock_qwrap, client):
+    """GET /papers/<id> with an ID that is neither an integer nor a UUID returns 404 without querying"""
+    assert client.get('/papers/abc').status_code == 404
+    assert client.get('/papers/-1').status_code == 404
+    mock_qwrap.retrieve.assert_not_called()
+
+@patch('app.routes.discover_collections', MagicMock())
+@patch('app.routes.qwrap', None)
+def test_paper_without_collection(client):
+    """GET /papers/<id> before indexing returns 503"""
+    response = client.get('/papers/1')
+    assert response.status_code == 503
+
+@patch('app.routes.render_template', return_value="SEARCH_HTML")
+@patch('app.routes.qwrap', new_callable=MagicMock)
+@patch('app.routes.Embedder.embed')
+def test_search_repeated_query_served_from_cache(mock_embed, mock_qwrap, mock_render, client):
+    """Repeating a query skips embedding and vector search until the collection changes"""
+    mock_qwrap.collection_name = "papers"
+    mock_qwrap.collection_version = 0
+    mock_qwrap.search.return_value = [{'id': 1}]
+    mock_embed.return_value = [[0.1]*768]
+
+    client.post('/search', data={'query': 'UV light disinfection', 'top_k': '4'})
+    client.post('/search', data={'query': 'uv light  disinfection', 'top_k': '4'})
+    assert mock_qwrap.search.call_count == 1
+    assert mock_embed.call_count == 1
+
+    mock_qwrap.collection_version = 1
+    client.post('/search', data={'query': 'UV light disinfection', 'top_k': '4'})
+    assert mock_qwrap.search.call_count == 2
+
+
+@patch('app.routes.qwrap', None)
+@patch('app.routes.keyword_index', None)
+@patch('app.routes.facet_index', None)
+@patch('app.routes._load_facet_index', MagicMock())
+@patch('app.routes._load_keyword_index')
+@patch('app.routes.embedder')
+@patch('app.routes._open_index')
+def test_discover_collections_attaches_default_collection(mock_open_index, mock_embedder, mock_load_keyword_index):
+    """Startup discovery registers collections and attaches to the default one when sizes match"""
+    from app import routes as routes_module
+    indexes = {}
+
+    def open_index(name):
+        index = indexes.setdefault(name, MagicMock(collection_name=name))
+        index.list_collections.return_value = [routes_module.config.default_collection, 'other']
+        index.collection_info.return_value = {
+            'vector_size': 384 if name == routes_module.config.default_collection else 768,
+            'points_count': 42,
+        }
+        return index
+
+    mock_open_index.side_effect = open_index
+    mock_embedder.dimension = 384
+    with patch.dict(routes_module.collections, clear=True):
+        registry = routes_module.discover_collections()
+        assert registry[routes_module.config.default_collection]['compatible'] is True
+        assert registry['other']['compatible'] is False
+        assert routes_module.qwrap is indexes[routes_module.config.default_collection]
+        assert routes_module.keyword_index is mock_load_keyword_index.return_value
+
+
+@patch('app.routes.qwrap', None)
+@patch('app.routes.keyword_index', None)
+@patch('app.routes.facet_index', None)
+@patch('app.routes._load_facet_index', MagicMock())
+@patch('app.routes._load_keyword_index', MagicMock())
+@patch('app.routes.embedder')
+@patch('app.routes._open_index')
+def test_discover_collections_does_not_load_the_model(mock_open_index, mock_embedder):
+    """Discovery attaches from collection info alone while the model is not loaded"""
+    from app import routes as routes_module
+    name = routes_module.config.default_collection
+    mock_open_index.return_value.list_collections.return_value = [name]
+    mock_open_index.return_value.collection_name = name
+    mock_open_index.return_value.collection_info.return_value = {'vector_size': 384, 'points_count': 42}
+    mock_embedder.is_loaded = False
+    dimension = PropertyMock(return_value=384)
+    type(mock_embedder).dimension = dimension
+    with patch.dict(routes_module.collections, clear=True):
+        registry = routes_module.discover_collections()
+        assert registry[name]['compatible'] is None
+    assert routes_module.qwrap is mock_open_index.return_value
+    dimension.assert_not_called()
+
+
+@patch('app.routes.qwrap', None)
+@patch('app.routes._discovery_retry_at', 0.0)
+@patch('app.routes._discovery_retry_delay', 1.0)
+@patch('app.routes.time.monotonic')
+@patch('app.routes.discover_collections')
+def test_requests_retry_discovery_with_backoff(mock_discover, mock_monotonic):
+    """Requests retry discovery while detached, backing off exponentially between attempts"""
+    from app import routes as routes_module
+    mock_monotonic.return_value = 100.0
+    routes_module._attach_if_detached()
+    routes_module._attach_if_detached()
+    assert mock_discover.call_count == 1
+
+    mock_monotonic.return_value = 101.0
+    routes_module._attach_if_detached()
+    assert mock_discover.call_count == 2
+    assert routes_module._discovery_retry_at == 103.0
+
+    attached = MagicMock()
+    mock_discover.side_effect = lambda: setattr(routes_module, 'qwrap', attached)
+    mock_monotonic.return_value = 103.0
+    routes_module._attach_if_detached()
+    assert routes_module.qwrap is attached
+    assert routes_module._discovery_retry_delay == routes_module.DISCOVERY_RETRY_SECONDS
+
+
+@patch('app.routes.search_cache', None)
+@patch('app.routes.qwrap', new_callable=MagicMock)
+@patch('app.routes.embedder')
+def test_api_search_embeds_and_searches_once(mock_embedder, mock_qwrap, client):
+    """POST /api/search embeds all queries in one call and runs one batch search"""
+    mock_embedder.embed.return_value = [[0.1], [0.2]]
+    mock_qwrap.search_batch.return_value = [[{'id': 1, 'score': 0.9, 'payload': {}}], []]
+
+    response = client.post('/api/search', json={'queries': ['UV light', {'query': 'HEPA', 'top_k': 2}], 'top_k': 3})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r['query'] for r in body['results']] == ['UV light', 'HEPA']
+    assert body['results'][0]['results'][0]['id'] == 1
+    mock_embedder.embed.assert_called_once_with(['UV light', 'HEPA'], persist=False)
+    assert mock_qwrap.search_batch.call_args.args[1] == [3, 2]
+
+
+@patch('app.routes.qwrap', new_callable=MagicMock)
+def test_api_search_validates_body(mock_qwrap, client):
+    """POST /api/search rejects malformed bodies with 400"""
+    assert client.post('/api/search', json={}).status_code == 400
+    assert client.post('/api/search', json={'queries': ['']}).status_code == 400
+    assert client.post('/api/search', json={'queries': [{'query': 'x', 'top_k': 0}]}).status_code == 400
+    assert client.post('/api/search', data='not json').status_code == 400
+
+
+@patch('app.routes.discover_collections', MagicMock())
+@patch('app.routes.qwrap', None)
+def test_api_search_requires_collection(client):
+    """POST /api/search without indexed collection returns 503"""
+    assert client.post('/api/search', json={'queries': ['x']}).status_code == 503
+
+
+@patch('app.routes.search_cache', None)
+@patch('app.routes.qwrap', new_callable=MagicMock)
+@patch('app.routes.query_embedder')
+def test_keyword_and_hybrid_search_modes(mock_query_embedder, mock_qwrap):
+    """Keyword mode skips embedding; hybrid mode fuses dense and keyword rankings"""
+    from app import routes as routes_module
+    from app.services.keyword_index import KeywordIndex
+    index = KeywordIndex(payload_fields=('TITLE OF THE PAPER',))
+    index.add([1, 2], ['HEPA filter efficiency', 'UV-C lamps in classrooms'], [{'TITLE OF THE PAPER': 'A'}, {'TITLE OF THE PAPER': 'B'}])
+    mock_query_embedder.embed.return_value = [[0.1]]
+    mock_qwrap.search.return_value = [{'id': 2, 'score': 0.9, 'payload': {}}, {'id': 3, 'score': 0.8, 'payload': {}}]
+
+    with patch.object(routes_module, 'keyword_index', index):
+        keyword = routes_module._run_search('hepa', 5, 'keyword')
+        mock_query_embedder.embed.assert_not_called()
+        assert [r['id'] for r in keyword] == [1]
+
+        hybrid = routes_module._run_search('uv-c lamps', 3, 'hybrid')
+        assert hybrid[0]['id'] == 2
+        assert {r['id'] for r in hybrid} == {2, 3}
+        assert mock_qwrap.search.call_args.kwargs['top_k'] == routes_module.config.keyword_hybrid_candidates
+
+
+@patch('app.routes.search_cache', None)
+@patch('app.routes.qwrap', new_callable=MagicMock)
+@patch('app.routes.embedder')
+def test_api_search_passes_filters(mock_embedder, mock_qwrap, client):
+    """POST /api/search applies the top-level filter unless a query has its own"""
+    mock_embedder.embed.return_value = [[0.1], [0.2]]
+    mock_qwrap.search_batch.return_value = [[], []]
+
+    response = client.post('/api/search', json={
+        'queries': ['UV light', {'query': 'HEPA', 'filter': {'TYPE OF INDOOR ENVIRONMENT': ['Office', 'School']}}],
+        'filter': {'TYPE OF INDOOR ENVIRONMENT': 'School'},
+    })
+    assert response.status_code == 200
+    assert mock_qwrap.search_batch.call_args.kwargs['query_filters'] == [
+        {'TYPE OF INDOOR ENVIRONMENT': 'School'}, {'TYPE OF INDOOR ENVIRONMENT': ['Office', 'School']}
+    ]
+    assert client.post('/api/search', json={'queries': ['x'], 'filter': {'NOT A FIELD': 'x'}}).status_code == 400
+
+
+@patch('app.routes.render_template', return_value="SEARCH_HTML")
+@patch('app.routes.search_cache', None)
+@patch('app.routes.qwrap', new_callable=MagicMock)
+@patch('app.routes.query_embedder')
+def test_search_form_filter(mock_query_embedder, mock_qwrap, mock_render, client):
+    """Comma-separated form values become a multi-value filter on the search"""
+    mock_query_embedder.embed.return_value = [[0.1]]
+    mock_qwrap.search.return_value = []
+    client.post('/search', data={'query': 'ventilation', 'filter:TYPE OF INDOOR ENVIRONMENT': 'School, Office'})
+    assert mock_qwrap.search.call_args.kwargs['query_filter'] == {'TYPE OF INDOOR ENVIRONMENT': ['School', 'Office']}
+
+    client.post('/search', data={'query': 'ventilation', 'filter:TYPE OF INDOOR ENVIRONMENT': '"Office, open plan"'})
+    assert mock_qwrap.search.call_args.kwargs['query_filter'] == {'TYPE OF INDOOR ENVIRONMENT': 'Office, open plan'}
+
+
+@patch('app.routes.search_cache', None)
+@patch('app.routes.qwrap', new_callable=MagicMock)
+@patch('app.routes.query_embedder')
+def test_filtered_keyword_search_falls_back_to_dense_on_stale_index(mock_query_embedder, mock_qwrap):
+    """A keyword index that predates the filter fields is not used for filtered searches"""
+    from app import routes as routes_module
+    mock_query_embedder.embed.return_value = [[0.1]]
+    mock_qwrap.search.return_value = [{'id': 1, 'score': 0.5, 'payload': {}}]
+    stale = MagicMock()
+    stale.can_filter.return_value = False
+    with patch('app.routes.keyword_index', stale):
+        results = routes_module._run_search('ventilation', 5, 'keyword', {'TYPE OF INDOOR ENVIRONMENT': 'School'})
+    assert results == mock_qwrap.search.return_value
+    stale.search.assert_not_called()
+
+
+def test_api_facets(client):
+    """GET /api/facets returns counts, co-occurrences and ID lists"""
+    from app.services.facet_index import FacetIndex
+    index = FacetIndex(fields=("ENV", "METHOD"))
+    index.add([1, 2, 3], [{"ENV": "School", "METHOD": "HEPA"}, {"ENV": "School", "METHOD": "UV"}, {"ENV": "Office", "METHOD": "HEPA"}])
+
+    with patch('app.routes.facet_index', index):
+        body = client.get('/api/facets').get_json()
+        assert body['total'] == 3
+        assert body['fields']['ENV'] == [{'value': 'School', 'count': 2}, {'value': 'Office', 'count': 1}]
+        assert client.get('/api/facets?field=ENV&by=METHOD').get_json()['table']['School'] == {'HEPA': 1, 'UV': 1}
+        assert client.get('/api/facets?field=METHOD&value=HEPA').get_json()['ids'] == [1, 3]
+        assert client.get('/api/facets?field=NOPE').status_code == 400
+        assert client.get('/api/facets?field=ENV&by=ENV').status_code == 400
+
+
+@patch('app.routes.facet_index', None)
+def test_api_facets_without_index(client):
+    """GET /api/facets without a facet index returns 503"""
+    assert client.get('/api/facets').status_code == 503
+
+
+@patch('app.routes._probe_qwrap', MagicMock())
+@patch('app.routes._follow_other_workers', False)
+@patch('app.routes.qwrap', MagicMock(collection_name='papers'))
+@patch('app.routes._open_index')
+def test_reset_after_fork_reopens_index(mock_open_index):
+    """A forked worker reopens the vector index instead of sharing the master's client"""
+    from app import routes as routes_module
+    routes_module.reset_after_fork()
+    mock_open_index.assert_called_once_with('papers')
+    assert routes_module.qwrap is mock_open_index.return_value
+    assert routes_module._probe_qwrap is None
+    assert routes_module._follow_other_workers is True
+
+
+@patch('app.routes._follow_other_workers', True)
+@patch('app.routes.qwrap', MagicMock())
+@patch('app.routes.keyword_index', None)
+@patch('app.routes.facet_index', None)
+@patch('app.routes.search_cache', new_callable=MagicMock)
+@patch('app.routes.answer_cache', new_callable=MagicMock)
+@patch('app.routes._load_facet_index')
+@patch('app.routes._load_keyword_index')
+@patch('app.routes._open_index')
+def test_worker_reloads_collection_synced_by_another_worker(
+    mock_open_index, mock_load_keyword_index, mock_load_facet_index, mock_answer_cache, mock_search_cache, tmp_path, client
+):
+    """Workers reload the collection and drop caches once another worker has synced it"""
+    from app import routes as routes_module
+    name = routes_module.config.default_collection
+    with patch.object(routes_module.config, 'ingest_jobs_dir', str(tmp_path)), \
+            patch.dict(routes_module._sync_stamps, clear=True):
+        client.get('/healthz')
+        mock_open_index.assert_not_called()
+
+        (tmp_path / f"synced-{name}.stamp").write_text('other-worker-1')
+        client.get('/healthz')
+        client.get('/healthz')
+        mock_open_index.assert_called_once_with(name)
+        assert routes_module.qwrap is mock_open_index.return_value
+        assert routes_module.keyword_index is mock_load_keyword_index.return_value
+        assert routes_module.facet_index is mock_load_facet_index.return_value
+        mock_search_cache.clear.assert_called_once()
+        mock_answer_cache.clear.assert_called_once()
+
+        routes_module._write_sync_stamp(name)
+        client.get('/healthz')
+        assert mock_open_index.call_count == 1
+
+
+@patch('app.routes._chat', None)
+@patch('app.routes.facet_index', None)
+@patch('app.routes.qwrap', new_callable=MagicMock)
+@patch('app.routes.ChatService')
+def test_chat_service_is_shared_until_collection_changes(mock_chat_service, mock_qwrap):
+    """Requests share one ChatService and OpenAI client; a new collection gets a new service"""
+    from app import routes as routes_module
+    mock_chat_service.side_effect = lambda qdrant, *args, **kwargs: MagicMock(qdrant=qdrant, facet_index=None)
+    first = routes_module._chat_service()
+    assert routes_module._chat_service() is first
+    assert mock_chat_service.call_args.kwargs['client'] is routes_module.openai_client
+
+    with patch('app.routes.qwrap', MagicMock()):
+        assert routes_module._chat_service() is not first
+    assert mock_chat_service.call_count == 2
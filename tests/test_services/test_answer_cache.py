@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from app.services.answer_cache import SemanticAnswerCache
+
+
+@pytest.fixture
+def cache():
+    """Fixture returning a semantic cache with a 0.9 similarity threshold."""
+    cache = SemanticAnswerCache(threshold=0.9, max_items=2, ttl_seconds=60)
+    cache.store([1.0, 0.0], "gpt", "papers", 1, [1, 2], "Answer A", [{"id": 1}, {"id": 2}])
+    return cache
+
+
+def test_similar_question_with_same_context_hits(cache):
+    """Test that a near-identical question with the same context IDs returns the cached answer."""
+    hit = cache.lookup([0.99, 0.05], "gpt", "papers", 1, [1, 2])
+    assert hit == ("Answer A", [{"id": 1}, {"id": 2}])
+
+
+def test_dissimilar_or_different_context_misses(cache):
+    """Test that low similarity, different context IDs or another model all miss."""
+    assert cache.lookup([0.0, 1.0], "gpt", "papers", 1, [1, 2]) is None
+    assert cache.lookup([1.0, 0.0], "gpt", "papers", 1, [2, 1]) is None
+    assert cache.lookup([1.0, 0.0], "gpt-4", "papers", 1, [1, 2]) is None
+
+
+def test_new_collection_version_invalidates(cache):
+    """Test that re-indexing the collection drops older answers."""
+    assert cache.lookup([1.0, 0.0], "gpt", "papers", 2, [1, 2]) is None
+    assert cache.lookup([1.0, 0.0], "gpt", "papers", 1, [1, 2]) is None
+
+
+def test_size_and_ttl_eviction(cache):
+    """Test that the oldest entry is evicted by size and entries expire after the TTL."""
+    cache.store([0.0, 1.0], "gpt", "papers", 1, [3], "Answer B", [])
+    cache.store(np.array([0.7, 0.7]), "gpt", "papers", 1, [4], "Answer C", [])
+    assert cache.lookup([1.0, 0.0], "gpt", "papers", 1, [1, 2]) is None
+    with patch("app.services.answer_cache.time.monotonic", return_value=1e12):
+        assert cache.lookup([0.0, 1.0], "gpt", "papers", 1, [3]) is None
@@ -1,6 +1,8 @@
+import numpy as np
 import pytest
 from unittest.mock import MagicMock, patch
-from app.services.chat import ChatService
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.chat import ChatService, CONTEXT_FIELDS
 
 
 @pytest.fixture
@@ -37,10 +39,10 @@ def chat_service(mock_embedder, mock_qdrant):
 
 
 def test_embed_query(chat_service, mock_embedder):
-    """Test that _embed_query calls the embedder and returns the correct vector."""
+    """Test that _embed_query calls the embedder, keeping the question out of the disk cache."""
     result = chat_service._embed_query("What is air quality?")
     assert result == [0.1, 0.2, 0.3]
-    mock_embedder.embed.assert_called_once_with(["What is air quality?"])
+    mock_embedder.embed.assert_called_once_with(["What is air quality?"], persist=False)
 
 
 def test_search_qdrant(chat_service, mock_qdrant):
@@ -49,6 +51,7 @@ def test_search_qdrant(chat_service, mock_qdrant):
     assert isinstance(results, list)
     assert len(results) == 2
     assert results[0]["payload"]["TITLE OF THE PAPER"] == "Paper A"
+    assert mock_qdrant.search.call_args.kwargs["payload_include"] == CONTEXT_FIELDS
 
 
 def test_build_context(chat_service, mock_qdrant):
@@ -80,6 +83,29 @@ def test_generate_answer(mock_openai, chat_service):
     mock_openai.assert_called_once()
 
 
+def test_build_prompt_uses_context_budget(mock_qdrant, mock_embedder):
+    """Test that a ContextBuilder limits the context to its token budget."""
+    from app.services.context_builder import ContextBuilder
+    service = ChatService(qdrant=mock_qdrant, embedder=mock_embedder, context_builder=ContextBuilder(max_tokens=30))
+    prompt = service._build_prompt("Does ventilation help?", mock_qdrant.search.return_value)
+    assert "Paper A" in prompt
+    assert "Paper B" not in prompt
+
+
+@patch("app.services.chat.metrics")
+@patch("app.services.chat.openai.ChatCompletion.create")
+def test_generate_answer_records_token_usage(mock_openai, mock_metrics, chat_service):
+    """Test that prompt and completion tokens reported by the API are exported."""
+    from openai.openai_object import OpenAIObject
+    mock_openai.return_value = OpenAIObject.construct_from({
+        "choices": [{"message": {"role": "assistant", "content": "Answer."}}],
+        "usage": {"prompt_tokens": 321, "completion_tokens": 12},
+    })
+    chat_service._generate_answer("Prompt text", max_tokens=50)
+    mock_metrics.CHAT_PROMPT_TOKENS.labels.return_value.observe.assert_called_once_with(321)
+    mock_metrics.CHAT_COMPLETION_TOKENS.labels.return_value.observe.assert_called_once_with(12)
+
+
 @patch("app.services.chat.openai.ChatCompletion.create", side_effect=Exception("API failure"))
 def test_generate_answer_handles_error(mock_openai, chat_service):
     """Test that _generate_answer handles OpenAI API errors gracefully."""
@@ -94,3 +120,83 @@ def test_answer_question_full_flow(mock_gen_answer, chat_service):
     assert "context_docs" in result
     assert isinstance(result["context_docs"], list)
     assert result["answer"].startswith("Indoor air quality")
+
+
+@patch.object(ChatService, "_generate_answer", return_value="Ventilation helps.")
+def test_answer_question_reuses_cached_answer(mock_gen_answer, mock_qdrant):
+    """Test that a repeated question with identical context is answered from the semantic cache."""
+    embedder = MagicMock()
+    embedder.embed.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
+    mock_qdrant.collection_name = "papers"
+    mock_qdrant.collection_version = 0
+    service = ChatService(qdrant=mock_qdrant, embedder=embedder, answer_cache=SemanticAnswerCache(threshold=0.9))
+
+    first = service.answer_question("How to improve indoor air?")
+    second = service.answer_question("How to improve indoor air?")
+
+    assert mock_gen_answer.call_count == 1
+    assert second == first
+
+
+@patch.object(ChatService, "_generate_answer", return_value="Error: timeout")
+def test_failed_answers_are_not_cached(mock_gen_answer, mock_qdrant):
+    """Test that OpenAI errors are not stored in the semantic cache."""
+    embedder = MagicMock()
+    embedder.embed.return_value = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
+    service = ChatService(qdrant=mock_qdrant, embedder=embedder, answer_cache=SemanticAnswerCache())
+    service.answer_question("Q")
+    service.answer_question("Q")
+    assert mock_gen_answer.call_count == 2
+
+
+def _chunk(content):
+    """Build a streamed completion chunk carrying a content delta."""
+    return MagicMock(choices=[MagicMock(delta={"content": content} if content is not None else {})])
+
+
+@patch("app.services.chat.openai.ChatCompletion.create")
+def test_stream_answer_yields_context_then_tokens(mock_openai, chat_service):
+    """Test that stream_answer emits context first, then tokens as they arrive, then done."""
+    mock_openai.return_value = iter([_chunk(None), _chunk("Ventilation"), _chunk(" helps.")])
+
+    events = list(chat_service.stream_answer("How to improve indoor air?"))
+
+    assert [e["type"] for e in events] == ["context", "token", "token", "done"]
+    assert len(events[0]["context_docs"]) == 2
+    assert "".join(e["text"] for e in events if e["type"] == "token") == "Ventilation helps."
+    assert mock_openai.call_args.kwargs["stream"] is True
+
+
+@patch("app.services.chat.openai.ChatCompletion.create", side_effect=Exception("API failure"))
+def test_stream_answer_reports_openai_errors(mock_openai, chat_service):
+    """Test that OpenAI failures during streaming become an error event."""
+    events = list(chat_service.stream_answer("Q"))
+    assert [e["type"] for e in events] == ["context", "error", "done"]
+    assert "API failure" in events[1]["message"]
+
+
+@patch("app.services.chat.ChatService._generate_answer")
+def test_counting_questions_are_answered_from_facets(mock_gen_answer, mock_embedder, mock_qdrant):
+    """Test that counting questions skip embedding, search and the LLM when a facet index is set."""
+    from app.services.facet_index import FacetIndex
+    facets = FacetIndex(fields=("TYPE OF INDOOR ENVIRONMENT",))
+    facets.add([1, 2, 3], [{"TYPE OF INDOOR ENVIRONMENT": v} for v in ("School", "School", "Office")])
+    service = ChatService(
+        qdrant=mock_qdrant, embedder=mock_embedder, facet_index=facets,
+        facet_aliases=[("indoor environment", "TYPE OF INDOOR ENVIRONMENT")]
+    )
+
+    result = service.answer_question("How many papers are there per indoor environment?")
+    assert result["answer"].splitlines()[1:] == ["- School: 2", "- Office: 1"]
+    assert result["context_docs"] == []
+    events = list(service.stream_answer("How many papers study a School?"))
+    assert [e["type"] for e in events] == ["context", "token", "done"]
+    assert events[1]["text"] == "There are 2 papers with indoor environment School."
+    mock_embedder.embed.assert_not_called()
+    mock_qdrant.search.assert_not_called()
+    mock_gen_answer.assert_not_called()
+
+    mock_gen_answer.return_value = "Ventilation helps."
+    assert service.answer_question("Does ventilation help?")["answer"] == "Ventilation helps."
+    assert service.answer_question("How many air changes per hour are needed in schools?")["answer"] == "Ventilation helps."
+    assert service.answer_question("What filtration reduces the number of particles in offices?")["answer"] == "Ventilation helps."
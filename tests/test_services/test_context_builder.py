@@ -0,0 +1,64 @@
+from app.services.context_builder import ContextBuilder, estimate_tokens
+
+
+def _result(pid, score, title, aim="", findings=""):
+    return {"id": pid, "score": score, "payload": {
+        "TITLE OF THE PAPER": title,
+        "AIM OF THE PAPER": aim,
+        "MAIN FINDINGS OF THE PAPER": findings,
+    }}
+
+
+def test_estimate_tokens():
+    """Test that token estimates grow with text length and count short words individually."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a b c d e") >= 5
+    assert estimate_tokens("ventilation " * 100) > estimate_tokens("ventilation " * 10)
+
+
+def test_short_papers_are_included_whole_in_score_order():
+    """Test that papers within the budget are written in full, best score first."""
+    results = [
+        _result(1, 0.5, "Paper B", "Analyze CO2 levels", "High CO2 reduces performance"),
+        _result(2, 0.9, "Paper A", "Study ventilation", "Ventilation improves air quality"),
+    ]
+    context = ContextBuilder(max_tokens=500).build("ventilation", results)
+    assert context == (
+        "Title: Paper A\nAim: Study ventilation\nFindings: Ventilation improves air quality\n\n"
+        "Title: Paper B\nAim: Analyze CO2 levels\nFindings: High CO2 reduces performance"
+    )
+
+
+def test_context_respects_budget():
+    """Test that the context never exceeds its token budget, however many papers are retrieved."""
+    long_findings = " ".join(f"Sentence {i} about filtration and airflow." for i in range(60))
+    results = [_result(i, 1 - i / 100, f"Paper {i} on air cleaners", "Aim", long_findings + f" Unique {i}.") for i in range(30)]
+    builder = ContextBuilder(max_tokens=600, max_passage_tokens=150, duplicate_threshold=1.01)
+    context = builder.build("filtration", results)
+    assert estimate_tokens(context) <= 600
+    assert context.startswith("Title: Paper 0 on air cleaners")
+    assert context.count("Title:") >= 3
+
+
+def test_long_paper_keeps_query_relevant_sentences():
+    """Test that a paper over its allowance keeps the sentences matching the question."""
+    filler = " ".join(f"Participants reported comfort level {i}." for i in range(40))
+    findings = f"{filler} Ozone emissions from ionizers exceeded limits. {filler}"
+    results = [_result(1, 0.9, "Ionizer study", "Measure emissions", findings)]
+    context = ContextBuilder(max_tokens=80, max_passage_tokens=80).build("ozone from ionizers", results)
+    assert context.startswith("Title: Ionizer study")
+    assert "Ozone emissions from ionizers exceeded limits." in context
+    assert context.endswith("...")
+    assert estimate_tokens(context) <= 80
+
+
+def test_near_duplicates_are_skipped():
+    """Test that a paper repeating an included one is dropped in favour of distinct papers."""
+    results = [
+        _result(1, 0.9, "HEPA filters in classrooms", "Measure PM2.5", "HEPA filters reduced PM2.5 by half"),
+        _result(2, 0.8, "HEPA filters in classrooms", "Measure PM2.5", "HEPA filters reduced PM2.5 by half"),
+        _result(3, 0.7, "UV-C in hospitals", "Measure bacteria", "UV-C reduced airborne bacteria"),
+    ]
+    context = ContextBuilder(max_tokens=500).build("HEPA", results)
+    assert context.count("HEPA filters in classrooms") == 1
+    assert "UV-C in hospitals" in context
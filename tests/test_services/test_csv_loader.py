@@ -69,3 +69,42 @@ a,b,c
     assert "document" in df.columns
     assert all(isinstance(x, str) for x in df["document"])
     assert len(df) == 2
+
+
+def test_iter_chunks_matches_load(tmp_path):
+    """Test that streaming chunks from a file yields the same rows as a full load."""
+    content = "Title of the paper,Main findings of the paper\n" + "".join(f"Paper {i},Finding {i}\n" for i in range(5))
+    path = tmp_path / "papers.csv"
+    path.write_text(content)
+
+    chunks = list(CSVLoader(str(path)).iter_chunks(chunksize=2))
+    full = CSVLoader(content.encode()).load()
+
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    streamed = pd.concat(chunks)
+    assert list(streamed["id"]) == list(full["id"]) == [0, 1, 2, 3, 4]
+    assert list(streamed["document"]) == list(full["document"])
+
+
+def test_columnar_paths_match_rowwise():
+    """Test that columnar ID coercion and document assembly match the row-wise reference."""
+    df = pd.DataFrame({
+        "id": ["3", None, "7.9", 12.0],
+        "Title of the paper": ["A", None, "C", "D"],
+        "Type of indoor environment": [None, "Office", "School", None],
+        "Year": [2001.0, None, 2019.5, 2020.0],
+    })
+    fields = ["Title of the paper", "Type of indoor environment", "Year"]
+
+    pd.testing.assert_series_equal(CSVLoader._coerce_ids(df["id"]), CSVLoader._coerce_ids_rowwise(df["id"]))
+    pd.testing.assert_series_equal(
+        CSVLoader._build_documents(df, fields),
+        CSVLoader._build_documents_rowwise(df, fields)
+    )
+    assert list(CSVLoader._coerce_ids(df["id"])) == [3, 1, 7, 12]
+
+
+def test_coerce_ids_falls_back_for_non_numeric():
+    """Test that non-numeric IDs fail the same way as the row-wise path."""
+    with pytest.raises(ValueError):
+        CSVLoader._coerce_ids(pd.Series(["1", "abc"]))
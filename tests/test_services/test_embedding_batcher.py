@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+@pytest.fixture
+def mock_embedder():
+    """Fixture returning an Embedder mock that encodes each text as [len(text), index]."""
+    mock = MagicMock()
+    mock.model_name = "test-model"
+    mock.embed.side_effect = lambda texts, batch_size=32, persist=True: np.array(
+        [[len(t), i] for i, t in enumerate(texts)], dtype=np.float32
+    )
+    return mock
+
+
+def test_concurrent_single_texts_are_coalesced(mock_embedder):
+    """Test that concurrent single-text calls share one batched encode and get their own rows."""
+    batcher = EmbeddingBatcher(mock_embedder, max_batch_size=8, max_wait_ms=200)
+    texts = ["a" * n for n in range(1, 5)]
+    results = {}
+    barrier = threading.Barrier(len(texts))
+
+    def call(text):
+        barrier.wait()
+        results[text] = batcher.embed([text])
+
+    threads = [threading.Thread(target=call, args=(t,)) for t in texts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert mock_embedder.embed.call_count == 1
+    for text in texts:
+        assert results[text].shape == (1, 2)
+        assert results[text][0, 0] == len(text)
+
+
+def test_batch_is_capped_at_max_batch_size(mock_embedder):
+    """Test that no encode call receives more than max_batch_size texts."""
+    batcher = EmbeddingBatcher(mock_embedder, max_batch_size=2, max_wait_ms=50)
+    threads = [threading.Thread(target=batcher.embed, args=([f"q{i}"],)) for i in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    sizes = [len(c.args[0]) for c in mock_embedder.embed.call_args_list]
+    assert all(c.kwargs['persist'] is False for c in mock_embedder.embed.call_args_list)
+    assert sum(sizes) == 5
+    assert max(sizes) <= 2
+
+
+def test_multi_text_calls_bypass_the_queue(mock_embedder):
+    """Test that multi-text calls go straight to the embedder."""
+    batcher = EmbeddingBatcher(mock_embedder)
+    result = batcher.embed(["a", "bb", "ccc"], batch_size=16)
+    assert result.shape == (3, 2)
+    mock_embedder.embed.assert_called_once_with(["a", "bb", "ccc"], batch_size=16, persist=True)
+    assert batcher._worker is None
+
+
+def test_encode_errors_reach_every_caller(mock_embedder):
+    """Test that a failed batched encode raises in the waiting caller and the worker keeps running."""
+    mock_embedder.embed.side_effect = [RuntimeError("boom"), np.zeros((1, 2), dtype=np.float32)]
+    batcher = EmbeddingBatcher(mock_embedder, max_wait_ms=0)
+    with pytest.raises(RuntimeError):
+        batcher.embed(["q"])
+    assert batcher.embed(["q"]).shape == (1, 2)
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_callers_are_released_when_the_worker_dies(mock_embedder):
+    """Test that a worker killed by a non-Exception error still resolves the pending futures."""
+    mock_embedder.embed.side_effect = [SystemExit(), np.zeros((1, 2), dtype=np.float32)]
+    batcher = EmbeddingBatcher(mock_embedder, max_wait_ms=0, timeout=5)
+    with pytest.raises(RuntimeError):
+        batcher.embed(["q"])
+    batcher._worker.join(timeout=5)
+    assert batcher.embed(["q"]).shape == (1, 2)
+
+
+def test_callers_time_out_when_no_result_arrives(mock_embedder):
+    """Test that a caller stops waiting after the timeout if the batched encode hangs."""
+    release = threading.Event()
+    mock_embedder.embed.side_effect = lambda texts, **kwargs: release.wait() and np.zeros((len(texts), 2), dtype=np.float32)
+    batcher = EmbeddingBatcher(mock_embedder, max_wait_ms=0, timeout=0.05)
+    with pytest.raises(FutureTimeoutError):
+        batcher.embed(["q"])
+    release.set()
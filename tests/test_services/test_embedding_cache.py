@@ -0,0 +1,114 @@
+import threading
+import numpy as np
+import pytest
+from unittest.mock import patch, MagicMock
+from app.services.embedder import Embedder
+from app.services.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture returning a two-tier cache stored in a temporary directory."""
+    return EmbeddingCache(cache_dir=str(tmp_path), max_memory_items=2)
+
+
+def test_get_many_reports_misses(cache):
+    """Test that unknown texts come back as None."""
+    assert cache.get_many("model", ["a", "b"]) == [None, None]
+
+
+def test_put_then_get_from_memory(cache):
+    """Test that stored embeddings are returned from the memory tier."""
+    cache.put_many("model", ["a"], np.array([[1.0, 2.0]], dtype=np.float32))
+    found = cache.get_many("model", ["a", "b"])
+    np.testing.assert_array_equal(found[0], [1.0, 2.0])
+    assert found[1] is None
+
+
+def test_disk_tier_survives_new_instance(tmp_path, cache):
+    """Test that embeddings persisted on disk are visible to a fresh cache instance."""
+    cache.put_many("model", ["a", "b"], np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32))
+    fresh = EmbeddingCache(cache_dir=str(tmp_path))
+    found = fresh.get_many("model", ["b", "a"])
+    np.testing.assert_array_equal(found[0], [3.0, 4.0])
+    np.testing.assert_array_equal(found[1], [1.0, 2.0])
+    assert fresh.get_many("other-model", ["a"]) == [None]
+
+
+def test_unpersisted_embeddings_stay_in_memory(tmp_path, cache):
+    """Test that embeddings stored with persist=False are not written to the disk tier."""
+    cache.put_many("model", ["query"], np.array([[1.0, 2.0]], dtype=np.float32), persist=False)
+    assert cache.get_many("model", ["query"])[0] is not None
+    assert EmbeddingCache(cache_dir=str(tmp_path)).get_many("model", ["query"]) == [None]
+
+
+def test_caches_sharing_a_directory_append_distinct_rows(tmp_path):
+    """Test that two processes' caches appending to one directory never reuse each other's rows."""
+    first = EmbeddingCache(cache_dir=str(tmp_path))
+    second = EmbeddingCache(cache_dir=str(tmp_path))
+    first.get_many("model", ["a"])
+    second.get_many("model", ["b"])
+    first.put_many("model", ["a"], np.array([[1.0, 1.0]], dtype=np.float32))
+    second.put_many("model", ["b"], np.array([[2.0, 2.0]], dtype=np.float32))
+    found = EmbeddingCache(cache_dir=str(tmp_path)).get_many("model", ["a", "b"])
+    np.testing.assert_array_equal(found[0], [1.0, 1.0])
+    np.testing.assert_array_equal(found[1], [2.0, 2.0])
+
+
+def test_disk_tier_stops_growing_at_max_disk_items(tmp_path):
+    """Test that the disk tier keeps at most max_disk_items embeddings per model."""
+    capped = EmbeddingCache(cache_dir=str(tmp_path), max_disk_items=2)
+    capped.put_many("model", ["a", "b", "c"], np.eye(3, dtype=np.float32))
+    capped.put_many("model", ["d"], np.ones((1, 3), dtype=np.float32))
+    found = EmbeddingCache(cache_dir=str(tmp_path)).get_many("model", ["a", "b", "c", "d"])
+    assert [v is not None for v in found] == [True, True, False, False]
+    assert capped.get_many("model", ["d"])[0] is not None
+
+
+def test_lookups_do_not_wait_for_disk_writes(tmp_path, cache):
+    """Test that get_many is served while another thread is appending to the disk tier."""
+    cache.put_many("model", ["a"], np.array([[1.0, 2.0]], dtype=np.float32))
+    disk = cache._disk_tier("model")
+    started, release = threading.Event(), threading.Event()
+    original = disk.put_many
+
+    def slow_put_many(keys, vectors):
+        started.set()
+        release.wait(5)
+        original(keys, vectors)
+
+    disk.put_many = slow_put_many
+    writer = threading.Thread(target=cache.put_many, args=("model", ["b"], np.array([[3.0, 4.0]], dtype=np.float32)))
+    writer.start()
+    assert started.wait(5)
+    found = cache.get_many("model", ["a", "b"])
+    release.set()
+    writer.join(5)
+    np.testing.assert_array_equal(found[0], [1.0, 2.0])
+    np.testing.assert_array_equal(found[1], [3.0, 4.0])
+
+
+def test_memory_tier_evicts_lru(cache):
+    """Test that the memory tier keeps at most max_memory_items entries."""
+    memory_only = EmbeddingCache(cache_dir=None, max_memory_items=2)
+    memory_only.put_many("model", ["a", "b", "c"], np.eye(3, dtype=np.float32))
+    found = memory_only.get_many("model", ["a", "b", "c"])
+    assert found[0] is None
+    assert found[1] is not None and found[2] is not None
+
+
+@patch("app.services.embedder.SentenceTransformer")
+def test_embedder_only_encodes_misses(mock_sentence_transformer, cache):
+    """Test that Embedder.embed sends only uncached texts to the model."""
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kwargs: np.array([[float(len(t)), 0.0] for t in texts], dtype=np.float32)
+    mock_sentence_transformer.return_value = model
+    embedder = Embedder(cache=cache)
+
+    first = embedder.embed(["aa", "bbb"])
+    model.encode.reset_mock()
+    second = embedder.embed(["bbb", "c"])
+
+    model.encode.assert_called_once_with(["c"], batch_size=32, show_progress_bar=False)
+    np.testing.assert_array_equal(second, [[3.0, 0.0], [1.0, 0.0]])
+    assert first.dtype == np.float32
@@ -43,3 +43,59 @@ def test_embed_propagates_errors(mock_sentence_transformer):
     with pytest.raises(Exception) as excinfo:
         embedder.embed(["Some text"])
     assert "Embedding failed" in str(excinfo.value)
+
+
+@patch("app.services.embedder.SentenceTransformer")
+def test_preload_loads_model_once(mock_sentence_transformer, mock_model):
+    mock_sentence_transformer.return_value = mock_model
+    embedder = Embedder()
+    assert not embedder.is_loaded
+    embedder.preload()
+    embedder.embed(["Some text"])
+    assert embedder.is_loaded
+    mock_sentence_transformer.assert_called_once()
+
+
+@patch("app.services.embedder.SentenceTransformer")
+def test_failed_warmup_leaves_model_unloaded(mock_sentence_transformer):
+    failing_model = MagicMock()
+    failing_model.encode.side_effect = Exception("Warm-up failed")
+    mock_sentence_transformer.return_value = failing_model
+    embedder = Embedder()
+    with pytest.raises(Exception):
+        embedder.preload()
+    assert not embedder.is_loaded
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        Embedder(backend="tensorrt")
+
+
+@patch("app.services.embedder.SentenceTransformer")
+def test_onnx_backend_loads_on_cpu(mock_sentence_transformer, mock_model):
+    mock_sentence_transformer.return_value = mock_model
+    embedder = Embedder(model_name="all-MiniLM-L6-v2", backend="onnx")
+    embedder.preload()
+    mock_sentence_transformer.assert_called_once_with(
+        "all-MiniLM-L6-v2", cache_folder="./models", device="cpu", backend="onnx"
+    )
+
+
+@patch("sentence_transformers.backend.export_dynamic_quantized_onnx_model")
+@patch("app.services.embedder.SentenceTransformer")
+def test_onnx_int8_backend_exports_then_loads_quantized_file(mock_sentence_transformer, mock_export, mock_model, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mock_sentence_transformer.return_value = mock_model
+    embedder = Embedder(model_name="all-MiniLM-L6-v2", backend="onnx-int8", onnx_quantization="avx512_vnni")
+    embedder.preload()
+
+    mock_export.assert_called_once_with(mock_model, "avx512_vnni", "./models/all-MiniLM-L6-v2-onnx")
+    assert mock_sentence_transformer.call_args.kwargs == {
+        "device": "cpu", "backend": "onnx", "model_kwargs": {"file_name": "onnx/model_qint8_avx512_vnni.onnx"}
+    }
+
+
+def test_cache_namespace_separates_backends():
+    assert Embedder(backend="torch").cache_namespace == "all-MiniLM-L6-v2"
+    assert Embedder(backend="onnx-int8").cache_namespace == "all-MiniLM-L6-v2@onnx-int8"
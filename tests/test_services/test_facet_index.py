@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+from app.services.facet_index import FacetIndex, FacetQuery, answer_counting_question, match_counting_question
+
+FIELDS = ("TYPE OF INDOOR ENVIRONMENT", "NOMINATE ACCORDING TO THE PAPER")
+ALIASES = [
+    ("indoor environment", "TYPE OF INDOOR ENVIRONMENT"),
+    ("cleaning method", "NOMINATE ACCORDING TO THE PAPER"),
+    ("cleaning material", "NOMINATE ACCORDING TO THE PAPER"),
+]
+
+
+@pytest.fixture
+def index():
+    """Return a FacetIndex over four reviewed papers, one with two methods."""
+    idx = FacetIndex(FIELDS, separator=";")
+    idx.add_dataframe(pd.DataFrame({
+        "TYPE OF INDOOR ENVIRONMENT": ["School", "School", "Office", None],
+        "NOMINATE ACCORDING TO THE PAPER": ["HEPA filter", "HEPA filter; Ionization", "Ionization", "HEPA filter"],
+        "document": ["a", "b", "c", "d"],
+    }), [1, 2, 3, 4])
+    return idx
+
+
+def test_counts_and_cooccurrence(index):
+    """Test value counts, split multi-select cells and co-occurrence tables."""
+    assert index.counts("NOMINATE ACCORDING TO THE PAPER") == [
+        {"value": "HEPA filter", "count": 3}, {"value": "Ionization", "count": 2}
+    ]
+    assert index.counts("TYPE OF INDOOR ENVIRONMENT", within={2, 3}) == [
+        {"value": "Office", "count": 1}, {"value": "School", "count": 1}
+    ]
+    assert index.cooccurrence("NOMINATE ACCORDING TO THE PAPER", "TYPE OF INDOOR ENVIRONMENT") == {
+        "HEPA filter": {"School": 2}, "Ionization": {"School": 1, "Office": 1}
+    }
+    assert index.ids("TYPE OF INDOOR ENVIRONMENT", "School") == {1, 2}
+
+
+def test_updates_are_incremental(index):
+    """Test that re-adding and removing IDs adjusts every table."""
+    index.add([1], [{"TYPE OF INDOOR ENVIRONMENT": "Office", "NOMINATE ACCORDING TO THE PAPER": "Ionization"}])
+    index.remove([2])
+    assert index.counts("TYPE OF INDOOR ENVIRONMENT") == [{"value": "Office", "count": 2}]
+    assert index.cooccurrence("TYPE OF INDOOR ENVIRONMENT", "NOMINATE ACCORDING TO THE PAPER") == {"Office": {"Ionization": 2}}
+    assert len(index) == 3
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    """Test that a loaded index has the same tables."""
+    path = str(tmp_path / "facets.json")
+    index.save(path)
+    loaded = FacetIndex.load(path, FIELDS, separator=";")
+    assert loaded.counts("NOMINATE ACCORDING TO THE PAPER") == index.counts("NOMINATE ACCORDING TO THE PAPER")
+    assert loaded.cooccurrence(*FIELDS) == index.cooccurrence(*FIELDS)
+
+
+def test_match_counting_question(index):
+    """Test that group-by fields come from aliases and conditions from mentioned values."""
+    assert match_counting_question("How many papers are there for each cleaning method?", index, ALIASES) == FacetQuery(
+        group_by="NOMINATE ACCORDING TO THE PAPER"
+    )
+    assert match_counting_question("Number of office studies per cleaning method", index, ALIASES) == FacetQuery(
+        group_by="NOMINATE ACCORDING TO THE PAPER", conditions={"TYPE OF INDOOR ENVIRONMENT": ["Office"]}
+    )
+    assert match_counting_question("Can you give the number of studies per type of cleaning material?", index, ALIASES) == FacetQuery(
+        group_by="NOMINATE ACCORDING TO THE PAPER"
+    )
+    assert match_counting_question("How many papers are there by indoor environment type?", index, ALIASES) == FacetQuery(
+        group_by="TYPE OF INDOOR ENVIRONMENT"
+    )
+    assert match_counting_question("What does a HEPA filter remove?", index, ALIASES) is None
+    assert match_counting_question("How many people are exposed?", index, ALIASES) is None
+
+
+@pytest.mark.parametrize("question", [
+    "How many air changes per hour are needed in schools?",
+    "What filtration reduces the number of particles in offices?",
+    "How many devices use a HEPA filter?",
+    "How many papers are considered irrelevant?",
+    "Does ionization reduce the number of bacteria in a school by half?",
+])
+def test_other_counting_questions_are_left_to_retrieval(index, question):
+    """Test that questions which do not count papers or group by a known field are not answered from facets."""
+    assert match_counting_question(question, index, ALIASES) is None
+
+
+def test_answer_counting_question(index):
+    """Test the exact answer text for grouped and conditional counts."""
+    labels = {f: a for a, f in reversed(ALIASES)}
+    grouped = FacetQuery(group_by="TYPE OF INDOOR ENVIRONMENT", conditions={"NOMINATE ACCORDING TO THE PAPER": ["HEPA filter"]})
+    assert answer_counting_question(grouped, index, labels) == (
+        "Number of papers with cleaning method HEPA filter per indoor environment (3 papers in total):\n- School: 2"
+    )
+    count = FacetQuery(conditions={"NOMINATE ACCORDING TO THE PAPER": ["Ionization"], "TYPE OF INDOOR ENVIRONMENT": ["School"]})
+    assert answer_counting_question(count, index, labels) == (
+        "There is 1 paper with cleaning method Ionization and indoor environment School."
+    )
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from app.services.indexer import Indexer
+from app.services.qdrant_wrapper import QdrantWrapper, FINGERPRINT_FIELD
+
+
+@pytest.fixture
+def sample_df():
+    """Return a DataFrame as produced by CSVLoader."""
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "TITLE OF THE PAPER": ["Title1", "Title2", "Title3"],
+        "document": ["doc1", "doc2", "doc3"]
+    })
+
+
+@pytest.fixture
+def mock_qdrant():
+    """Fixture returning a mocked QdrantWrapper with real ID normalization."""
+    mock = MagicMock()
+    mock.collection_name = "test_collection"
+    mock.normalize_ids.side_effect = lambda df: QdrantWrapper.normalize_ids(df)
+    mock.fetch_fingerprints.return_value = {}
+    return mock
+
+
+@pytest.fixture
+def mock_embedder():
+    """Fixture returning an embedder producing one vector per text."""
+    mock = MagicMock()
+    mock.embed.side_effect = lambda texts: np.ones((len(texts), 3), dtype=np.float32)
+    return mock
+
+
+def test_fingerprint_changes_with_content(sample_df):
+    """Test that fingerprints are stable and change when a payload value changes."""
+    first = Indexer.fingerprint_rows(sample_df)
+    edited = sample_df.copy()
+    edited.loc[1, "TITLE OF THE PAPER"] = "Edited"
+    second = Indexer.fingerprint_rows(edited)
+    assert first[0] == second[0]
+    assert first[1] != second[1]
+
+
+def test_sync_into_empty_collection_adds_everything(sample_df, mock_qdrant, mock_embedder):
+    """Test that the first upload embeds and upserts every row."""
+    summary = Indexer(mock_qdrant, mock_embedder).sync(sample_df)
+    assert summary.as_dict() == {"added": 3, "updated": 0, "deleted": 0, "unchanged": 0}
+    mock_embedder.embed.assert_called_once_with(["doc1", "doc2", "doc3"])
+    mock_qdrant.ensure_collection.assert_called_once_with(vector_size=3)
+    upserted_df = mock_qdrant.upsert_dataframe.call_args[0][0]
+    assert FINGERPRINT_FIELD in upserted_df.columns
+
+
+def test_sync_only_writes_changed_rows_and_deletes_removed(sample_df, mock_qdrant, mock_embedder):
+    """Test that unchanged rows are skipped, changed/new rows upserted and missing IDs deleted."""
+    fingerprints = Indexer.fingerprint_rows(sample_df)
+    mock_qdrant.fetch_fingerprints.return_value = {1: fingerprints[0], 2: fingerprints[1], 9: "stale"}
+
+    upload = sample_df.copy()
+    upload.loc[1, "document"] = "doc2 edited"
+    summary = Indexer(mock_qdrant, mock_embedder).sync(upload)
+
+    assert summary.as_dict() == {"added": 1, "updated": 1, "deleted": 1, "unchanged": 1}
+    mock_embedder.embed.assert_called_once_with(["doc2 edited", "doc3"])
+    mock_qdrant.delete_ids.assert_called_once_with([9])
+
+
+def test_sync_without_changes_skips_embedding(sample_df, mock_qdrant, mock_embedder):
+    """Test that re-uploading identical data neither embeds nor upserts."""
+    fingerprints = Indexer.fingerprint_rows(sample_df)
+    mock_qdrant.fetch_fingerprints.return_value = dict(zip([1, 2, 3], fingerprints))
+    summary = Indexer(mock_qdrant, mock_embedder).sync(sample_df)
+    assert summary.unchanged == 3
+    mock_embedder.embed.assert_not_called()
+    mock_qdrant.upsert_dataframe.assert_not_called()
+
+
+def test_sync_stream_upserts_each_chunk(sample_df, mock_qdrant, mock_embedder):
+    """Test that streamed chunks are embedded and upserted chunk by chunk."""
+    chunks = [sample_df.iloc[:2], sample_df.iloc[2:]]
+    summary = Indexer(mock_qdrant, mock_embedder).sync_stream(iter(chunks), queue_size=1)
+    assert summary.added == 3
+    assert mock_embedder.embed.call_count == 2
+    assert mock_qdrant.upsert_dataframe.call_count == 2
+    mock_qdrant.ensure_collection.assert_called_once_with(vector_size=3)
+
+
+def test_sync_stream_reports_progress(sample_df, mock_qdrant, mock_embedder):
+    """Test that progress is reported per phase with cumulative row counts."""
+    mock_qdrant.fetch_fingerprints.return_value = {1: None, 99: None}
+    events = []
+    chunks = [sample_df.iloc[:2], sample_df.iloc[2:]]
+    Indexer(mock_qdrant, mock_embedder).sync_stream(
+        iter(chunks), incremental=False, queue_size=1, progress=lambda *event: events.append(event)
+    )
+    assert events[0] == ('fingerprints', 0, 0)
+    # Chunks are read ahead of the upserts, so only the written rows are deterministic per event.
+    assert [e[2] for e in events if e[0] == 'upserting'] == [2, 3]
+    assert events[-1] == ('deleting', 3, 3)
+
+
+def test_sync_stream_propagates_stage_errors(sample_df, mock_qdrant, mock_embedder):
+    """Test that an error in the embedding stage aborts the run and is re-raised."""
+    mock_embedder.embed.side_effect = RuntimeError("model crashed")
+    with pytest.raises(RuntimeError, match="model crashed"):
+        Indexer(mock_qdrant, mock_embedder).sync_stream(iter([sample_df]))
+    mock_qdrant.upsert_dataframe.assert_not_called()
+    mock_qdrant.delete_ids.assert_not_called()
+
+
+def test_sync_keeps_keyword_index_in_sync(sample_df, mock_qdrant, mock_embedder):
+    """Test that upserts, deletions and previously stored rows reach the keyword index."""
+    from app.services.keyword_index import KeywordIndex
+    fingerprints = Indexer.fingerprint_rows(sample_df)
+    mock_qdrant.fetch_fingerprints.return_value = {1: fingerprints[0], 9: "stale"}
+    keyword_index = KeywordIndex()
+    keyword_index.add([9], ["stale paper"])
+
+    Indexer(mock_qdrant, mock_embedder, keyword_index=keyword_index).sync(sample_df)
+
+    assert [r["id"] for r in keyword_index.search("doc1", top_k=5)] == [1]
+    assert [r["id"] for r in keyword_index.search("doc3", top_k=5)] == [3]
+    assert 9 not in keyword_index
+    mock_embedder.embed.assert_called_once_with(["doc2", "doc3"])
+
+
+def test_sync_keeps_facet_index_in_sync(sample_df, mock_qdrant, mock_embedder):
+    """Test that facet counts follow updates and deletions."""
+    from app.services.facet_index import FacetIndex
+    facets = FacetIndex(fields=("TITLE OF THE PAPER",))
+    indexer = Indexer(mock_qdrant, mock_embedder, facet_index=facets)
+    indexer.sync(sample_df)
+
+    mock_qdrant.fetch_fingerprints.return_value = dict(zip([1, 2, 3], Indexer.fingerprint_rows(sample_df)))
+    upload = sample_df.iloc[:2].copy()
+    upload.loc[1, "TITLE OF THE PAPER"] = "Title1"
+    indexer.sync(upload)
+    assert facets.counts("TITLE OF THE PAPER") == [{"value": "Title1", "count": 2}]
+    assert 3 not in facets
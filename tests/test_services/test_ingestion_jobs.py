@@ -0,0 +1,147 @@
+import threading
+import pytest
+from app.services.ingestion_jobs import IngestionJobManager, JobQueueFull
+
+
+def test_job_runs_in_background_and_reports_progress():
+    """Test that a job runs off the caller's thread and records progress and summary."""
+    manager = IngestionJobManager()
+    release = threading.Event()
+
+    def run(job):
+        manager.update(job.id, phase='embedding', rows_read=10, rows_written=4)
+        release.wait(5)
+        return {'added': 10}
+
+    job = manager.submit(run, 'papers.csv', 'papers')
+    assert manager.get(job.id)['state'] in ('queued', 'running')
+    release.set()
+    assert manager.wait(job.id, timeout=5)
+
+    state = manager.get(job.id)
+    assert state['state'] == 'succeeded'
+    assert state['phase'] == 'done'
+    assert state['rows_read'] == 10 and state['rows_written'] == 4
+    assert state['summary'] == {'added': 10}
+    assert state['elapsed_seconds'] >= 0
+
+
+def test_failed_job_records_error():
+    """Test that an exception in the job marks it as failed with its message."""
+    manager = IngestionJobManager()
+
+    def run(job):
+        raise RuntimeError("qdrant down")
+
+    job = manager.submit(run, 'papers.csv', 'papers')
+    assert manager.wait(job.id, timeout=5)
+    state = manager.get(job.id)
+    assert state['state'] == 'failed'
+    assert state['error'] == 'qdrant down'
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_interrupted_job_releases_waiters():
+    """Test that a job killed by a BaseException is marked failed and does not leave waiters hanging."""
+    manager = IngestionJobManager()
+
+    def run(job):
+        raise SystemExit()
+
+    job = manager.submit(run, 'papers.csv', 'papers')
+    assert manager.wait(job.id, timeout=5)
+    assert manager.get(job.id)['state'] == 'failed'
+
+
+def test_queue_limit():
+    """Test that submissions beyond max_queued are rejected while the worker is busy."""
+    manager = IngestionJobManager(max_concurrent=1, max_queued=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def run(job):
+        started.set()
+        release.wait(5)
+        return {}
+
+    first = manager.submit(run, 'a.csv', 'papers')
+    assert started.wait(5)
+    second = manager.submit(run, 'b.csv', 'papers')
+    assert manager.queue_depth == 1
+    with pytest.raises(JobQueueFull):
+        manager.submit(run, 'c.csv', 'papers')
+    release.set()
+    assert manager.wait(first.id, timeout=5) and manager.wait(second.id, timeout=5)
+    assert manager.queue_depth == 0
+
+
+def test_job_state_is_shared_through_jobs_dir(tmp_path):
+    """Test that another process can read a job's state from the jobs directory."""
+    manager = IngestionJobManager(jobs_dir=str(tmp_path))
+    job = manager.submit(lambda job: {'added': 1}, 'papers.csv', 'papers')
+    assert manager.wait(job.id, timeout=5)
+
+    other_process = IngestionJobManager(jobs_dir=str(tmp_path))
+    state = other_process.get(job.id)
+    assert state['state'] == 'succeeded'
+    assert state['summary'] == {'added': 1}
+    assert other_process.get('../etc/passwd') is None
+
+
+def test_history_is_pruned(tmp_path):
+    """Test that only the most recent finished jobs are kept."""
+    manager = IngestionJobManager(max_history=1, jobs_dir=str(tmp_path))
+    first = manager.submit(lambda job: {}, 'a.csv', 'papers')
+    assert manager.wait(first.id, timeout=5)
+    second = manager.submit(lambda job: {}, 'b.csv', 'papers')
+    assert manager.wait(second.id, timeout=5)
+
+    assert manager.get(first.id) is None
+    assert manager.get(second.id)['state'] == 'succeeded'
+    assert not (tmp_path / f"{first.id}.json").exists()
+
+
+def test_concurrency_limit_is_shared_through_jobs_dir(tmp_path):
+    """Test that max_concurrent holds for all managers (server processes) sharing a jobs directory."""
+    worker_a = IngestionJobManager(max_concurrent=1, jobs_dir=str(tmp_path), slot_poll_seconds=0.01)
+    worker_b = IngestionJobManager(max_concurrent=1, jobs_dir=str(tmp_path), slot_poll_seconds=0.01)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking(job):
+        started.set()
+        release.wait(5)
+        return {}
+
+    first = worker_a.submit(blocking, 'a.csv', 'papers')
+    assert started.wait(5)
+    second = worker_b.submit(lambda job: {'added': 1}, 'b.csv', 'papers')
+    assert not worker_b.wait(second.id, timeout=0.2)
+    assert worker_b.get(second.id)['state'] == 'queued'
+    assert worker_b.get(second.id)['phase'] == 'waiting for a free slot'
+
+    release.set()
+    assert worker_a.wait(first.id, timeout=5) and worker_b.wait(second.id, timeout=5)
+    assert worker_b.get(second.id)['state'] == 'succeeded'
+
+
+def test_collection_lock_is_shared_through_jobs_dir(tmp_path):
+    """Test that only one manager at a time holds the write lock of a collection."""
+    worker_a = IngestionJobManager(jobs_dir=str(tmp_path))
+    worker_b = IngestionJobManager(jobs_dir=str(tmp_path))
+    with worker_a.collection_lock('papers'):
+        assert not worker_b.collection_lock('papers').acquire(blocking=False)
+        assert worker_b.collection_lock('other').acquire(blocking=False)
+        worker_b.collection_lock('other').release()
+    assert worker_b.collection_lock('papers').acquire(blocking=False)
+    worker_b.collection_lock('papers').release()
+
+
+def test_jobs_dir_is_created_on_first_submit(tmp_path):
+    """Test that creating a manager does not touch the file system."""
+    jobs_dir = tmp_path / "jobs"
+    manager = IngestionJobManager(jobs_dir=str(jobs_dir))
+    assert not jobs_dir.exists()
+    job = manager.submit(lambda job: {}, 'papers.csv', 'papers')
+    assert manager.wait(job.id, timeout=5)
+    assert (jobs_dir / f"{job.id}.json").exists()
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+from app.services.keyword_index import KeywordIndex, reciprocal_rank_fusion, tokenize
+
+
+@pytest.fixture
+def index():
+    """Return a KeywordIndex over a few short abstracts."""
+    idx = KeywordIndex(payload_fields=("TITLE OF THE PAPER",))
+    idx.add_dataframe(pd.DataFrame({
+        "TITLE OF THE PAPER": ["Filters", "Lamps", "Sensors"],
+        "document": [
+            "HEPA filters reduce PM2.5 in classrooms",
+            "UV-C lamps inactivate airborne viruses in classrooms",
+            "Low-cost CO2 sensors track ventilation",
+        ],
+    }), [1, 2, 3])
+    return idx
+
+
+def test_tokenize_keeps_technical_terms():
+    """Test that compound terms survive tokenization and their parts are indexed too."""
+    assert tokenize("The PM2.5 and UV-C levels") == ["pm2.5", "pm2", "uv-c", "uv", "c", "levels"]
+
+
+def test_search_ranks_exact_terms(index):
+    """Test that BM25 ranks documents containing the rarer query terms first."""
+    results = index.search("pm2.5 classrooms", top_k=5)
+    assert [r["id"] for r in results] == [1, 2]
+    assert results[0]["payload"] == {"TITLE OF THE PAPER": "Filters"}
+    assert index.search("uv-c", top_k=5)[0]["id"] == 2
+    assert index.search("the of", top_k=5) == []
+
+
+def test_upsert_and_remove_keep_postings_in_sync(index):
+    """Test that re-adding an ID replaces its terms and removed IDs stop matching."""
+    index.add([1], ["ozone generators"], [{"TITLE OF THE PAPER": "Ozone"}])
+    index.remove([3])
+    assert index.search("hepa", top_k=5) == []
+    assert [r["id"] for r in index.search("ozone", top_k=5)] == [1]
+    assert index.search("co2", top_k=5) == []
+    assert len(index) == 2 and 3 not in index
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    """Test that a saved index answers queries identically after loading."""
+    path = str(tmp_path / "papers.json")
+    index.save(path)
+    loaded = KeywordIndex.load(path, payload_fields=("TITLE OF THE PAPER",))
+    assert loaded.search("classrooms", top_k=5) == index.search("classrooms", top_k=5)
+    assert len(KeywordIndex.load(str(tmp_path / "missing.json"))) == 0
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    """Test that points ranked by both lists come first."""
+    dense = [{"id": 1, "payload": {}}, {"id": 2, "payload": {}}]
+    keyword = [{"id": 2, "payload": {}}, {"id": 3, "payload": {}}]
+    fused = reciprocal_rank_fusion([dense, keyword], top_k=2, k=60)
+    assert [r["id"] for r in fused] == [2, 1]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_search_applies_filter_fields():
+    """Test that filter-only fields restrict results without appearing in payloads."""
+    idx = KeywordIndex(payload_fields=("TITLE OF THE PAPER",), filter_fields=("ENV",))
+    idx.add([1, 2], ["ventilation study", "ventilation model"], [
+        {"TITLE OF THE PAPER": "A", "ENV": "School"}, {"TITLE OF THE PAPER": "B", "ENV": "Office"}
+    ])
+    results = idx.search("ventilation", top_k=5, query_filter={"ENV": "Office"})
+    assert results == [{"id": 2, "score": pytest.approx(results[0]["score"]), "payload": {"TITLE OF THE PAPER": "B"}}]
+
+
+def test_index_saved_without_filter_fields_is_reindexed(tmp_path):
+    """Test that documents saved before filter fields were configured refuse filters until re-added."""
+    path = str(tmp_path / "papers.json")
+    old = KeywordIndex(payload_fields=("TITLE OF THE PAPER",))
+    old.add([1, 2], ["ventilation study", "ventilation model"], [
+        {"TITLE OF THE PAPER": "A", "ENV": "School"}, {"TITLE OF THE PAPER": "B", "ENV": "Office"}
+    ])
+    old.save(path)
+
+    idx = KeywordIndex.load(path, payload_fields=("TITLE OF THE PAPER",), filter_fields=("ENV",))
+    assert len(idx) == 2 and 1 not in idx
+    assert [r["id"] for r in idx.search("ventilation study", top_k=1)] == [1]
+    assert not idx.can_filter({"ENV": "Office"})
+    assert idx.can_filter(None)
+
+    idx.add([1], ["ventilation study"], [{"TITLE OF THE PAPER": "A", "ENV": "School"}])
+    idx.save(path)
+    idx = KeywordIndex.load(path, payload_fields=("TITLE OF THE PAPER",), filter_fields=("ENV",))
+    assert 1 in idx and 2 not in idx
+    idx.add([2], ["ventilation model"], [{"TITLE OF THE PAPER": "B", "ENV": "Office"}])
+    assert idx.can_filter({"ENV": "Office"})
+    assert [r["id"] for r in idx.search("ventilation", top_k=5, query_filter={"ENV": "Office"})] == [2]
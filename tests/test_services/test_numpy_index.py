@@ -0,0 +1,151 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.numpy_index import NumpyVectorIndex
+from app.services.qdrant_wrapper import FINGERPRINT_FIELD
+
+
+@pytest.fixture
+def sample_df():
+    """Return a DataFrame as produced by CSVLoader, with fingerprints."""
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "TITLE OF THE PAPER": ["Title1", "Title2", "Title3"],
+        "document": ["doc1", "doc2", "doc3"],
+        FINGERPRINT_FIELD: ["f1", "f2", "f3"],
+    })
+
+
+@pytest.fixture
+def embeddings():
+    """Return three orthogonal-ish embeddings."""
+    return np.array([[1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [1.0, 1.0, 0.0]], dtype=np.float32)
+
+
+@pytest.fixture
+def index(tmp_path, sample_df, embeddings):
+    """Return a NumpyVectorIndex filled with the sample rows."""
+    idx = NumpyVectorIndex(index_dir=str(tmp_path), collection_name="papers")
+    idx.ensure_collection(vector_size=3)
+    idx.upsert_dataframe(sample_df, embeddings)
+    return idx
+
+
+def test_search_returns_exact_cosine_top_k(index):
+    """Test that search ranks by cosine similarity and hides the fingerprint."""
+    results = index.search(np.array([0.0, 1.0, 0.0]), top_k=2)
+    assert [r["id"] for r in results] == [2, 3]
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert results[1]["score"] == pytest.approx(np.sqrt(0.5))
+    assert FINGERPRINT_FIELD not in results[0]["payload"]
+    assert "document" not in results[0]["payload"]
+
+
+def test_search_projects_payload_fields(index):
+    """Test that payload_include limits the returned fields."""
+    results = index.search(np.array([1.0, 0.0, 0.0]), top_k=1, payload_include=["TITLE OF THE PAPER"])
+    assert results == [{"id": 1, "score": pytest.approx(1.0), "payload": {"TITLE OF THE PAPER": "Title1"}}]
+
+
+def test_upsert_replaces_and_delete_removes(index):
+    """Test that re-upserting an ID replaces its vector and deleted IDs disappear."""
+    index.upsert_dataframe(
+        pd.DataFrame({"id": [1], "TITLE OF THE PAPER": ["New"], "document": ["d"], FINGERPRINT_FIELD: ["f9"]}),
+        np.array([[0.0, 0.0, 1.0]], dtype=np.float32)
+    )
+    index.delete_ids([2])
+
+    assert index.fetch_fingerprints() == {1: "f9", 3: "f3"}
+    results = index.search(np.array([0.0, 0.0, 1.0]), top_k=5)
+    assert [r["id"] for r in results] == [1, 3]
+    assert index.retrieve([1, 2]) == [{"id": 1, "payload": {"id": 1, "TITLE OF THE PAPER": "New"}}]
+
+
+def test_collection_persists_across_instances(index, tmp_path):
+    """Test that a new instance reloads points, payloads and vectors from disk."""
+    index.delete_ids([3])
+    reopened = NumpyVectorIndex(index_dir=str(tmp_path), collection_name="papers")
+    assert set(reopened.fetch_fingerprints()) == {1, 2}
+    assert reopened.search(np.array([1.0, 0.0, 0.0]), top_k=1)[0]["id"] == 1
+
+
+def test_writes_bump_collection_version(index, sample_df, embeddings):
+    """Test that upserts and deletes invalidate version-keyed caches."""
+    before = index.collection_version
+    index.upsert_dataframe(sample_df, embeddings)
+    index.delete_ids([1])
+    assert index.collection_version == before + 2
+
+
+def test_deleting_unknown_ids_keeps_collection_version(index):
+    """Test that a delete matching no live point leaves the version and the log untouched."""
+    before = index.collection_version
+    log_size = os.path.getsize(index._points_path)
+    index.delete_ids([99])
+    assert index.collection_version == before
+    assert os.path.getsize(index._points_path) == log_size
+
+
+def test_compaction_drops_stale_rows(index, sample_df, embeddings, tmp_path):
+    """Test that tombstoned rows are removed from disk once they outnumber live rows."""
+    for _ in range(5):
+        index.upsert_dataframe(sample_df, embeddings)
+    index._maybe_compact(min_dead_rows=1)
+    assert index._vectors.shape[0] == 3
+    reopened = NumpyVectorIndex(index_dir=str(tmp_path), collection_name="papers")
+    assert [r["id"] for r in reopened.search(np.array([0.0, 1.0, 0.0]), top_k=3)] == [2, 3, 1]
+
+
+def test_instances_sharing_a_directory_append_distinct_rows(index, tmp_path):
+    """Test that two processes' instances of a collection never overwrite each other's rows or compact them away."""
+    other = NumpyVectorIndex(index_dir=str(tmp_path), collection_name="papers")
+    index.upsert_dataframe(
+        pd.DataFrame({"id": [4], "TITLE OF THE PAPER": ["Four"], "document": ["d"], FINGERPRINT_FIELD: ["f4"]}),
+        np.array([[0.0, 0.0, 1.0]], dtype=np.float32)
+    )
+    other.upsert_dataframe(
+        pd.DataFrame({"id": [5], "TITLE OF THE PAPER": ["Five"], "document": ["d"], FINGERPRINT_FIELD: ["f5"]}),
+        np.array([[0.0, -1.0, 0.0]], dtype=np.float32)
+    )
+    other.delete_ids([1, 2])
+    other._maybe_compact(min_dead_rows=1)
+
+    reopened = NumpyVectorIndex(index_dir=str(tmp_path), collection_name="papers")
+    assert reopened.fetch_fingerprints() == {3: "f3", 4: "f4", 5: "f5"}
+    assert reopened.search(np.array([0.0, 0.0, 1.0]), top_k=1)[0]["id"] == 4
+    assert reopened.search(np.array([0.0, -1.0, 0.0]), top_k=1)[0]["id"] == 5
+
+
+def test_dimension_mismatch_is_rejected(index):
+    """Test that vectors of a different size cannot be mixed into a collection."""
+    with pytest.raises(ValueError):
+        index.upsert_dataframe(pd.DataFrame({"id": [9]}), np.ones((1, 4), dtype=np.float32))
+
+
+def test_collection_discovery(index, tmp_path):
+    """Test that stored collections are listed and described."""
+    assert NumpyVectorIndex(index_dir=str(tmp_path), collection_name="empty").collection_info() is None
+    assert index.list_collections() == ["papers"]
+    assert index.collection_info() == {"vector_size": 3, "points_count": 3}
+
+
+def test_search_batch_matches_single_searches(index):
+    """Test that batched search returns the same results as one search per query."""
+    queries = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32)
+    batched = index.search_batch(queries, [1, 3])
+    assert batched == [index.search(queries[0], top_k=1), index.search(queries[1], top_k=3)]
+
+
+def test_filtered_search_masks_before_top_k(tmp_path, embeddings):
+    """Test that filters are applied before top-k, so matching points are not crowded out."""
+    idx = NumpyVectorIndex(index_dir=str(tmp_path), collection_name="papers")
+    idx.upsert_dataframe(
+        pd.DataFrame({"id": [1, 2, 3], "env": ["School", "Office", "Office"], "YEAR": [2010, 2015, 2020]}), embeddings
+    )
+    query = np.array([1.0, 0.0, 0.0])
+    assert [r["id"] for r in idx.search(query, top_k=1, query_filter={"env": ["Office"]})] == [3]
+    assert [r["id"] for r in idx.search(query, top_k=5, query_filter={"YEAR": {"lt": 2020.0}})] == [1, 2]
+    assert idx.search(query, top_k=5, query_filter={"env": "Hospital"}) == []
+    assert [r["id"] for r in idx.search(query, top_k=5, query_filter={"YEAR": 2015.0})] == [2]
+    assert idx.search(query, top_k=5, query_filter={"YEAR": 2015.5}) == []
@@ -0,0 +1,145 @@
+import threading
+import openai
+import pytest
+from unittest.mock import patch
+from app.services.openai_client import CircuitBreaker, OpenAIChatClient, OpenAIUnavailable
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+@pytest.fixture
+def client():
+    """Fixture returning a client with fast backoff that leaves the openai session alone."""
+    return OpenAIChatClient(max_retries=2, backoff_base=0.01, backoff_max=1.0, max_in_flight=1,
+                            queue_timeout=0.05, install_session=False)
+
+
+@patch("app.services.openai_client.time.sleep")
+@patch("app.services.openai_client.openai.ChatCompletion.create")
+def test_rate_limits_are_retried(mock_create, mock_sleep, client):
+    """Test that rate limit errors are retried with backoff and timeouts are passed to the API."""
+    mock_create.side_effect = [openai.error.RateLimitError("slow down"), "response"]
+    assert client.create("gpt", MESSAGES, max_tokens=10) == "response"
+    assert mock_create.call_count == 2
+    assert mock_create.call_args.kwargs["request_timeout"] == (client.connect_timeout, client.timeout)
+    assert 0 <= mock_sleep.call_args.args[0] <= 0.01
+
+
+@patch("app.services.openai_client.time.sleep")
+@patch("app.services.openai_client.openai.ChatCompletion.create")
+def test_retry_after_header_is_honoured(mock_create, mock_sleep, client):
+    """Test that the server's Retry-After is waited for instead of the jittered backoff."""
+    error = openai.error.RateLimitError("slow down", headers={"retry-after": "0.5"})
+    mock_create.side_effect = [error, "response"]
+    client.create("gpt", MESSAGES, max_tokens=10)
+    mock_sleep.assert_called_once_with(0.5)
+
+
+@patch("app.services.openai_client.time.sleep")
+@patch("app.services.openai_client.openai.ChatCompletion.create")
+def test_invalid_requests_are_not_retried(mock_create, mock_sleep, client):
+    """Test that client errors are raised immediately."""
+    mock_create.side_effect = openai.error.InvalidRequestError("bad", param=None)
+    with pytest.raises(openai.error.InvalidRequestError):
+        client.create("gpt", MESSAGES, max_tokens=10)
+    assert mock_create.call_count == 1
+    assert client.breaker.state == "closed"
+
+
+@patch("app.services.openai_client.openai.ChatCompletion.create")
+def test_invalid_request_does_not_reset_failures(mock_create):
+    """Test that a client error neither counts as a failure nor clears earlier ones, and frees a trial slot."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    client = OpenAIChatClient(max_retries=0, breaker=breaker, install_session=False)
+    breaker.record_failure()
+    mock_create.side_effect = openai.error.InvalidRequestError("bad", param=None)
+    with pytest.raises(openai.error.InvalidRequestError):
+        client.create("gpt", MESSAGES, max_tokens=10)
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    with patch("app.services.openai_client.time.monotonic", return_value=breaker._opened_at + 31):
+        with pytest.raises(openai.error.InvalidRequestError):
+            client.create("gpt", MESSAGES, max_tokens=10)
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+
+
+def test_only_the_exporting_breaker_sets_the_state_gauge():
+    """Test that private breakers, e.g. of ChatServices built without a client, leave the gauge alone."""
+    with patch("app.services.openai_client.metrics.OPENAI_BREAKER_STATE") as gauge:
+        private = CircuitBreaker(failure_threshold=1)
+        private.record_failure()
+        gauge.set.assert_not_called()
+        shared = CircuitBreaker(failure_threshold=1, export_state=True)
+        shared.record_failure()
+        assert gauge.set.call_count == 2
+
+
+@patch("app.services.openai_client.time.sleep")
+@patch("app.services.openai_client.openai.ChatCompletion.create")
+def test_circuit_opens_after_repeated_failures(mock_create, mock_sleep):
+    """Test that the breaker fails fast once calls keep failing, and recovers after a trial call."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    client = OpenAIChatClient(max_retries=0, breaker=breaker, install_session=False)
+    mock_create.side_effect = openai.error.Timeout("timed out")
+    for _ in range(2):
+        with pytest.raises(openai.error.Timeout):
+            client.create("gpt", MESSAGES, max_tokens=10)
+    assert breaker.state == "open"
+
+    with pytest.raises(OpenAIUnavailable):
+        client.create("gpt", MESSAGES, max_tokens=10)
+    assert mock_create.call_count == 2
+
+    with patch("app.services.openai_client.time.monotonic", return_value=breaker._opened_at + 31):
+        assert breaker.state == "half_open"
+        mock_create.side_effect = None
+        mock_create.return_value = "response"
+        assert client.create("gpt", MESSAGES, max_tokens=10) == "response"
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_a_single_trial():
+    """Test that only one call goes through while the circuit is half-open."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state in ("open", "half_open")
+
+
+@patch("app.services.openai_client.openai.ChatCompletion.create")
+def test_concurrency_is_bounded(mock_create, client):
+    """Test that callers are rejected when every slot stays busy beyond the queue timeout."""
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_call(**kwargs):
+        entered.set()
+        release.wait(5)
+        return "response"
+
+    mock_create.side_effect = slow_call
+    worker = threading.Thread(target=client.create, args=("gpt", MESSAGES, 10))
+    worker.start()
+    assert entered.wait(5)
+    with pytest.raises(OpenAIUnavailable):
+        client.create("gpt", MESSAGES, max_tokens=10)
+    release.set()
+    worker.join(5)
+    assert client.create("gpt", MESSAGES, max_tokens=10) == "response"
+
+
+@patch("app.services.openai_client.openai.ChatCompletion.create")
+def test_stream_holds_slot_until_consumed(mock_create, client):
+    """Test that a streamed completion keeps its slot until the stream ends."""
+    mock_create.return_value = iter(["a", "b"])
+    stream = client.create("gpt", MESSAGES, max_tokens=10, stream=True)
+    assert next(stream) == "a"
+    with pytest.raises(OpenAIUnavailable):
+        client.create("gpt", MESSAGES, max_tokens=10)
+    assert list(stream) == ["b"]
+
+    mock_create.return_value = "response"
+    assert client.create("gpt", MESSAGES, max_tokens=10) == "response"
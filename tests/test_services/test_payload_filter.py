@@ -0,0 +1,49 @@
+import pytest
+from app.services.payload_filter import filter_key, parse_filter, payload_matches
+
+KEYWORD_FIELDS = ("TYPE OF INDOOR ENVIRONMENT", "YOUR COMPLETE NAME")
+NUMERIC_FIELDS = ("YEAR",)
+
+
+def test_parse_filter_normalizes_conditions():
+    """Test that exact, multi-value and range conditions are accepted and normalized."""
+    parsed = parse_filter(
+        {"TYPE OF INDOOR ENVIRONMENT": "School", "YOUR COMPLETE NAME": ["Anna Nowak"], "YEAR": {"gte": 2015, "lt": 2020}},
+        KEYWORD_FIELDS, NUMERIC_FIELDS
+    )
+    assert parsed == {
+        "TYPE OF INDOOR ENVIRONMENT": "School", "YOUR COMPLETE NAME": ["Anna Nowak"], "YEAR": {"gte": 2015.0, "lt": 2020.0}
+    }
+    assert parse_filter({}, KEYWORD_FIELDS) is None
+    assert parse_filter(None, KEYWORD_FIELDS) is None
+
+
+@pytest.mark.parametrize("spec", [
+    ["School"],
+    {"UNKNOWN": "x"},
+    {"TYPE OF INDOOR ENVIRONMENT": []},
+    {"TYPE OF INDOOR ENVIRONMENT": {"gte": 1}},
+    {"YEAR": {"from": 2000}},
+    {"YEAR": {"gte": "2000"}},
+    {"YEAR": "2000"},
+])
+def test_parse_filter_rejects_invalid_specs(spec):
+    """Test that malformed filters and non-filterable fields raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_filter(spec, KEYWORD_FIELDS, NUMERIC_FIELDS)
+
+
+def test_payload_matches():
+    """Test in-memory matching with Qdrant semantics for lists and ranges."""
+    payload = {"TYPE OF INDOOR ENVIRONMENT": "School", "TAGS": ["hepa", "uv"], "YEAR": 2018}
+    assert payload_matches(payload, {"TYPE OF INDOOR ENVIRONMENT": ["Office", "School"], "YEAR": {"gte": 2015.0}})
+    assert payload_matches(payload, {"TAGS": "uv"})
+    assert not payload_matches(payload, {"YEAR": {"gt": 2018.0}})
+    assert not payload_matches(payload, {"MISSING": "x"})
+    assert payload_matches(None, None)
+
+
+def test_filter_key_is_order_independent():
+    """Test that equal filters produce equal cache keys."""
+    assert filter_key({"a": 1, "b": [2]}) == filter_key({"b": [2], "a": 1})
+    assert filter_key(None) is None
@@ -1,11 +1,22 @@
+import dataclasses
 import pytest
 import pandas as pd
 import numpy as np
 from unittest.mock import patch, MagicMock
-from app.services.qdrant_wrapper import QdrantWrapper, QdrantConfig
+from qdrant_client.http import models as qmodels
+from app.services.qdrant_wrapper import (
+    QdrantWrapper, QdrantConfig, AdaptiveBatchSize, bump_collection_version, get_collection_version
+)
 from app.models import AppConfig
 
 
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """Run in a temporary directory so the collection version stamps stay out of the repository."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
 @pytest.fixture
 def sample_df():
     """Return a sample DataFrame for testing upsert."""
@@ -59,3 +70,279 @@ def test_search_returns_expected_format(mock_client):
     results = wrapper.search(np.array([0.1,0.2,0.3]), top_k=1)
     assert isinstance(results, list)
     assert all(k in results[0] for k in ["id", "score", "payload"])
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_fetch_fingerprints_scrolls_all_pages(mock_client):
+    """Test that fetch_fingerprints follows scroll offsets until exhausted."""
+    mock_instance = mock_client.return_value
+    mock_instance.collection_exists.return_value = True
+    page1 = [MagicMock(id=1, payload={"_fingerprint": "a"})]
+    page2 = [MagicMock(id=2, payload={"_fingerprint": "b"})]
+    mock_instance.scroll.side_effect = [(page1, 2), (page2, None)]
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    wrapper.client = mock_instance
+    assert wrapper.fetch_fingerprints() == {1: "a", 2: "b"}
+    assert mock_instance.scroll.call_count == 2
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_delete_ids_batches(mock_client):
+    """Test that delete_ids issues one delete request per batch."""
+    mock_instance = mock_client.return_value
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    wrapper.client = mock_instance
+    wrapper.delete_ids([1, 2, 3], batch_size=2)
+    assert mock_instance.delete.call_count == 2
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_upsert_dataframe_sends_columnar_batches(mock_client, sample_df, embeddings):
+    """Test that upsert_dataframe sends qmodels.Batch objects with ids, vectors and payloads."""
+    mock_instance = mock_client.return_value
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    wrapper.client = mock_instance
+    wrapper.upsert_dataframe(sample_df, embeddings)
+    batch = mock_instance.upsert.call_args.kwargs["points"]
+    assert batch.ids == [1, 2, 3]
+    assert len(batch.vectors) == 3
+    assert batch.payloads[0] == {"id": 1, "TITLE OF THE PAPER": "Title1", "AIM OF THE PAPER": "Aim1", "MAIN FINDINGS OF THE PAPER": "Finding1"}
+
+
+def test_sanitize_column_handles_dtypes():
+    """Test that payload columns become JSON-serializable Python values with NaN as None."""
+    assert QdrantWrapper._sanitize_column(pd.Series([1.5, np.nan])) == [1.5, None]
+    assert QdrantWrapper._sanitize_column(pd.Series([1, 2], dtype=np.int64)) == [1, 2]
+    assert QdrantWrapper._sanitize_column(pd.Series(["a", None, np.int64(3), {1, 2}])) == ["a", None, 3, "{1, 2}"]
+    assert QdrantWrapper._sanitize_column(pd.Series(pd.to_datetime(["2024-01-01", None]))) == ["2024-01-01 00:00:00", None]
+
+
+@patch("app.services.qdrant_wrapper.time.sleep")
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_upsert_retries_transient_errors(mock_client, mock_sleep, sample_df, embeddings):
+    """Test that a transient error is retried and the batch eventually succeeds."""
+    from qdrant_client.http.exceptions import ResponseHandlingException
+    mock_instance = mock_client.return_value
+    mock_instance.upsert.side_effect = [ResponseHandlingException(ConnectionError("reset")), None]
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    wrapper.client = mock_instance
+    wrapper.upsert_dataframe(sample_df, embeddings)
+    assert mock_instance.upsert.call_count == 2
+    mock_sleep.assert_called_once()
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_upsert_does_not_retry_permanent_errors(mock_client, sample_df, embeddings):
+    """Test that non-transient errors abort the upsert immediately."""
+    mock_instance = mock_client.return_value
+    mock_instance.upsert.side_effect = ValueError("bad payload")
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    wrapper.client = mock_instance
+    with pytest.raises(ValueError):
+        wrapper.upsert_dataframe(sample_df, embeddings)
+    assert mock_instance.upsert.call_count == 1
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_upsert_without_wait_confirms_with_last_batch(mock_client, sample_df, embeddings):
+    """Test that wait=False sends batches unacknowledged and finishes with a waiting barrier."""
+    mock_instance = mock_client.return_value
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    wrapper.client = mock_instance
+    wrapper.upsert_dataframe(sample_df, embeddings, wait=False)
+    waits = [c.kwargs["wait"] for c in mock_instance.upsert.call_args_list]
+    assert waits == [False, True]
+
+
+def test_adaptive_batch_size_reacts_to_latency():
+    """Test that the batch size shrinks on slow batches, grows on fast ones and respects the byte budget."""
+    sizer = AdaptiveBatchSize(size=128, min_size=16, max_size=512, target_latency=1.0, max_bytes=1000)
+    sizer.observe(2.0, 128)
+    assert sizer.next_size() == 64
+    sizer.observe(0.1, 64)
+    assert sizer.next_size() == 128
+    sizer.row_bytes = 100.0
+    assert sizer.next_size() == 10
+    sizer.row_bytes = 5000.0
+    assert sizer.next_size() == 1
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_search_projects_payload_fields(mock_client):
+    """Test that payload_include is sent to Qdrant as an include selector."""
+    mock_instance = mock_client.return_value
+    mock_instance.search.return_value = []
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    wrapper.client = mock_instance
+    wrapper.search(np.array([0.1, 0.2, 0.3]), top_k=1, payload_include=["TITLE OF THE PAPER"])
+    selector = mock_instance.search.call_args.kwargs["with_payload"]
+    assert selector.include == ["TITLE OF THE PAPER"]
+
+
+def test_payload_selector_defaults_to_excluding_fingerprint():
+    """Test that a full payload request still leaves out the internal fingerprint."""
+    assert QdrantWrapper._payload_selector(True).exclude == ["_fingerprint"]
+    assert QdrantWrapper._payload_selector(False) is False
+    assert QdrantWrapper._payload_selector(True, exclude=["AIM OF THE PAPER"]).exclude == ["AIM OF THE PAPER", "_fingerprint"]
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_retrieve_returns_payloads(mock_client):
+    """Test that retrieve returns id/payload dicts for the requested IDs."""
+    mock_instance = mock_client.return_value
+    mock_instance.retrieve.return_value = [MagicMock(id=5, payload={"TITLE OF THE PAPER": "Title"})]
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    wrapper.client = mock_instance
+    assert wrapper.retrieve([5]) == [{"id": 5, "payload": {"TITLE OF THE PAPER": "Title"}}]
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_writes_bump_collection_version(mock_client, sample_df, embeddings):
+    """Test that upserts and deletes change the collection version shared by wrappers."""
+    wrapper = QdrantWrapper(AppConfig(), collection_name="versioned_collection")
+    wrapper.client = mock_client.return_value
+    before = wrapper.collection_version
+    wrapper.upsert_dataframe(sample_df, embeddings)
+    wrapper.delete_ids([1])
+    other = QdrantWrapper(AppConfig(), collection_name="versioned_collection")
+    assert other.collection_version == before + 2
+
+
+def test_collection_version_is_shared_through_versions_dir(tmp_path):
+    """Test that versions bumped in one process are read back from the stamp directory by others."""
+    versions_dir = str(tmp_path / "versions")
+    assert get_collection_version("shared", versions_dir) == 0
+    bump_collection_version("shared", versions_dir)
+    bump_collection_version("shared", versions_dir)
+    assert get_collection_version("shared", versions_dir) == 2
+    assert get_collection_version("shared") == 0
+    assert get_collection_version("other", versions_dir) == 0
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_ensure_collection_applies_index_and_storage_settings(mock_client):
+    """Test that HNSW, datatype, on-disk and quantization settings reach collection creation."""
+    config = dataclasses.replace(
+        AppConfig(), qdrant_hnsw_m=32, qdrant_hnsw_ef_construct=200, qdrant_on_disk_vectors=True,
+        qdrant_vector_datatype="float16", qdrant_quantization="scalar"
+    )
+    mock_instance = mock_client.return_value
+    mock_instance.collection_exists.return_value = False
+    wrapper = QdrantWrapper(config, collection_name="test_collection")
+    wrapper.ensure_collection(vector_size=3)
+
+    kwargs = mock_instance.recreate_collection.call_args.kwargs
+    assert kwargs["vectors_config"].on_disk is True
+    assert kwargs["vectors_config"].datatype == qmodels.Datatype.FLOAT16
+    assert kwargs["hnsw_config"] == qmodels.HnswConfigDiff(m=32, ef_construct=200)
+    assert kwargs["quantization_config"].scalar.type == qmodels.ScalarType.INT8
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_search_sends_ef_and_rescoring_params(mock_client):
+    """Test that search-time ef and quantization rescoring are passed to Qdrant."""
+    config = dataclasses.replace(
+        AppConfig(), qdrant_search_hnsw_ef=256, qdrant_quantization="binary", qdrant_search_oversampling=3.0
+    )
+    mock_instance = mock_client.return_value
+    mock_instance.search.return_value = []
+    wrapper = QdrantWrapper(config, collection_name="test_collection")
+    wrapper.search(np.array([0.1, 0.2, 0.3]))
+
+    params = mock_instance.search.call_args.kwargs["search_params"]
+    assert params.hnsw_ef == 256
+    assert params.quantization == qmodels.QuantizationSearchParams(rescore=True, oversampling=3.0)
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_unknown_quantization_is_rejected(mock_client):
+    """Test that an invalid quantization mode fails when the collection config is built."""
+    wrapper = QdrantWrapper(dataclasses.replace(AppConfig(), qdrant_quantization="pq"), collection_name="c")
+    with pytest.raises(ValueError):
+        wrapper._quantization_config()
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_collection_info_reports_size_and_count(mock_client):
+    """Test that collection_info returns the vector size and exact point count, or None if missing."""
+    mock_instance = mock_client.return_value
+    mock_instance.collection_exists.return_value = True
+    mock_instance.get_collection.return_value.config.params.vectors = qmodels.VectorParams(size=384, distance=qmodels.Distance.COSINE)
+    mock_instance.count.return_value = MagicMock(count=1200)
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    assert wrapper.collection_info() == {'vector_size': 384, 'points_count': 1200}
+
+    mock_instance.collection_exists.return_value = False
+    assert wrapper.collection_info() is None
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_search_batch_sends_one_request(mock_client):
+    """Test that search_batch sends all queries in one call and keeps their order."""
+    mock_instance = mock_client.return_value
+    mock_instance.search_batch.return_value = [
+        [MagicMock(id=1, score=0.9, payload={"a": 1})],
+        [MagicMock(id=2, score=0.8, payload={"a": 2}), MagicMock(id=3, score=0.7, payload={"a": 3})],
+    ]
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    results = wrapper.search_batch(np.array([[0.1, 0.2, 0.3], [0.3, 0.2, 0.1]]), [1, 2])
+
+    mock_instance.search_batch.assert_called_once()
+    requests = mock_instance.search_batch.call_args.kwargs["requests"]
+    assert [r.limit for r in requests] == [1, 2]
+    assert [[r["id"] for r in hits] for hits in results] == [[1], [2, 3]]
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_ensure_collection_creates_missing_payload_indexes(mock_client):
+    """Test that configured filter fields get keyword and float payload indexes once."""
+    mock_instance = mock_client.return_value
+    mock_instance.collection_exists.return_value = True
+    mock_instance.get_collection.return_value.payload_schema = {'"TYPE OF INDOOR ENVIRONMENT"': MagicMock()}
+    config = dataclasses.replace(
+        AppConfig(), payload_filter_fields=("TYPE OF INDOOR ENVIRONMENT", "reviewer"), payload_numeric_filter_fields=("YEAR",)
+    )
+    wrapper = QdrantWrapper(config, collection_name="test_collection")
+    wrapper.ensure_collection(vector_size=3)
+
+    created = {c.kwargs["field_name"]: c.kwargs["field_schema"] for c in mock_instance.create_payload_index.call_args_list}
+    assert created == {"reviewer": qmodels.PayloadSchemaType.KEYWORD, "YEAR": qmodels.PayloadSchemaType.FLOAT}
+
+
+@patch("app.services.qdrant_wrapper.QdrantClient")
+def test_search_sends_payload_filter(mock_client):
+    """Test that exact, multi-value and range conditions become one Qdrant filter."""
+    mock_instance = mock_client.return_value
+    mock_instance.search.return_value = []
+    wrapper = QdrantWrapper(AppConfig(), collection_name="test_collection")
+    wrapper.search(np.array([0.1, 0.2]), query_filter={
+        "TYPE OF INDOOR ENVIRONMENT": "School", "reviewer": ["A", "B"], "YEAR": {"gte": 2015.0}
+    })
+
+    conditions = mock_instance.search.call_args.kwargs["query_filter"].must
+    assert conditions[0] == qmodels.FieldCondition(key='"TYPE OF INDOOR ENVIRONMENT"', match=qmodels.MatchValue(value="School"))
+    assert conditions[1] == qmodels.FieldCondition(key="reviewer", match=qmodels.MatchAny(any=["A", "B"]))
+    assert conditions[2] == qmodels.FieldCondition(key="YEAR", range=qmodels.Range(gte=2015.0))
+
+    wrapper.search(np.array([0.1, 0.2]), query_filter={"YEAR": 2020.5})
+    conditions = mock_instance.search.call_args.kwargs["query_filter"].must
+    assert conditions == [qmodels.FieldCondition(key="YEAR", range=qmodels.Range(gte=2020.5, lte=2020.5))]
+
+
+def test_payload_filter_matches_in_memory_qdrant():
+    """Test that quoted keys with spaces filter correctly against a real (in-memory) Qdrant."""
+    from qdrant_client import QdrantClient
+    with patch("app.services.qdrant_wrapper.QdrantClient"):
+        wrapper = QdrantWrapper(dataclasses.replace(AppConfig(), payload_filter_fields=()), collection_name="filtered")
+    wrapper.client = QdrantClient(":memory:")
+    wrapper.ensure_collection(vector_size=2)
+    wrapper.upsert_dataframe(
+        pd.DataFrame({"id": [1, 2, 3], "TYPE OF INDOOR ENVIRONMENT": ["School", "Office", "School"], "YEAR": [2010, 2020, 2022]}),
+        np.array([[1.0, 0.0], [1.0, 0.1], [0.0, 1.0]], dtype=np.float32)
+    )
+    results = wrapper.search(
+        np.array([1.0, 0.0]), top_k=5, query_filter={"TYPE OF INDOOR ENVIRONMENT": "School", "YEAR": {"gte": 2015.0}}
+    )
+    assert [r["id"] for r in results] == [3]
+    assert [r["id"] for r in wrapper.search(np.array([1.0, 0.0]), top_k=5, query_filter={"YEAR": 2020.0})] == [2]
+    assert wrapper.search(np.array([1.0, 0.0]), top_k=5, query_filter={"YEAR": 2020.5}) == []
@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import patch
+from app.services.query_cache import QueryResultCache
+
+
+@pytest.fixture
+def cache():
+    """Fixture returning a small result cache."""
+    return QueryResultCache(max_items=2, ttl_seconds=60)
+
+
+def test_key_normalizes_query_text():
+    """Test that case and whitespace differences map to the same key."""
+    assert QueryResultCache.make_key("  HEPA   filter", 5, "papers", 1) == QueryResultCache.make_key("hepa filter", 5, "papers", 1)
+    assert QueryResultCache.make_key("hepa filter", 5, "papers", 1) != QueryResultCache.make_key("hepa filter", 5, "papers", 2)
+
+
+def test_put_and_get(cache):
+    """Test that stored results are returned and unknown keys miss."""
+    key = QueryResultCache.make_key("pm2.5", 5, "papers", 0)
+    cache.put(key, [{"id": 1}], cost_seconds=0.2)
+    assert cache.get(key) == [{"id": 1}]
+    assert cache.get(QueryResultCache.make_key("pm10", 5, "papers", 0)) is None
+
+
+def test_lru_eviction(cache):
+    """Test that the least recently used entry is evicted first."""
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_entries_expire(cache):
+    """Test that entries older than the TTL are not returned."""
+    with patch("app.services.query_cache.time.monotonic", side_effect=[0.0, 61.0]):
+        cache.put("a", 1)
+        assert cache.get("a") is None
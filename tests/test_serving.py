@@ -0,0 +1,36 @@
+import os
+import sys
+from unittest.mock import patch, MagicMock
+from prometheus_client import REGISTRY
+from app.serving import configure_worker, worker_torch_threads
+from app.services.prometheus import exposition_registry
+
+
+def test_worker_torch_threads_splits_cores():
+    """Cores are divided between workers unless a thread count is configured"""
+    assert worker_torch_threads(workers=4, cpu_count=8) == 2
+    assert worker_torch_threads(workers=8, cpu_count=4) == 1
+    assert worker_torch_threads(workers=4, configured=3, cpu_count=8) == 3
+
+
+@patch('app.serving.routes_module.reset_after_fork')
+def test_configure_worker_sets_torch_threads(mock_reset, monkeypatch):
+    """A forked worker limits torch threads and resets the route state"""
+    torch = MagicMock()
+    monkeypatch.setitem(sys.modules, 'torch', torch)
+    monkeypatch.setenv('OMP_NUM_THREADS', '8')
+    configure_worker(2)
+    torch.set_num_threads.assert_called_once_with(2)
+    assert os.environ['OMP_NUM_THREADS'] == '2'
+    mock_reset.assert_called_once()
+
+
+def test_exposition_registry(monkeypatch, tmp_path):
+    """/metrics aggregates per-process files only under the multi-process server"""
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+    assert exposition_registry() is REGISTRY
+
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    registry = exposition_registry()
+    assert registry is not REGISTRY
+    assert list(registry.collect()) == []
@@ -0,0 +1,38 @@
+"""Pre-fork WSGI entry point: `gunicorn -c gunicorn.conf.py wsgi:app`.
+
+Gunicorn imports this module once in the master (`preload_app`). The
+embedding model is loaded and collections are discovered here, before the
+workers are forked, so the model weights are shared copy-on-write between
+all workers instead of being loaded once per process.
+"""
+import os
+import time
+_import_start = time.perf_counter()
+
+# The master only loads the model; keeping torch single-threaded here means no
+# OpenMP thread pool exists at fork time. Workers set their own thread count.
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+import gc
+from app.logger import logger
+from app.models import AppConfig
+from app.serving import create_app, startup
+from app.startup import record_phase, startup_phase
+
+record_phase('imports', time.perf_counter() - _import_start)
+
+app = create_app()
+
+config = AppConfig()
+try:
+    with startup_phase('preload'):
+        # ONNX Runtime sessions start their thread pools on creation and do not
+        # survive a fork, so those backends are loaded lazily in each worker.
+        startup(preload_model=config.preload_model and config.embed_backend == 'torch')
+except Exception as e:
+    logger.exception(f"Preload failed, workers will load on demand: {e}")
+
+# Objects loaded so far are never collected; moving them out of the GC's
+# generations stops collections in the workers from touching (and so copying)
+# the shared pages.
+gc.freeze()